@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Shared On-Disk Embedding Cache
+Caches sentence embeddings keyed by SHA-1 of the normalized text and the
+model id, so identical texts are encoded once across the slide vector
+database and the ECMA-376 section database. QueryEncoder adds an
+in-memory LRU and micro-batching for search queries.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Optional, Sequence
+
+DEFAULT_MAX_ENTRIES = 500_000
+
+# Hits refresh last_used only when it is older than this, so lookups rarely write
+TOUCH_INTERVAL = 3600.0  # seconds
+
+DEFAULT_MAX_QUERIES = 1024
+DEFAULT_BATCH_WINDOW = 0.003  # seconds a batch stays open for concurrent queries
+DEFAULT_MAX_BATCH = 64
+
+
+def default_cache_path() -> str:
+    """Cache file shared by every project, overridable with EMBEDDING_CACHE_PATH"""
+    return os.environ.get(
+        'EMBEDDING_CACHE_PATH',
+        str(Path.home() / '.cache' / 'naly' / 'embeddings.sqlite'))
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return ' '.join(text.split())
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with least-recently-used eviction"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 touch_interval: float = TOUCH_INTERVAL):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection per thread; WAL lets several threads and processes share the file
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        conn.commit()
+
+        # Running row count: puts add to it, replaced keys included, and
+        # COUNT(*) only runs once it passes max_entries; rows added by other
+        # processes are picked up at that count
+        self._count_lock = threading.Lock()
+        self._row_estimate = len(self)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Only used by its own thread; close() may run on another
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def key(text: str, model_id: str) -> str:
+        """Cache key for a text under a model"""
+        return hashlib.sha1(f"{model_id}\0{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: Sequence[str], model_id: str) -> List[Optional[np.ndarray]]:
+        """Look up cached vectors, returning None for misses, and mark stale hits as used"""
+        conn = self._connection()
+        keys = [self.key(text, model_id) for text in texts]
+        found = {}
+        now = time.time()
+        stale = []
+
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = conn.execute(
+                f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, vector, last_used in cursor.fetchall():
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+                if now - last_used > self.touch_interval:
+                    stale.append(key)
+
+        if stale:
+            conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                             [(now, key) for key in stale])
+            conn.commit()
+
+        return [found.get(key) for key in keys]
+
+    def put_many(self, texts: Sequence[str], model_id: str, vectors: Sequence[np.ndarray]):
+        """Store vectors for texts, then evict the least recently used entries over the limit"""
+        conn = self._connection()
+        now = time.time()
+        rows = [(self.key(text, model_id), model_id,
+                 np.asarray(vector, dtype=np.float32).tobytes(), now)
+                for text, vector in zip(texts, vectors)]
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+            rows)
+        with self._count_lock:
+            self._row_estimate += len(rows)
+            over_limit = self._row_estimate > self.max_entries
+        if over_limit:
+            self._evict(conn)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete the least recently used entries beyond max_entries"""
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute('''
+                DELETE FROM embeddings WHERE key IN (
+                    SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+                )
+            ''', (count - self.max_entries,))
+            count = self.max_entries
+        with self._count_lock:
+            self._row_estimate = count
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        """Close the connections of every thread that used the cache"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class CachedEncoder:
+    """Wraps a SentenceTransformer so encode() only runs the model on uncached texts"""
+
+    def __init__(self, model, model_id: str, cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.model_id = model_id
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32,
+               normalize: bool = False) -> np.ndarray:
+        """
+        Encode texts, reusing cached vectors.
+
+        The cache holds raw model output; normalize applies L2 normalization
+        afterwards, matching encode(..., normalize_embeddings=True).
+
+        Args:
+            texts: Texts to encode
+            batch_size: Texts per model call for cache misses
+            normalize: Return unit-length vectors
+
+        Returns:
+            float32 array with one row per text
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        vectors = self.cache.get_many(texts, self.model_id)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            # Encode each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = np.asarray(self.model.encode(unique_texts, batch_size=batch_size),
+                                 dtype=np.float32)
+            self.cache.put_many(unique_texts, self.model_id, encoded)
+            by_text = dict(zip(unique_texts, encoded))
+            for i in missing:
+                vectors[i] = by_text[texts[i]]
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        embeddings = np.vstack(vectors).astype(np.float32)
+        if normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        return embeddings
+
+
+class QueryEncoder:
+    """Encodes search queries with an in-memory LRU, coalescing concurrent misses into one batch
+
+    The first thread to miss opens a batch, waits batch_window seconds for
+    other threads' queries to join it, then encodes them all in a single
+    model call; the other threads wait for their vectors.
+    """
+
+    def __init__(self, model, max_cached: int = DEFAULT_MAX_QUERIES,
+                 batch_window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH):
+        self.model = model
+        self.max_cached = max_cached
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._pending = []
+        self._in_flight = {}
+        self._batch_open = False
+        self.hits = 0
+        self.batches = 0
+
+    def encode(self, query: str) -> np.ndarray:
+        """Return the normalized float32 embedding of a query; the array is read-only"""
+        text = normalize_text(query)
+
+        with self._lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return vector
+
+            # Identical queries already being encoded share one result
+            future = self._in_flight.get(text)
+            leader = False
+            if future is None:
+                future = Future()
+                self._in_flight[text] = future
+                self._pending.append(text)
+                leader = not self._batch_open
+                self._batch_open = True
+
+        if leader:
+            if self.batch_window > 0:
+                time.sleep(self.batch_window)
+            self._encode_pending()
+        return future.result()
+
+    def _encode_pending(self):
+        """Encode the open batch and hand each waiting thread its vector"""
+        with self._lock:
+            texts = self._pending
+            self._pending = []
+            self._batch_open = False
+            futures = [self._in_flight[text] for text in texts]
+
+        try:
+            embeddings = np.asarray(self.model.encode(texts, batch_size=self.max_batch),
+                                    dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        except Exception as e:
+            with self._lock:
+                for text in texts:
+                    del self._in_flight[text]
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches += 1
+            for text, vector in zip(texts, embeddings):
+                vector.setflags(write=False)
+                self._cache[text] = vector
+                del self._in_flight[text]
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+        for future, vector in zip(futures, embeddings):
+            future.set_result(vector)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import os
+import base64
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class MediaStore:
+    """Content-addressed blob store for extracted media and fonts
+
+    Blobs are keyed by their SHA-256 digest and written once under
+    <root>/<first two hex chars>/<digest>, so identical images, videos and
+    fonts are shared across every deck extracted into the same store.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        """Return the on-disk path of a blob"""
+        return self.root / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        """Check whether a blob is already stored"""
+        return self.path_for(digest).exists()
+
+    def put(self, data: bytes) -> str:
+        """Store a blob (no-op if already present) and return its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self.path_for(digest)
+
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so concurrent extractions never
+            # observe a partially written blob
+            fd, temp_path = tempfile.mkstemp(dir=blob_path.parent)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, blob_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Read a blob by digest"""
+        with open(self.path_for(digest), 'rb') as f:
+            return f.read()
+
+    def entry_for(self, filename: str, data: bytes) -> Dict[str, Any]:
+        """Store a blob and return the JSON entry that references it"""
+        return {
+            'filename': filename,
+            'size': len(data),
+            'sha256': self.put(data)
+        }
+
+
+def read_media_entry(entry: Dict[str, Any], store: Optional[MediaStore]) -> Optional[bytes]:
+    """Resolve a media JSON entry to bytes, from inline base64 or the store"""
+    if entry.get('data') is not None:
+        return base64.b64decode(entry['data'])
+    if entry.get('sha256'):
+        if store is None:
+            raise ValueError(
+                f"Media entry {entry.get('filename')} references the media store but no store was given")
+        return store.get(entry['sha256'])
+    return None
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import struct
+import hashlib
+import zipfile
+from typing import Dict, List, Any, Optional
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = '.fingerprints.json'
+
+# Local file header: signature, then name/extra lengths at bytes 26-29
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_HEADER_LENGTHS = struct.Struct('<HH')
+
+# copy_raw_member updates ZipFile internals (NameToInfo, start_dir,
+# _didModify) that are unchanged from 3.7 through 3.13; other versions
+# recompress the member instead
+RAW_COPY_PYTHON = ((3, 7), (3, 14))
+RAW_COPY_SUPPORTED = RAW_COPY_PYTHON[0] <= sys.version_info[:2] < RAW_COPY_PYTHON[1]
+
+# ZipFile attributes the raw path reads or updates; if any is missing the
+# internals have changed and the member is recompressed instead
+RAW_COPY_ATTRIBUTES = ('fp', 'filelist', 'NameToInfo', 'start_dir', '_didModify')
+
+
+def digest_bytes(data: bytes) -> str:
+    """SHA-256 hex digest of raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_json(data: Any) -> str:
+    """SHA-256 hex digest of JSON data, independent of key order and formatting"""
+    return digest_bytes(json.dumps(data, sort_keys=True, ensure_ascii=False,
+                                   separators=(',', ':')).encode('utf-8'))
+
+
+def digest_file(file_path: str) -> str:
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PackageManifest:
+    """Fingerprints of a generated package, stored next to it as <output>.fingerprints.json
+
+    inputs covers everything shared by all slides (template, layouts, theme,
+    media, properties); slides holds one record per generated slide with its
+    shape-data fingerprint and package part; members maps every package
+    member to the digest of its uncompressed contents.
+    """
+
+    def __init__(self, inputs: str = '', slides: Optional[List[Dict[str, Any]]] = None,
+                 members: Optional[Dict[str, str]] = None):
+        self.inputs = inputs
+        self.slides = slides or []
+        self.members = members or {}
+
+    @staticmethod
+    def path_for(output_file: str) -> str:
+        return output_file + MANIFEST_SUFFIX
+
+    @classmethod
+    def load(cls, output_file: str) -> Optional['PackageManifest']:
+        """Load the manifest of a previous build, or None if it is missing or stale"""
+        manifest_path = cls.path_for(output_file)
+        if not os.path.exists(output_file) or not os.path.exists(manifest_path):
+            return None
+        # The manifest is written after the package; a newer package was
+        # changed outside the generator
+        if os.path.getmtime(output_file) > os.path.getmtime(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read fingerprints {manifest_path}: {str(e)}")
+            return None
+
+        if data.get('version') != MANIFEST_VERSION:
+            return None
+        return cls(data.get('inputs', ''), data.get('slides', []), data.get('members', {}))
+
+    def save(self, output_file: str):
+        with open(self.path_for(output_file), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'inputs': self.inputs,
+                'slides': self.slides,
+                'members': self.members
+            }, f, indent=2)
+
+
+def copy_raw_member(zip_in: zipfile.ZipFile, zip_out: zipfile.ZipFile, name: str):
+    """Copy one member's compressed bytes between archives without inflating or deflating
+
+    zipfile has no public API for this, so the local header is read directly
+    and the output's central directory bookkeeping is updated the same way
+    ZipFile.writestr() does. Outside RAW_COPY_PYTHON, when either archive
+    lacks one of RAW_COPY_ATTRIBUTES, and for members that need ZIP64
+    records, the member is read and written with the public API.
+    """
+    info = zip_in.getinfo(name)
+    if (not RAW_COPY_SUPPORTED
+            or not all(hasattr(zip_file, attribute) for zip_file in (zip_in, zip_out)
+                       for attribute in RAW_COPY_ATTRIBUTES)
+            or not hasattr(info, 'header_offset') or not hasattr(zipfile.ZipInfo, 'FileHeader')
+            or zip_out.fp.tell() > zipfile.ZIP64_LIMIT
+            or max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT):
+        zip_out.writestr(name, zip_in.read(name))
+        return
+
+    zip_in.fp.seek(info.header_offset)
+    header = zip_in.fp.read(LOCAL_HEADER_SIZE)
+    if header[:4] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header for {name}")
+    name_length, extra_length = LOCAL_HEADER_LENGTHS.unpack(header[26:30])
+    zip_in.fp.seek(info.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length)
+    raw = zip_in.fp.read(info.compress_size)
+
+    out_info = zipfile.ZipInfo(name, info.date_time)
+    out_info.compress_type = info.compress_type
+    out_info.CRC = info.CRC
+    out_info.compress_size = info.compress_size
+    out_info.file_size = info.file_size
+    out_info.external_attr = info.external_attr
+    out_info.create_system = info.create_system
+    # Sizes are known up front, so no trailing data descriptor is written
+    out_info.flag_bits = info.flag_bits & ~0x08
+    out_info.header_offset = zip_out.fp.tell()
+
+    zip_out.fp.write(out_info.FileHeader())
+    zip_out.fp.write(raw)
+    zip_out.filelist.append(out_info)
+    zip_out.NameToInfo[name] = out_info
+    zip_out.start_dir = zip_out.fp.tell()
+    zip_out._didModify = True
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+import re
+import json
+import mmap
+import struct
+from collections.abc import Sequence
+from typing import Dict, List, Any, Iterable, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# File layout:
+#   MAGIC | section payloads ... | slide payloads ... | index JSON | u64 index offset | MAGIC
+# Every payload is encoded with the codec named in the index, so a reader can
+# seek straight to one slide without decoding anything else.
+MAGIC = b'PPTXBIN1'
+TRAILER = struct.Struct('<Q')
+CONTAINER_VERSION = 1
+
+# ppt_extractor.py --stream records carry a reduced shape schema (geometry,
+# position, text) that ppt_generator cannot load; records and the container
+# index name it so the generator can refuse them
+STREAM_SHAPES_SCHEMA = 'stream-v1'
+
+# JSON strings (skipped whole) or structural brackets; used to index a shapes
+# file without parsing it
+JSON_STRUCTURE_PATTERN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+
+
+def _encode(data: Any, codec: str) -> bytes:
+    """Encode one payload with the given codec"""
+    if codec == 'msgpack':
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _decode(payload: bytes, codec: str) -> Any:
+    """Decode one payload with the given codec"""
+    if codec == 'msgpack':
+        if msgpack is None:
+            raise ImportError(
+                "This container was written with msgpack; install it with 'pip install msgpack'")
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    return json.loads(payload.decode('utf-8'))
+
+
+def is_container(file_path: str) -> bool:
+    """Check whether a file is a binary extraction container"""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_container(output_file: str, slides: Iterable[Dict[str, Any]],
+                    sections: Dict[str, Any], codec: Optional[str] = None,
+                    schema: Optional[str] = None) -> Dict[str, Any]:
+    """Write slide shape records and named sections to a binary container
+
+    Slides are written one at a time as they are produced, so a generator
+    such as PPTExtractor.iter_slide_records() is never held in memory.
+    """
+    if codec is None:
+        codec = 'msgpack' if msgpack is not None else 'json'
+    if codec == 'msgpack' and msgpack is None:
+        raise ImportError("msgpack codec requested but msgpack is not installed")
+
+    index = {
+        'version': CONTAINER_VERSION,
+        'codec': codec,
+        'sections': {},
+        'slides': []
+    }
+    if schema is not None:
+        index['schema'] = schema
+
+    with open(output_file, 'wb') as f:
+        f.write(MAGIC)
+
+        for name, data in sections.items():
+            payload = _encode(data, codec)
+            index['sections'][name] = [f.tell(), len(payload)]
+            f.write(payload)
+
+        for slide_data in slides:
+            payload = _encode(slide_data, codec)
+            index['slides'].append([f.tell(), len(payload)])
+            f.write(payload)
+
+        index_offset = f.tell()
+        f.write(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+        f.write(TRAILER.pack(index_offset))
+        f.write(MAGIC)
+
+    print(f"Data saved to: {output_file}")
+    return index
+
+
+class ContainerSlides(Sequence):
+    """Read-only, lazily decoded view over the slides of a container"""
+
+    def __init__(self, reader: 'ContainerReader'):
+        self._reader = reader
+
+    def __len__(self) -> int:
+        return len(self._reader.index['slides'])
+
+    def __getitem__(self, slide_index):
+        if isinstance(slide_index, slice):
+            return [self[i] for i in range(*slide_index.indices(len(self)))]
+        offset, length = self._reader.index['slides'][slide_index]
+        return self._reader.read_payload(offset, length)
+
+
+class ContainerReader:
+    """Random-access reader for binary extraction containers"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+
+        try:
+            if self._file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_path} is not a PPTX extraction container")
+
+            trailer_size = TRAILER.size + len(MAGIC)
+            index_end = self._file.seek(-trailer_size, 2)
+            trailer = self._file.read(trailer_size)
+            if trailer[TRAILER.size:] != MAGIC:
+                raise ValueError(f"{file_path} is truncated or corrupt")
+            index_offset = TRAILER.unpack(trailer[:TRAILER.size])[0]
+
+            index_length = index_end - index_offset
+            self._file.seek(index_offset)
+            self.index = json.loads(self._file.read(index_length).decode('utf-8'))
+        except Exception:
+            self._file.close()
+            raise
+
+        if self.index.get('version') != CONTAINER_VERSION:
+            self._file.close()
+            raise ValueError(
+                f"Unsupported container version: {self.index.get('version')}")
+
+        self.schema = self.index.get('schema')  # None for full extract_shapes records
+        self.slides = ContainerSlides(self)
+
+    def read_payload(self, offset: int, length: int) -> Any:
+        """Read and decode a single payload"""
+        self._file.seek(offset)
+        return _decode(self._file.read(length), self.index['codec'])
+
+    def section_names(self) -> List[str]:
+        """Names of the non-slide sections in this container"""
+        return list(self.index['sections'])
+
+    def section(self, name: str, default: Any = None) -> Any:
+        """Decode a named section (layouts, theme, media, properties)"""
+        if name not in self.index['sections']:
+            return default
+        offset, length = self.index['sections'][name]
+        return self.read_payload(offset, length)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LazyJsonSlides(Sequence):
+    """Read-only view over a _shapes.json file that decodes one slide at a time
+
+    The file is memory-mapped and scanned once to record the byte range of
+    each top-level slide object; indexing or iterating then parses only the
+    requested slide, so peak memory is bounded by the largest slide rather
+    than the whole deck.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError(f"{file_path} is empty")
+        self.offsets = self._index_slides()
+
+    def _index_slides(self) -> List[List[int]]:
+        """Find the byte range of every object in the top-level JSON array"""
+        offsets = []
+        depth = 0
+        slide_start = None
+
+        for match in JSON_STRUCTURE_PATTERN.finditer(self._map):
+            token = match.group()
+            if token in (b'{', b'['):
+                depth += 1
+                if depth == 2:
+                    slide_start = match.start()
+            elif token in (b'}', b']'):
+                if depth == 2:
+                    offsets.append([slide_start, match.end()])
+                depth -= 1
+
+        if depth != 0:
+            raise ValueError(f"{self.file_path} is not a complete JSON array")
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, slide_index):
+        if isinstance(slide_index, slice):
+            return [self[i] for i in range(*slide_index.indices(len(self)))]
+        start, end = self.offsets[slide_index]
+        return json.loads(self._map[start:end].decode('utf-8'))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
@@ -6,22 +6,34 @@ import argparse
 import base64
 import zipfile
 import shutil
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
 import xml.etree.ElementTree as ET
 from pathlib import Path
 from pptx import Presentation
 from pptx.shapes.base import BaseShape
 from pptx.slide import Slide, SlideLayout
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+from media_store import MediaStore
+from ppt_container import STREAM_SHAPES_SCHEMA, write_container
 
 
 class PPTExtractor:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, media_store: Optional[MediaStore] = None):
         self.file_path = file_path
-        self.presentation = Presentation(file_path)
+        self.media_store = media_store
+        self._presentation = None
         self.media_files = {}
         self.document_properties = {}
         self.relationships = {}
 
+    @property
+    def presentation(self):
+        """Load the python-pptx presentation on first use (streaming mode never needs it)"""
+        if self._presentation is None:
+            self._presentation = Presentation(self.file_path)
+        return self._presentation
+
     def extract_fill_properties(self, fill) -> Dict[str, Any]:
         """Extract detailed fill properties including colors, gradients, and patterns"""
         fill_info = {
@@ -110,10 +122,8 @@ class PPTExtractor:
 
                     # Store image data for media extraction
                     if hasattr(picture.image, 'blob') and hasattr(picture.image, 'filename'):
-                        self.media_files[picture.image.filename] = {
-                            'data': base64.b64encode(picture.image.blob).decode('utf-8'),
-                            'content_type': picture.image.content_type
-                        }
+                        self.media_files[picture.image.filename] = self._media_blob_entry(
+                            picture.image.blob, picture.image.content_type)
 
         except Exception as e:
             picture_info[
@@ -583,11 +593,8 @@ class PPTExtractor:
                         media_data = zip_ref.read(file_info.filename)
                         file_ext = Path(file_info.filename).suffix.lower()
 
-                        media_entry = {
-                            'filename': file_info.filename,
-                            'size': len(media_data),
-                            'data': base64.b64encode(media_data).decode('utf-8')
-                        }
+                        media_entry = self._media_file_entry(
+                            file_info.filename, media_data)
 
                         # Categorize by file type
                         if file_ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']:
@@ -602,13 +609,9 @@ class PPTExtractor:
                     # Extract font files
                     elif file_info.filename.startswith('ppt/fonts/'):
                         font_data = zip_ref.read(file_info.filename)
-                        file_ext = Path(file_info.filename).suffix.lower()
 
-                        font_entry = {
-                            'filename': file_info.filename,
-                            'size': len(font_data),
-                            'data': base64.b64encode(font_data).decode('utf-8')
-                        }
+                        font_entry = self._media_file_entry(
+                            file_info.filename, font_data)
 
                         # Store font files (usually .fntdata files for embedded fonts)
                         media_info['fonts'][file_info.filename] = font_entry
@@ -618,6 +621,31 @@ class PPTExtractor:
 
         return media_info
 
+    def _media_file_entry(self, filename: str, data: bytes) -> Dict[str, Any]:
+        """Build a media/font entry: a store digest if a store is set, else inline base64"""
+        if self.media_store is not None:
+            return self.media_store.entry_for(filename, data)
+
+        return {
+            'filename': filename,
+            'size': len(data),
+            'data': base64.b64encode(data).decode('utf-8')
+        }
+
+    def _media_blob_entry(self, blob: bytes, content_type: str) -> Dict[str, Any]:
+        """Build the self.media_files entry for an image blob seen on a shape"""
+        if self.media_store is not None:
+            return {
+                'sha256': self.media_store.put(blob),
+                'size': len(blob),
+                'content_type': content_type
+            }
+
+        return {
+            'data': base64.b64encode(blob).decode('utf-8'),
+            'content_type': content_type
+        }
+
     def extract_document_properties(self) -> Dict[str, Any]:
         """Extract document properties and metadata"""
         doc_props = {}
@@ -713,10 +741,8 @@ class PPTExtractor:
                 # Store image data for media extraction
                 filename = image.filename if hasattr(
                     image, 'filename') else f"image_{len(self.media_files)}"
-                self.media_files[filename] = {
-                    'data': base64.b64encode(image.blob).decode('utf-8'),
-                    'content_type': image.content_type if hasattr(image, 'content_type') else 'image/unknown'
-                }
+                self.media_files[filename] = self._media_blob_entry(
+                    image.blob, image.content_type if hasattr(image, 'content_type') else 'image/unknown')
                 image_info['media_key'] = filename
 
         except Exception as e:
@@ -724,73 +750,237 @@ class PPTExtractor:
 
         return image_info
 
-    def extract_shapes(self) -> List[Dict[str, Any]]:
-        """Extract shape information from all slides"""
+    def extract_shapes(self, workers: int = 1) -> List[Dict[str, Any]]:
+        """Extract shape information from all slides
+
+        With workers > 1 the slides are split across a process pool; each
+        worker opens the package itself and results are merged in slide order.
+        """
+        if workers > 1:
+            return self._extract_shapes_parallel(workers)
+
+        return [self.extract_slide_shapes(slide_idx, slide)
+                for slide_idx, slide in enumerate(self.presentation.slides)]
+
+    def _extract_shapes_parallel(self, workers: int) -> List[Dict[str, Any]]:
+        """Extract slide shapes across a process pool, merged in slide order"""
+        slide_count = len(self.presentation.slides)
+        if slide_count == 0:
+            return []
+
+        workers = min(workers, slide_count)
+        chunk_size = -(-slide_count // workers)
+        slide_chunks = [list(range(start, min(start + chunk_size, slide_count)))
+                        for start in range(0, slide_count, chunk_size)]
+
         shapes_data = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, which is slide order
+            store_root = str(self.media_store.root) if self.media_store else None
+            for chunk_shapes, chunk_media in executor.map(
+                    _extract_slide_chunk, [self.file_path] * len(slide_chunks), slide_chunks,
+                    [store_root] * len(slide_chunks)):
+                shapes_data.extend(chunk_shapes)
+                self.media_files.update(chunk_media)
+
+        return shapes_data
 
+    def extract_slide_shapes(self, slide_idx: int, slide: Slide) -> Dict[str, Any]:
+        """Extract shape information from a single slide"""
         from pptx.enum.shapes import MSO_SHAPE_TYPE
 
-        for slide_idx, slide in enumerate(self.presentation.slides):
-            slide_shapes = []
+        slide_shapes = []
 
-            for shape_idx, shape in enumerate(slide.shapes):
-                shape_info = {
-                    'slide_index': slide_idx,
-                    'shape_index': shape_idx,
-                    'shape_id': shape.shape_id if hasattr(shape, 'shape_id') else None,
-                    'name': shape.name if hasattr(shape, 'name') else None,
-                    'shape_type': self.get_auto_shape_type(shape),
-                    'left': shape.left if hasattr(shape, 'left') else None,
-                    'top': shape.top if hasattr(shape, 'top') else None,
-                    'width': shape.width if hasattr(shape, 'width') else None,
-                    'height': shape.height if hasattr(shape, 'height') else None,
-                    'adjustments': list(shape.adjustments) if hasattr(shape, 'adjustments') and shape.adjustments else None,
-                    'auto_shape_type': self._safe_get_auto_shape_type(shape),
-                    'click_action': self._safe_get_click_action(shape),
-                    'element': self.extract_element_attributes(shape.element) if hasattr(shape, 'element') else None,
-                    'custom_geometry': self.extract_custom_geometry(shape.element) if hasattr(shape, 'element') else None,
-                    'fill': self.extract_fill_properties(shape.fill) if hasattr(shape, 'fill') else None,
-                    'get_or_add_ln': str(shape.get_or_add_ln) if hasattr(shape, 'get_or_add_ln') else None,
-                    'has_chart': shape.has_chart if hasattr(shape, 'has_chart') else None,
-                    'has_table': shape.has_table if hasattr(shape, 'has_table') else None,
-                    'has_text_frame': shape.has_text_frame if hasattr(shape, 'has_text_frame') else None,
-                    'is_placeholder': shape.is_placeholder if hasattr(shape, 'is_placeholder') else None,
-                    'line': self.extract_line_properties(shape.line) if hasattr(shape, 'line') else None,
-                    'ln': str(shape.ln) if hasattr(shape, 'ln') else None,
-                    'part': str(shape.part) if hasattr(shape, 'part') else None,
-                    'placeholder_format': self._safe_extract_placeholder_info(shape),
-                    'rotation': shape.rotation if hasattr(shape, 'rotation') else None,
-                    'shadow': self._safe_extract_shadow_properties(shape),
-                    'text': shape.text if hasattr(shape, 'text') else None,
-                    'text_frame': self.extract_text_formatting(shape.text_frame) if hasattr(shape, 'text_frame') and shape.text_frame else None,
-                }
+        for shape_idx, shape in enumerate(slide.shapes):
+            shape_info = {
+                'slide_index': slide_idx,
+                'shape_index': shape_idx,
+                'shape_id': shape.shape_id if hasattr(shape, 'shape_id') else None,
+                'name': shape.name if hasattr(shape, 'name') else None,
+                'shape_type': self.get_auto_shape_type(shape),
+                'left': shape.left if hasattr(shape, 'left') else None,
+                'top': shape.top if hasattr(shape, 'top') else None,
+                'width': shape.width if hasattr(shape, 'width') else None,
+                'height': shape.height if hasattr(shape, 'height') else None,
+                'adjustments': list(shape.adjustments) if hasattr(shape, 'adjustments') and shape.adjustments else None,
+                'auto_shape_type': self._safe_get_auto_shape_type(shape),
+                'click_action': self._safe_get_click_action(shape),
+                'element': self.extract_element_attributes(shape.element) if hasattr(shape, 'element') else None,
+                'custom_geometry': self.extract_custom_geometry(shape.element) if hasattr(shape, 'element') else None,
+                'fill': self.extract_fill_properties(shape.fill) if hasattr(shape, 'fill') else None,
+                'get_or_add_ln': str(shape.get_or_add_ln) if hasattr(shape, 'get_or_add_ln') else None,
+                'has_chart': shape.has_chart if hasattr(shape, 'has_chart') else None,
+                'has_table': shape.has_table if hasattr(shape, 'has_table') else None,
+                'has_text_frame': shape.has_text_frame if hasattr(shape, 'has_text_frame') else None,
+                'is_placeholder': shape.is_placeholder if hasattr(shape, 'is_placeholder') else None,
+                'line': self.extract_line_properties(shape.line) if hasattr(shape, 'line') else None,
+                'ln': str(shape.ln) if hasattr(shape, 'ln') else None,
+                'part': str(shape.part) if hasattr(shape, 'part') else None,
+                'placeholder_format': self._safe_extract_placeholder_info(shape),
+                'rotation': shape.rotation if hasattr(shape, 'rotation') else None,
+                'shadow': self._safe_extract_shadow_properties(shape),
+                'text': shape.text if hasattr(shape, 'text') else None,
+                'text_frame': self.extract_text_formatting(shape.text_frame) if hasattr(shape, 'text_frame') and shape.text_frame else None,
+            }
 
-                # Extract chart data for chart shapes
-                if shape.shape_type == MSO_SHAPE_TYPE.CHART:
-                    if hasattr(shape, 'chart'):
-                        shape_info['chart_data'] = self.extract_chart_data(
-                            shape.chart)
+            # Extract chart data for chart shapes
+            if shape.shape_type == MSO_SHAPE_TYPE.CHART:
+                if hasattr(shape, 'chart'):
+                    shape_info['chart_data'] = self.extract_chart_data(
+                        shape.chart)
+
+            # Extract table data for table shapes
+            elif shape.shape_type == MSO_SHAPE_TYPE.TABLE:
+                if hasattr(shape, 'table'):
+                    shape_info['table_data'] = self.extract_table_data(
+                        shape.table)
+
+            # Extract image properties for picture shapes
+            elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                if hasattr(shape, 'image'):
+                    shape_info['image_properties'] = self.extract_image_properties(
+                        shape.image)
+
+            slide_shapes.append(shape_info)
+
+        return {
+            'slide_index': slide_idx,
+            'shapes': slide_shapes
+        }
 
-                # Extract table data for table shapes
-                elif shape.shape_type == MSO_SHAPE_TYPE.TABLE:
-                    if hasattr(shape, 'table'):
-                        shape_info['table_data'] = self.extract_table_data(
-                            shape.table)
+    def iter_slide_records(self, include_xml: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream per-slide records from a single pass over the PPTX package
 
-                # Extract image properties for picture shapes
-                elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                    if hasattr(shape, 'image'):
-                        shape_info['image_properties'] = self.extract_image_properties(
-                            shape.image)
+        The ZIP is opened once; each slide part is parsed incrementally with
+        lxml iterparse and shapes are released as soon as they are recorded.
+        Records use the reduced STREAM_SHAPES_SCHEMA, not the extract_shapes
+        schema: there is no fill, line, text_frame or placeholder information
+        and shape_type is the preset geometry name or element tag.
+        """
+        from lxml import etree
 
-                slide_shapes.append(shape_info)
+        p_ns = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+        sp_tree_tag = f'{{{p_ns}}}spTree'
 
-            shapes_data.append({
-                'slide_index': slide_idx,
-                'shapes': slide_shapes
-            })
+        with zipfile.ZipFile(self.file_path, 'r') as zip_ref:
+            slide_parts = self._read_slide_part_names(zip_ref)
 
-        return shapes_data
+            for slide_idx, part_name in enumerate(slide_parts):
+                relationships = self._read_part_relationships(
+                    zip_ref, part_name)
+                slide_record = {
+                    'schema': STREAM_SHAPES_SCHEMA,
+                    'slide_index': slide_idx,
+                    'part_name': part_name,
+                    'relationships': relationships,
+                    'media': sorted(
+                        target for target in relationships.values()
+                        if target.startswith('ppt/media/')),
+                    'shapes': []
+                }
+
+                try:
+                    if include_xml:
+                        slide_record['xml_content'] = zip_ref.read(
+                            part_name).decode('utf-8')
+
+                    depth = 0
+                    sp_tree_depth = None
+                    with zip_ref.open(part_name) as slide_stream:
+                        for event, element in etree.iterparse(
+                                slide_stream, events=('start', 'end')):
+                            if event == 'start':
+                                depth += 1
+                                if element.tag == sp_tree_tag and sp_tree_depth is None:
+                                    sp_tree_depth = depth
+                                continue
+
+                            # Direct children of spTree are the slide's shapes
+                            if sp_tree_depth is not None and depth == sp_tree_depth + 1:
+                                if etree.QName(element).localname not in ('nvGrpSpPr', 'grpSpPr'):
+                                    slide_record['shapes'].append(self._extract_streamed_shape(
+                                        element, slide_idx, len(slide_record['shapes'])))
+                                element.clear()
+                                while element.getprevious() is not None:
+                                    del element.getparent()[0]
+                            elif element.tag == sp_tree_tag:
+                                sp_tree_depth = None
+                            depth -= 1
+
+                except Exception as e:
+                    slide_record['error'] = f"Could not stream slide part {part_name}: {str(e)}"
+
+                yield slide_record
+
+    def _read_slide_part_names(self, zip_ref: zipfile.ZipFile) -> List[str]:
+        """Resolve slide part names in presentation order from presentation.xml"""
+        ns = {
+            'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+            'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+        }
+        relationships = self._read_part_relationships(
+            zip_ref, 'ppt/presentation.xml')
+        presentation_root = ET.fromstring(zip_ref.read('ppt/presentation.xml'))
+
+        slide_parts = []
+        for sld_id in presentation_root.findall('./p:sldIdLst/p:sldId', ns):
+            r_id = sld_id.get(f"{{{ns['r']}}}id")
+            if r_id in relationships:
+                slide_parts.append(relationships[r_id])
+        return slide_parts
+
+    def _read_part_relationships(self, zip_ref: zipfile.ZipFile, part_name: str) -> Dict[str, str]:
+        """Read a part's relationships as rId -> package-absolute target"""
+        part_dir, part_file = part_name.rsplit('/', 1)
+        rels_name = f"{part_dir}/_rels/{part_file}.rels"
+
+        relationships = {}
+        try:
+            rels_root = ET.fromstring(zip_ref.read(rels_name))
+        except KeyError:
+            return relationships
+
+        for rel in rels_root:
+            target = rel.get('Target', '')
+            if rel.get('TargetMode') != 'External':
+                target = posixpath.normpath(posixpath.join(part_dir, target))
+            relationships[rel.get('Id')] = target
+        return relationships
+
+    def _extract_streamed_shape(self, element, slide_idx: int, shape_idx: int) -> Dict[str, Any]:
+        """Build a shape record from a raw spTree child element"""
+        ns = {
+            'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+            'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'
+        }
+        c_nv_pr = element.find('./*/p:cNvPr', ns)
+        xfrm = element.find('./p:spPr/a:xfrm', ns)
+        if xfrm is None:
+            xfrm = element.find('./p:grpSpPr/a:xfrm', ns)
+        if xfrm is None:
+            xfrm = element.find('./p:xfrm', ns)
+        off = xfrm.find('./a:off', ns) if xfrm is not None else None
+        ext = xfrm.find('./a:ext', ns) if xfrm is not None else None
+        prst_geom = element.find('./p:spPr/a:prstGeom', ns)
+
+        shape_id = c_nv_pr.get('id') if c_nv_pr is not None else None
+        tx_body = element.find('./p:txBody', ns)
+
+        return {
+            'slide_index': slide_idx,
+            'shape_index': shape_idx,
+            'shape_id': int(shape_id) if shape_id and shape_id.isdigit() else None,
+            'name': c_nv_pr.get('name') if c_nv_pr is not None else None,
+            'shape_type': self.map_geometry_to_shape_name(prst_geom.get('prst')) if prst_geom is not None else element.tag.split('}')[-1],
+            'left': int(off.get('x')) if off is not None else None,
+            'top': int(off.get('y')) if off is not None else None,
+            'width': int(ext.get('cx')) if ext is not None else None,
+            'height': int(ext.get('cy')) if ext is not None else None,
+            'rotation': int(xfrm.get('rot', 0)) / 60000.0 if xfrm is not None else None,
+            'element': self.extract_element_attributes(element),
+            'custom_geometry': self.extract_custom_geometry(element),
+            'text': '\n'.join(''.join(t.text or '' for t in para.iterfind('.//a:t', ns)) for para in tx_body.iterfind('./a:p', ns)) if tx_body is not None else None,
+        }
 
     def extract_layouts(self) -> List[Dict[str, Any]]:
         """Extract layout information from the presentation"""
@@ -1313,6 +1503,36 @@ class PPTExtractor:
             json.dump(data, f, indent=2, ensure_ascii=False)
         print(f"Data saved to: {output_file}")
 
+    def save_to_container(self, output_file: str, slides: Iterable[Dict[str, Any]],
+                          sections: Dict[str, Any], schema: Optional[str] = None) -> Dict[str, Any]:
+        """Save slides and named sections to a binary container (see ppt_container)"""
+        return write_container(output_file, slides, sections, schema=schema)
+
+    def save_records_to_json(self, records: Iterable[Dict[str, Any]], output_file: str) -> int:
+        """Write a stream of records as a JSON array without materializing it"""
+        count = 0
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for record in records:
+                f.write(',\n' if count else '\n')
+                json.dump(record, f, ensure_ascii=False)
+                count += 1
+            f.write('\n]\n')
+        print(f"Data saved to: {output_file}")
+        return count
+
+
+def _extract_slide_chunk(file_path: str, slide_indices: List[int], media_store_root: Optional[str] = None):
+    """Process-pool worker: open the package and extract a range of slides"""
+    media_store = MediaStore(media_store_root) if media_store_root else None
+    extractor = PPTExtractor(file_path, media_store=media_store)
+    slides = extractor.presentation.slides
+    chunk_shapes = [extractor.extract_slide_shapes(slide_idx, slides[slide_idx])
+                    for slide_idx in slide_indices]
+    # python-pptx Length subclasses (Pt, Centipoints, ...) do not survive
+    # pickling, so hand back plain JSON types
+    return json.loads(json.dumps(chunk_shapes)), extractor.media_files
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -1323,10 +1543,19 @@ def main():
                         help='Output directory for JSON files (default: current directory)')
     parser.add_argument('--extract-media', action='store_true',
                         help='Extract and embed media files as base64 data')
+    parser.add_argument('--media-store',
+                        help='Content-addressed media store directory; media JSON then holds SHA-256 digests instead of base64 data')
     parser.add_argument('--detailed-text', action='store_true',
                         help='Extract detailed text formatting information')
     parser.add_argument('--include-properties', action='store_true',
                         help='Extract document properties and metadata')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream slide shapes in a single pass over the package into <name>_stream_shapes.json '
+                             '(reduced stream-v1 schema, not loadable by ppt_generator; shapes and summary only)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes for shape extraction (default: 1)')
+    parser.add_argument('--format', choices=['json', 'binary'], default='json',
+                        help='Output format: separate JSON files or one indexed binary container (default: json)')
 
     args = parser.parse_args()
 
@@ -1350,11 +1579,89 @@ def main():
 
     try:
         # Initialize extractor
-        extractor = PPTExtractor(args.input_file)
+        media_store = MediaStore(args.media_store) if args.media_store else None
+        extractor = PPTExtractor(args.input_file, media_store=media_store)
+
+        if args.stream:
+            print("Streaming slide shapes...")
+            stream_stats = {'total_shapes': 0}
+
+            def counted_records():
+                for record in extractor.iter_slide_records():
+                    stream_stats['total_shapes'] += len(record['shapes'])
+                    yield record
+
+            if args.format == 'binary':
+                shapes_output = output_dir / f"{base_name}_stream.pptxbin"
+                slide_count = len(extractor.save_to_container(
+                    shapes_output, counted_records(), {}, schema=STREAM_SHAPES_SCHEMA)['slides'])
+            else:
+                shapes_output = output_dir / f"{base_name}_stream_shapes.json"
+                slide_count = extractor.save_records_to_json(
+                    counted_records(), shapes_output)
+
+            summary_data = {
+                'file_path': str(input_path),
+                'base_name': base_name,
+                'extraction_mode': 'stream',
+                'shapes_schema': STREAM_SHAPES_SCHEMA,
+                'extraction_files': {
+                    'container' if args.format == 'binary' else 'shapes': str(shapes_output)
+                },
+                'statistics': {
+                    'slide_count': slide_count,
+                    'total_shapes': stream_stats['total_shapes']
+                }
+            }
+            summary_output = output_dir / f"{base_name}_summary.json"
+            extractor.save_to_json(summary_data, summary_output)
+
+            print(f"\nStreaming extraction completed successfully!")
+            print(f"  - Shapes: {shapes_output}")
+            print(f"  - Summary: {summary_output}")
+            print(f"  - Slides: {slide_count}")
+            print(f"  - Total shapes: {stream_stats['total_shapes']}")
+            return
+
+        if args.format == 'binary':
+            print("Extracting shapes, layouts, theme, media and properties...")
+            shapes_data = extractor.extract_shapes(workers=args.workers)
+            container_output = output_dir / f"{base_name}.pptxbin"
+            extractor.save_to_container(container_output, shapes_data, {
+                'layouts': extractor.extract_layouts(),
+                'theme': extractor.extract_theme(),
+                'media': extractor.extract_media_files(),
+                'properties': extractor.extract_document_properties()
+            })
+
+            summary_data = {
+                'file_path': str(input_path),
+                'base_name': base_name,
+                'extraction_files': {
+                    'container': str(container_output)
+                },
+                'media_store': str(media_store.root) if media_store else None,
+                'statistics': {
+                    'slide_count': len(extractor.presentation.slides),
+                    'layout_count': len(extractor.presentation.slide_layouts),
+                    'media_file_count': len(extractor.media_files),
+                    'total_shapes': sum(len(slide_data['shapes']) for slide_data in shapes_data)
+                }
+            }
+            summary_output = output_dir / f"{base_name}_summary.json"
+            extractor.save_to_json(summary_data, summary_output)
+
+            print(f"\nExtraction completed successfully!")
+            print(f"  - Container: {container_output}")
+            print(f"  - Summary: {summary_output}")
+            print(f"  - Slides: {summary_data['statistics']['slide_count']}")
+            print(
+                f"  - Total shapes: {summary_data['statistics']['total_shapes']}")
+            return
 
         # Extract shapes
         print("Extracting shapes...")
-        shapes_data = extractor.extract_shapes()
+        shapes_data = extractor.extract_shapes(workers=args.workers)
         shapes_output = output_dir / f"{base_name}_shapes.json"
         extractor.save_to_json(shapes_data, shapes_output)
 
@@ -1393,6 +1700,7 @@ def main():
                 'media': str(media_output),
                 'properties': str(doc_props_output)
             },
+            'media_store': str(media_store.root) if media_store else None,
             'statistics': {
                 'slide_count': len(extractor.presentation.slides),
                 'layout_count': len(extractor.presentation.slide_layouts),
@@ -3,8 +3,13 @@
 import sys
 import json
 import argparse
-import base64
 import io
+import time
+import contextlib
+import functools
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
@@ -13,21 +18,73 @@ from pptx.enum.text import PP_ALIGN, MSO_ANCHOR, MSO_VERTICAL_ANCHOR
 from pptx.enum.dml import MSO_THEME_COLOR, MSO_FILL_TYPE, MSO_COLOR_TYPE, MSO_PATTERN_TYPE
 from pptx.enum.chart import XL_CHART_TYPE
 from pptx.dml.color import RGBColor
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 import xml.etree.ElementTree as ET
+from media_store import MediaStore, read_media_entry
+from ppt_container import STREAM_SHAPES_SCHEMA, ContainerReader, LazyJsonSlides, is_container
+from package_cache import PackageManifest, copy_raw_member, digest_bytes, digest_file, digest_json
+
+TEMPLATE_FILE = 'blank.pptx'
+
+# Template bytes by path, read once per process
+_template_cache: Dict[str, bytes] = {}
+
+
+def _read_template(template_file: str) -> bytes:
+    """Return the bytes of a template package, reading it only on first use"""
+    if template_file not in _template_cache:
+        with open(template_file, 'rb') as f:
+            _template_cache[template_file] = f.read()
+    return _template_cache[template_file]
 
 
 class PPTGenerator:
     """Enhanced PowerPoint generator with improved fidelity and feature support"""
 
-    def __init__(self):
-        self.presentation = Presentation('blank.pptx')
+    # Shape and chart type mappings are read-only, so one copy is shared by
+    # every generator in the process
+    _mapping_cache = None
+
+    def __init__(self, media_store: Optional[MediaStore] = None, template_file: str = TEMPLATE_FILE):
+        self.template_file = template_file
+        self.presentation = Presentation(io.BytesIO(_read_template(template_file)))
         self.shapes_data = []
         self.layouts_data = []
         self.theme_data = {}
         self.media_cache = {}  # Cache for embedded media
-        self.shape_type_mapping = self._init_shape_type_mapping()
-        self.chart_type_mapping = self._init_chart_type_mapping()
+        self.media_store = media_store  # Resolves digest-only media entries
+        self.container = None  # Open ContainerReader when loading a binary container
+        self.incremental = False  # Reuse unchanged output from a previous build
+        self.previous_manifest = None  # PackageManifest of that build, if still valid
+        self.input_fingerprint = ''
+        self.slide_records = []  # Fingerprint records for the slides generated in this run
+        self.reused_parts = set()  # Slide parts copied from the previous build
+        if PPTGenerator._mapping_cache is None:
+            PPTGenerator._mapping_cache = (self._init_shape_type_mapping(),
+                                           self._init_chart_type_mapping())
+        self.shape_type_mapping, self.chart_type_mapping = PPTGenerator._mapping_cache
+
+    @classmethod
+    def warm_caches(cls, template_file: str = TEMPLATE_FILE):
+        """Load the template and build the type mappings ahead of the first deck"""
+        _read_template(template_file)
+        if cls._mapping_cache is None:
+            cls(template_file=template_file)
+
+    def close(self):
+        """Release files held open by lazily loaded slide data"""
+        if hasattr(self.shapes_data, 'close'):
+            self.shapes_data.close()
+            self.shapes_data = []
+        if self.container is not None:
+            self.container.close()
+            self.container = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _init_shape_type_mapping(self) -> Dict[str, MSO_SHAPE]:
         """Initialize comprehensive shape type mapping"""
@@ -300,13 +357,32 @@ class PPTGenerator:
             'SURFACE_TOP_VIEW_WIREFRAME': XL_CHART_TYPE.SURFACE_TOP_VIEW_WIREFRAME,
         }
 
-    def load_json_files(self, shapes_file: str, layouts_file: str, theme_file: str,
-                        media_file: Optional[str] = None, properties_file: Optional[str] = None):
-        """Load data from JSON files including optional enhanced extractor files"""
+    def load_json_files(self, shapes_file: str, layouts_file: Optional[str] = None, theme_file: Optional[str] = None,
+                        media_file: Optional[str] = None, properties_file: Optional[str] = None,
+                        lazy_shapes: bool = False):
+        """Load data from JSON files including optional enhanced extractor files
+
+        With lazy_shapes the shapes file is only indexed here and each slide is
+        parsed when generation reaches it; the file stays mapped until close(),
+        so use the generator as a context manager. shapes_file may instead be a
+        binary container written with ppt_extractor.py --format binary, which
+        is held open the same way.
+        """
+        if is_container(shapes_file):
+            return self.load_container(shapes_file)
+
         try:
-            with open(shapes_file, 'r', encoding='utf-8') as f:
-                self.shapes_data = json.load(f)
+            if lazy_shapes:
+                self.shapes_data = LazyJsonSlides(shapes_file)
+            else:
+                with open(shapes_file, 'r', encoding='utf-8') as f:
+                    self.shapes_data = json.load(f)
+        except Exception as e:
+            raise Exception(f"Error loading JSON files: {str(e)}")
 
+        self._check_shapes_schema(shapes_file)
+
+        try:
             with open(layouts_file, 'r', encoding='utf-8') as f:
                 self.layouts_data = json.load(f)
 
@@ -340,6 +416,89 @@ class PPTGenerator:
         except Exception as e:
             raise Exception(f"Error loading JSON files: {str(e)}")
 
+    def load_container(self, container_file: str):
+        """Load extracted data from a binary container, decoding slides on demand"""
+        try:
+            self.container = ContainerReader(container_file)
+            self.shapes_data = self.container.slides
+            self.layouts_data = self.container.section('layouts', [])
+            self.theme_data = self.container.section('theme', {})
+
+            media_data = self.container.section('media', {})
+            for category in ['images', 'audio', 'video', 'embedded_objects', 'fonts']:
+                if category in media_data:
+                    self.media_cache.update(media_data[category])
+
+            self.document_properties = self.container.section('properties', {})
+
+            print(f"Loaded {len(self.shapes_data)} slide(s) with shapes (lazy)")
+            print(f"Loaded {len(self.layouts_data)} layout(s)")
+            print(
+                f"Loaded theme: {self.theme_data.get('theme_name', 'Unknown')}")
+            if self.media_cache:
+                print(f"Loaded {len(self.media_cache)} media file(s)")
+            if self.document_properties:
+                print(f"Loaded document properties")
+
+        except Exception as e:
+            raise Exception(f"Error loading container file: {str(e)}")
+
+        self._check_shapes_schema(container_file)
+
+    def _check_shapes_schema(self, shapes_file: str):
+        """Refuse ppt_extractor.py --stream output, which lacks most of what generation needs"""
+        schema = self.container.schema if self.container is not None else None
+        if schema is None and len(self.shapes_data) and isinstance(self.shapes_data[0], dict):
+            schema = self.shapes_data[0].get('schema')
+        if schema == STREAM_SHAPES_SCHEMA:
+            self.close()
+            raise ValueError(
+                f"{shapes_file} holds {STREAM_SHAPES_SCHEMA} records from ppt_extractor.py --stream, "
+                f"which have no fill, line, text frame or placeholder data; "
+                f"extract without --stream to generate a presentation")
+
+    def enable_incremental(self, output_file: str):
+        """Reuse unchanged slides and package members from a previous build of output_file
+
+        Must be called after the input files are loaded. A previous build is
+        only reused when the template, layouts, theme, media and properties
+        fingerprint still matches; otherwise every slide is regenerated.
+        """
+        self.incremental = True
+        self.input_fingerprint = self._input_fingerprint()
+
+        manifest = PackageManifest.load(output_file)
+        if manifest is None:
+            print("No previous build fingerprints found, generating all slides")
+        elif manifest.inputs != self.input_fingerprint:
+            print("Template, layouts, theme, media or properties changed, generating all slides")
+            manifest = None
+        self.previous_manifest = manifest
+
+    def _input_fingerprint(self) -> str:
+        """Fingerprint everything that affects more than one slide"""
+        return digest_json({
+            'generator': digest_file(__file__),
+            'template': digest_bytes(_read_template(self.template_file)),
+            'layouts': self.layouts_data,
+            'theme': self.theme_data,
+            'media': self.media_cache,
+            'properties': getattr(self, 'document_properties', {})
+        })
+
+    def _previous_slide_record(self, position: int, fingerprint: str, part_name: str) -> Optional[Dict[str, Any]]:
+        """Return the previous build's record for a slide if it can be reused as is"""
+        if self.previous_manifest is None or position >= len(self.previous_manifest.slides):
+            return None
+
+        record = self.previous_manifest.slides[position]
+        # Slides that needed python-pptx fallback shapes may own extra parts
+        # (pictures, charts), so only self-contained slide XML is reused
+        if (record.get('fingerprint') == fingerprint and record.get('part') == part_name
+                and record.get('reusable')):
+            return record
+        return None
+
     def emu_to_inches(self, emu_value: int) -> float:
         """Convert EMU (English Metric Units) to inches"""
         return emu_value / 914400.0
@@ -1625,13 +1784,10 @@ class PPTGenerator:
         """Generate slides with enhanced fidelity"""
         self.apply_enhanced_theme()
 
-        for slide_data in self.shapes_data:
+        for position, slide_data in enumerate(self.shapes_data):
             slide_index = slide_data['slide_index']
             shapes = slide_data['shapes']
 
-            print(
-                f"Creating slide {slide_index + 1} with {len(shapes)} shapes...")
-
             # Check if we need to use existing slide or create new one
             if len(self.presentation.slides) > slide_index:
                 # Use existing slide from template
@@ -1642,19 +1798,49 @@ class PPTGenerator:
                 blank_layout = self.presentation.slide_layouts[-1]
                 slide = self.presentation.slides.add_slide(blank_layout)
 
+            if self.incremental:
+                fingerprint = digest_json(slide_data)
+                part_name = slide.part.partname.lstrip('/')
+                previous_record = self._previous_slide_record(
+                    position, fingerprint, part_name)
+                if previous_record is not None:
+                    # The slide part is copied from the previous build on save
+                    self.slide_records.append(previous_record)
+                    self.reused_parts.add(part_name)
+                    print(f"Reusing unchanged slide {slide_index + 1}")
+                    continue
+
+            print(
+                f"Creating slide {slide_index + 1} with {len(shapes)} shapes...")
+
             # Generate slide with exact XML structure
-            self.recreate_slide_xml_structure(slide, shapes)
+            self_contained = self.recreate_slide_xml_structure(slide, shapes)
 
             # Fix slide group properties to match original format
             self.fix_slide_group_properties(slide)
 
+            if self.incremental:
+                self.slide_records.append({
+                    'fingerprint': fingerprint,
+                    'part': part_name,
+                    'reusable': self_contained
+                })
+
             print(f"  Created {len(shapes)} shapes on slide {slide_index + 1}")
 
-    def recreate_slide_xml_structure(self, slide, shapes):
-        """Recreate slide XML structure exactly matching original"""
+        if self.reused_parts:
+            print(f"Reused {len(self.reused_parts)} unchanged slide(s)")
+
+    def recreate_slide_xml_structure(self, slide, shapes) -> bool:
+        """Recreate slide XML structure exactly matching original
+
+        Returns True when the slide was built purely from its XML, without
+        python-pptx fallback shapes.
+        """
         try:
             # Use direct XML replacement approach
-            self.replace_slide_xml_content(slide, shapes)
+            replaced = self.replace_slide_xml_content(slide, shapes)
+            return replaced and not self.fallback_shapes
 
         except Exception as e:
             print(f"Warning: Could not recreate XML structure: {str(e)}")
@@ -1667,8 +1853,9 @@ class PPTGenerator:
                 except Exception as shape_error:
                     print(
                         f"Warning: Could not create shape {shape_info.get('name', 'Unknown')}: {str(shape_error)}")
+            return False
 
-    def replace_slide_xml_content(self, slide, shapes):
+    def replace_slide_xml_content(self, slide, shapes) -> bool:
         """Replace entire slide XML content with reconstructed version"""
         try:
             from lxml import etree
@@ -1714,8 +1901,11 @@ class PPTGenerator:
                         print(
                             f"  Warning: Could not create fallback shape {shape_info.get('name', 'unknown')}: {str(fallback_error)}")
 
+            return True
+
         except Exception as e:
             print(f"Warning: Could not replace slide XML content: {str(e)}")
+            return False
 
     def build_complete_slide_xml(self, shapes):
         """Build complete slide XML from shape data"""
@@ -2236,12 +2426,10 @@ class PPTGenerator:
                                         break
 
             if media_info:
-                image_data_b64 = media_info.get('data')
-
-                if image_data_b64:
-                    # Decode base64 image data
-                    image_data = base64.b64decode(image_data_b64)
+                # Inline base64 data or a digest into the media store
+                image_data = read_media_entry(media_info, self.media_store)
 
+                if image_data:
                     # Create BytesIO stream for python-pptx
                     image_stream = io.BytesIO(image_data)
 
@@ -2306,420 +2494,379 @@ class PPTGenerator:
         # Apply background images using python-pptx API before saving
         self.apply_background_images()
 
-        self.presentation.save(output_file)
-
-        # Post-process XML to match original format
-        self.post_process_xml_format(output_file)
+        package_buffer = io.BytesIO()
+        self.presentation.save(package_buffer)
 
-        # Add media and font files to the PPTX structure
-        self.embed_media_and_fonts(output_file)
+        # Single-line slide XML plus media/font embedding in one pass from
+        # the in-memory package to the output file
+        if self.incremental:
+            self._save_incremental(package_buffer.getvalue(), output_file)
+        else:
+            self.rewrite_package(package_buffer.getvalue(), output_file)
 
         print(f"\nPresentation saved to: {output_file}")
         print(f"Total slides: {len(self.presentation.slides)}")
 
-    def copy_original_layouts(self, output_file: str):
-        """Copy original slide layout files to preserve background images and structure"""
-        try:
-            import zipfile
-            import tempfile
-            import shutil
-            import os
+    def _save_incremental(self, package: bytes, output_file: str):
+        """Write the package reusing unchanged parts of the previous build, then record fingerprints"""
+        import os
+        import zipfile
+
+        overrides = {}
+        previous_members = None
+        if self.previous_manifest is not None:
+            previous_members = self.previous_manifest.members
+            with zipfile.ZipFile(output_file, 'r') as zip_prev:
+                for part_name in self.reused_parts:
+                    overrides[part_name] = zip_prev.read(part_name)
+
+        member_digests = self.rewrite_package(package, output_file, overrides=overrides,
+                                              previous_members=previous_members or {})
+
+        manifest_path = PackageManifest.path_for(output_file)
+        if member_digests is None:
+            # The package was written without transformations; never let a
+            # later run trust fingerprints that do not describe it
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+            return
 
-            # Determine original file path
-            original_file = None
-            if 'sample2-1' in output_file:
-                original_file = 'sample_parts/sample2-1.pptx'
-            elif 'sample1-2' in output_file:
-                original_file = 'sample_parts/sample1-2.pptx'
-            elif 'sample1' in output_file:
-                original_file = 'sample_parts/sample1.pptx'
-            elif 'sample3' in output_file:
-                original_file = 'sample_parts/sample3.pptx'
+        PackageManifest(self.input_fingerprint, self.slide_records,
+                        member_digests).save(output_file)
 
-            if not original_file or not os.path.exists(original_file):
-                return
+    def rewrite_package(self, source, output_file: str, overrides: Optional[Dict[str, bytes]] = None,
+                        format_slides: bool = True, embed_media: bool = True,
+                        previous_members: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+        """Apply post-save transformations in one streaming pass from input ZIP to output ZIP
 
-            # Extract current PPTX
-            temp_dir = tempfile.mkdtemp()
-            extract_dir = os.path.join(temp_dir, 'current_pptx')
+        source is a PPTX path or its bytes. overrides replaces (or adds) whole
+        package members. With format_slides, slide XML is written as a single
+        line; with embed_media, cached media/fonts are added and content types
+        and slide/layout relationships are updated to reference them.
 
-            with zipfile.ZipFile(output_file, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
+        With previous_members (member name -> content digest of the existing
+        output_file), members whose final contents are unchanged are copied
+        from output_file still compressed, and the new digests are returned.
+        """
+        import os
 
-            # Extract original PPTX layouts
-            original_temp_dir = os.path.join(temp_dir, 'original_pptx')
-            with zipfile.ZipFile(original_file, 'r') as zip_ref:
-                zip_ref.extractall(original_temp_dir)
+        previous_zip = None
+        temp_path = output_file + '.tmp'
+        try:
+            import zipfile
 
-            # Copy layout files
-            original_layouts_dir = os.path.join(
-                original_temp_dir, 'ppt', 'slideLayouts')
-            current_layouts_dir = os.path.join(
-                extract_dir, 'ppt', 'slideLayouts')
+            if isinstance(source, (bytes, bytearray)):
+                source = io.BytesIO(source)
 
+            track_members = previous_members is not None
+            if previous_members and os.path.exists(output_file):
+                previous_zip = zipfile.ZipFile(output_file, 'r')
+            member_digests = {}
             copied_count = 0
-            if os.path.exists(original_layouts_dir) and os.path.exists(current_layouts_dir):
-                # Copy XML files
-                for layout_file in os.listdir(original_layouts_dir):
-                    if layout_file.endswith('.xml'):
-                        original_path = os.path.join(
-                            original_layouts_dir, layout_file)
-                        target_path = os.path.join(
-                            current_layouts_dir, layout_file)
-                        shutil.copy2(original_path, target_path)
-                        copied_count += 1
 
-                # Copy relationship files
-                original_rels = os.path.join(original_layouts_dir, '_rels')
-                current_rels = os.path.join(current_layouts_dir, '_rels')
+            members = dict(overrides or {})
+            embed_media = embed_media and bool(self.media_cache)
+            media_members = self._media_package_members() if embed_media else {}
+            members.update(media_members)
+
+            counts = {'content_types': 0, 'relationships': 0}
+
+            with zipfile.ZipFile(source, 'r') as zip_in:
+                source_names = zip_in.namelist()
+                output_names = source_names + \
+                    [name for name in members if name not in set(source_names)]
+
+                def read_member(name: str) -> bytes:
+                    if name in members:
+                        return members[name]
+                    return zip_in.read(name)
+
+                with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+                    for name in output_names:
+                        data = read_member(name)
+                        data = self._transform_package_member(
+                            name, data, read_member, format_slides, embed_media, counts)
+
+                        if not track_members:
+                            zip_out.writestr(name, data)
+                            continue
+
+                        digest = digest_bytes(data)
+                        member_digests[name] = digest
+                        if (previous_zip is not None and previous_members.get(name) == digest
+                                and name in previous_zip.NameToInfo):
+                            copy_raw_member(previous_zip, zip_out, name)
+                            copied_count += 1
+                        else:
+                            zip_out.writestr(name, data)
 
-                if os.path.exists(original_rels) and os.path.exists(current_rels):
-                    for rel_file in os.listdir(original_rels):
-                        if rel_file.endswith('.xml.rels'):
-                            original_rel_path = os.path.join(
-                                original_rels, rel_file)
-                            target_rel_path = os.path.join(
-                                current_rels, rel_file)
-                            shutil.copy2(original_rel_path, target_rel_path)
+            if previous_zip is not None:
+                previous_zip.close()
+            os.replace(temp_path, output_file)
 
-            # Recreate the PPTX file
+            if counts['content_types'] > 0:
+                print(f"Added {counts['content_types']} content type definition(s)")
+            if counts['relationships'] > 0:
+                print(
+                    f"Added {counts['relationships']} relationship definition(s)")
+            if media_members:
+                print(
+                    f"Successfully embedded {len(media_members)} media/font file(s)")
             if copied_count > 0:
-                new_pptx_path = output_file + '.tmp'
-                with zipfile.ZipFile(new_pptx_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-                    for root, dirs, files in os.walk(extract_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, extract_dir)
-                            arcname = arcname.replace(os.sep, '/')
-                            zip_out.write(file_path, arcname)
-
-                # Replace original file
-                shutil.move(new_pptx_path, output_file)
                 print(
-                    f"Preserved {copied_count} original layout file(s) with background images")
+                    f"Copied {copied_count} unchanged package member(s) from the previous build")
 
-            # Cleanup
-            shutil.rmtree(temp_dir)
+            return member_digests if track_members else None
 
         except Exception as e:
-            print(f"Warning: Could not copy original layouts: {str(e)}")
+            print(f"Warning: Could not rewrite package: {str(e)}")
+            if previous_zip is not None:
+                previous_zip.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            # Never leave the caller without a package: fall back to the
+            # untransformed source when it was handed over in memory
+            if isinstance(source, io.BytesIO):
+                with open(output_file, 'wb') as f:
+                    f.write(source.getvalue())
+            return None
 
-    def post_process_xml_format(self, pptx_file: str):
-        """Post-process the PPTX file to ensure XML matches original format"""
-        try:
-            import zipfile
-            import tempfile
-            import shutil
-            import os
+    def _transform_package_member(self, name: str, data: bytes, read_member, format_slides: bool,
+                                  embed_media: bool, counts: Dict[str, int]) -> bytes:
+        """Apply the post-save transformations that concern a single package member"""
+        import re
 
-            # Extract PPTX to temp directory
-            temp_dir = tempfile.mkdtemp()
-            extract_dir = os.path.join(temp_dir, 'pptx_contents')
+        try:
+            if format_slides and re.fullmatch(r'ppt/slides/[^/]+\.xml', name):
+                return self._single_line_xml(data.decode('utf-8')).encode('utf-8')
+
+            if not embed_media:
+                return data
+
+            if name == '[Content_Types].xml':
+                content, added = self._add_media_content_types(
+                    data.decode('utf-8'))
+                counts['content_types'] += added
+                return content.encode('utf-8')
+
+            slide_rels = re.fullmatch(r'ppt/slides/_rels/slide(\w*)\.xml\.rels', name)
+            layout_rels = re.fullmatch(
+                r'ppt/slideLayouts/_rels/slideLayout(\w*)\.xml\.rels', name)
+
+            if slide_rels:
+                file_num = slide_rels.group(1)
+                slide_index = int(file_num) - 1 if file_num.isdigit() else 0
+                referenced_rids = self._slide_referenced_rids(slide_index)
+            elif layout_rels:
+                layout_name = f'ppt/slideLayouts/slideLayout{layout_rels.group(1)}.xml'
+                try:
+                    layout_xml = read_member(layout_name).decode('utf-8')
+                except KeyError:
+                    return data
+                referenced_rids = self._layout_referenced_rids(layout_xml)
+            else:
+                return data
 
-            with zipfile.ZipFile(pptx_file, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
+            content, added = self._add_missing_relationships(
+                data.decode('utf-8'), referenced_rids)
+            counts['relationships'] += added
+            return content.encode('utf-8')
 
-            # Process all slide XML files
-            slides_dir = os.path.join(extract_dir, 'ppt', 'slides')
-            if os.path.exists(slides_dir):
-                for slide_file in os.listdir(slides_dir):
-                    if slide_file.endswith('.xml'):
-                        slide_path = os.path.join(slides_dir, slide_file)
-                        self.format_xml_as_single_line(slide_path)
+        except Exception as e:
+            print(f"Warning: Could not transform package member {name}: {str(e)}")
+            return data
 
-            # Recreate PPTX file
-            new_pptx_path = pptx_file + '.tmp'
-            with zipfile.ZipFile(new_pptx_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-                for root, dirs, files in os.walk(extract_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, extract_dir)
-                        zip_out.write(file_path, arcname)
+    def _media_package_members(self) -> Dict[str, bytes]:
+        """Map cached media and fonts to their package member names"""
+        import os
 
-            # Replace original file
-            shutil.move(new_pptx_path, pptx_file)
+        members = {}
+        for file_path, file_info in self.media_cache.items():
+            # Directory entries carry no content
+            if file_path.endswith('/'):
+                continue
+            if 'data' in file_info or 'sha256' in file_info:
+                try:
+                    # Decode base64 data or read the blob from the media store
+                    file_data = read_media_entry(file_info, self.media_store)
+
+                    # Determine target path
+                    if file_path.startswith('ppt/'):
+                        target_path = file_path
+                    # Handle cases where the path doesn't start with ppt/
+                    elif 'font' in file_path.lower() or file_path.endswith('.fntdata'):
+                        target_path = f"ppt/fonts/{os.path.basename(file_path)}"
+                    else:
+                        target_path = f"ppt/media/{os.path.basename(file_path)}"
 
-            # Cleanup
-            shutil.rmtree(temp_dir)
+                    members[target_path] = file_data
 
-        except Exception as e:
-            print(f"Warning: Could not post-process XML format: {str(e)}")
+                except Exception as e:
+                    print(
+                        f"Warning: Could not embed file {file_path}: {str(e)}")
 
-    def embed_media_and_fonts(self, pptx_file: str):
-        """Embed media and font files into the PPTX structure"""
-        if not self.media_cache:
-            return
+        return members
 
+    def copy_original_layouts(self, output_file: str):
+        """Copy original slide layout files to preserve background images and structure"""
         try:
             import zipfile
-            import tempfile
-            import shutil
             import os
+            import re
 
-            # Extract PPTX to temp directory
-            temp_dir = tempfile.mkdtemp()
-            extract_dir = os.path.join(temp_dir, 'pptx_contents')
-
-            with zipfile.ZipFile(pptx_file, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-
-            # Create media and fonts directories
-            ppt_dir = os.path.join(extract_dir, 'ppt')
-            media_dir = os.path.join(ppt_dir, 'media')
-            fonts_dir = os.path.join(ppt_dir, 'fonts')
-
-            # Create directories if they don't exist
-            os.makedirs(media_dir, exist_ok=True)
-            os.makedirs(fonts_dir, exist_ok=True)
-
-            # Embed media and font files
-            embedded_count = 0
-            for file_path, file_info in self.media_cache.items():
-                if 'data' in file_info:
-                    try:
-                        # Decode base64 data
-                        file_data = base64.b64decode(file_info['data'])
-
-                        # Determine target path
-                        if file_path.startswith('ppt/'):
-                            target_path = os.path.join(
-                                extract_dir, file_path.replace('/', os.sep))
-                        else:
-                            # Handle cases where the path doesn't start with ppt/
-                            if 'font' in file_path.lower() or file_path.endswith('.fntdata'):
-                                target_path = os.path.join(
-                                    fonts_dir, os.path.basename(file_path))
-                            else:
-                                target_path = os.path.join(
-                                    media_dir, os.path.basename(file_path))
-
-                        # Create directory if needed
-                        os.makedirs(os.path.dirname(
-                            target_path), exist_ok=True)
-
-                        # Write file
-                        with open(target_path, 'wb') as f:
-                            f.write(file_data)
-
-                        embedded_count += 1
-
-                    except Exception as e:
-                        print(
-                            f"Warning: Could not embed file {file_path}: {str(e)}")
-
-            # Update Content_Types.xml to include media file types
-            self.update_content_types(extract_dir)
-
-            # Update relationship files to include media references
-            self.update_relationship_files(extract_dir)
-
-            # For now, skip layout preservation as it needs better input tracking
-            # self.preserve_original_layouts(extract_dir)
-
-            # Recreate PPTX file with embedded media and fonts
-            new_pptx_path = pptx_file + '.tmp'
-            with zipfile.ZipFile(new_pptx_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
-                for root, dirs, files in os.walk(extract_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, extract_dir)
-                        # Normalize path separators for ZIP format
-                        arcname = arcname.replace(os.sep, '/')
-                        zip_out.write(file_path, arcname)
-
-            # Replace original file
-            shutil.move(new_pptx_path, pptx_file)
+            # Determine original file path
+            original_file = None
+            if 'sample2-1' in output_file:
+                original_file = 'sample_parts/sample2-1.pptx'
+            elif 'sample1-2' in output_file:
+                original_file = 'sample_parts/sample1-2.pptx'
+            elif 'sample1' in output_file:
+                original_file = 'sample_parts/sample1.pptx'
+            elif 'sample3' in output_file:
+                original_file = 'sample_parts/sample3.pptx'
 
-            # Clean up
-            shutil.rmtree(temp_dir)
+            if not original_file or not os.path.exists(original_file):
+                return
 
-            if embedded_count > 0:
+            with zipfile.ZipFile(output_file, 'r') as zip_ref:
+                current_names = zip_ref.namelist()
+            has_layouts = any(name.startswith('ppt/slideLayouts/')
+                              for name in current_names)
+            has_layout_rels = any(name.startswith('ppt/slideLayouts/_rels/')
+                                  for name in current_names)
+
+            # Collect original layout XML and relationship files as member overrides
+            overrides = {}
+            copied_count = 0
+            if has_layouts:
+                with zipfile.ZipFile(original_file, 'r') as zip_ref:
+                    for name in zip_ref.namelist():
+                        if re.fullmatch(r'ppt/slideLayouts/[^/]+\.xml', name):
+                            overrides[name] = zip_ref.read(name)
+                            copied_count += 1
+                        elif has_layout_rels and re.fullmatch(r'ppt/slideLayouts/_rels/[^/]+\.xml\.rels', name):
+                            overrides[name] = zip_ref.read(name)
+
+            # Rewrite the PPTX file in a single pass
+            if copied_count > 0:
+                self.rewrite_package(output_file, output_file, overrides=overrides,
+                                     format_slides=False, embed_media=False)
                 print(
-                    f"Successfully embedded {embedded_count} media/font file(s)")
+                    f"Preserved {copied_count} original layout file(s) with background images")
 
         except Exception as e:
-            print(f"Warning: Could not embed media and fonts: {str(e)}")
-
-    def update_content_types(self, extract_dir: str):
-        """Update [Content_Types].xml to include media file content types"""
-        try:
-            import os
-            content_types_path = os.path.join(
-                extract_dir, '[Content_Types].xml')
+            print(f"Warning: Could not copy original layouts: {str(e)}")
 
-            if not os.path.exists(content_types_path):
-                print("Warning: [Content_Types].xml not found")
-                return
+    def post_process_xml_format(self, pptx_file: str):
+        """Post-process the PPTX file to ensure XML matches original format"""
+        self.rewrite_package(pptx_file, pptx_file, embed_media=False)
 
-            # Read existing content types
-            with open(content_types_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Define content type mappings for common media types
-            media_content_types = {
-                '.png': 'image/png',
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.gif': 'image/gif',
-                '.bmp': 'image/bmp',
-                '.tiff': 'image/tiff',
-                '.webp': 'image/webp',
-                '.mp3': 'audio/mpeg',
-                '.wav': 'audio/wav',
-                '.mp4': 'video/mp4',
-                '.avi': 'video/x-msvideo',
-                '.mov': 'video/quicktime',
-                '.fntdata': 'application/x-font-data'
-            }
+    def embed_media_and_fonts(self, pptx_file: str):
+        """Embed media and font files into the PPTX structure"""
+        if not self.media_cache:
+            return
 
-            # Check what extensions are already defined
-            existing_extensions = []
-            import re
-            for match in re.finditer(r'<Default Extension="([^"]+)"', content):
-                existing_extensions.append(match.group(1))
-
-            # Add missing content type definitions
-            additions = []
-            for ext, content_type in media_content_types.items():
-                ext_clean = ext.lstrip('.')
-                if ext_clean not in existing_extensions:
-                    additions.append(
-                        f'  <Default Extension="{ext_clean}" ContentType="{content_type}"/>')
-
-            if additions:
-                # Find the insertion point (before closing </Types>)
-                if '</Types>' in content:
-                    new_defaults = '\n'.join(additions)
-                    content = content.replace(
-                        '</Types>', f'{new_defaults}\n</Types>')
-
-                    # Write updated content
-                    with open(content_types_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-
-                    print(f"Added {len(additions)} content type definition(s)")
+        self.rewrite_package(pptx_file, pptx_file, format_slides=False)
 
-        except Exception as e:
-            print(f"Warning: Could not update content types: {str(e)}")
+    def _add_media_content_types(self, content: str) -> Tuple[str, int]:
+        """Add missing media Default entries to [Content_Types].xml content"""
+        import re
 
-    def update_relationship_files(self, extract_dir: str):
-        """Update relationship files to include media and hyperlink references"""
-        try:
-            import os
-            import re
+        # Define content type mappings for common media types
+        media_content_types = {
+            '.png': 'image/png',
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.gif': 'image/gif',
+            '.bmp': 'image/bmp',
+            '.tiff': 'image/tiff',
+            '.webp': 'image/webp',
+            '.mp3': 'audio/mpeg',
+            '.wav': 'audio/wav',
+            '.mp4': 'video/mp4',
+            '.avi': 'video/x-msvideo',
+            '.mov': 'video/quicktime',
+            '.fntdata': 'application/x-font-data'
+        }
 
-            relationships_added = 0
+        # Check what extensions are already defined
+        existing_extensions = []
+        for match in re.finditer(r'<Default Extension="([^"]+)"', content):
+            existing_extensions.append(match.group(1))
 
-            # Process slide relationship files
-            slides_rels_dir = os.path.join(
-                extract_dir, 'ppt', 'slides', '_rels')
-            if os.path.exists(slides_rels_dir):
-                relationships_added += self._process_relationship_directory(
-                    slides_rels_dir, extract_dir, 'slide'
-                )
+        # Add missing content type definitions
+        additions = []
+        for ext, content_type in media_content_types.items():
+            ext_clean = ext.lstrip('.')
+            if ext_clean not in existing_extensions:
+                additions.append(
+                    f'  <Default Extension="{ext_clean}" ContentType="{content_type}"/>')
 
-            # Process slide layout relationship files
-            layouts_rels_dir = os.path.join(
-                extract_dir, 'ppt', 'slideLayouts', '_rels')
-            if os.path.exists(layouts_rels_dir):
-                relationships_added += self._process_relationship_directory(
-                    layouts_rels_dir, extract_dir, 'slideLayout'
-                )
+        # Find the insertion point (before closing </Types>)
+        if not additions or '</Types>' not in content:
+            return content, 0
 
-            if relationships_added > 0:
-                print(
-                    f"Added {relationships_added} relationship definition(s)")
+        new_defaults = '\n'.join(additions)
+        return content.replace('</Types>', f'{new_defaults}\n</Types>'), len(additions)
 
-        except Exception as e:
-            print(f"Warning: Could not update relationship files: {str(e)}")
+    def _slide_referenced_rids(self, slide_index: int) -> set:
+        """Collect rIds referenced by a slide's extracted shape XML"""
+        import re
 
-    def _process_relationship_directory(self, rels_dir: str, extract_dir: str, file_type: str):
-        """Process relationship files in a specific directory"""
-        import os
+        referenced_rids = set()
+        if slide_index < len(self.shapes_data):
+            slide_data = self.shapes_data[slide_index]
+            for shape_info in slide_data.get('shapes', []):
+                element_data = shape_info.get('element', {})
+                xml_string = element_data.get('xml_string', '')
+                # Find all rId references in the XML
+                for match in re.finditer(r'r:id="(rId\d+)"|ns2:id="(rId\d+)"|r:embed="(rId\d+)"|ns2:embed="(rId\d+)"', xml_string):
+                    for group in match.groups():
+                        if group:
+                            referenced_rids.add(group)
+        return referenced_rids
+
+    def _layout_referenced_rids(self, layout_xml: str) -> set:
+        """Collect rIds referenced by a slide layout's XML"""
         import re
 
-        relationships_added = 0
-
-        # Process each relationship file
-        for rel_file in os.listdir(rels_dir):
-            if rel_file.endswith('.xml.rels'):
-                rel_path = os.path.join(rels_dir, rel_file)
-
-                if file_type == 'slide':
-                    file_num = rel_file.replace(
-                        'slide', '').replace('.xml.rels', '')
-                else:  # slideLayout
-                    file_num = rel_file.replace(
-                        'slideLayout', '').replace('.xml.rels', '')
-
-                # Read current relationships
-                with open(rel_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Find what rIds are referenced in the corresponding XML file
-                referenced_rids = set()
-
-                if file_type == 'slide':
-                    # For slides, check shapes data
-                    slide_index = int(file_num) - \
-                        1 if file_num.isdigit() else 0
-                    if slide_index < len(self.shapes_data):
-                        slide_data = self.shapes_data[slide_index]
-                        for shape_info in slide_data.get('shapes', []):
-                            element_data = shape_info.get('element', {})
-                            xml_string = element_data.get('xml_string', '')
-                            # Find all rId references in the XML
-                            for match in re.finditer(r'r:id="(rId\d+)"|ns2:id="(rId\d+)"|r:embed="(rId\d+)"|ns2:embed="(rId\d+)"', xml_string):
-                                for group in match.groups():
-                                    if group:
-                                        referenced_rids.add(group)
-                else:
-                    # For slideLayouts, check the layout XML file directly
-                    layout_xml_path = os.path.join(
-                        extract_dir, 'ppt', 'slideLayouts', f'slideLayout{file_num}.xml')
-                    if os.path.exists(layout_xml_path):
-                        with open(layout_xml_path, 'r', encoding='utf-8') as f:
-                            layout_xml = f.read()
-                        # Find all rId references in the layout XML
-                        for match in re.finditer(r'r:embed="(rId\d+)"|r:id="(rId\d+)"', layout_xml):
-                            for group in match.groups():
-                                if group:
-                                    referenced_rids.add(group)
-
-                # Add missing relationships for referenced rIds
-                new_relationships = []
-
-                for rid in sorted(referenced_rids, key=lambda x: int(x.replace('rId', ''))):
-                    if rid not in content:
-                        # Check if this rId should point to a media file
-                        if self.media_cache:
-                            # For background images, typically use the first available image
-                            first_image = None
-                            for cache_key, cache_data in self.media_cache.items():
-                                if any(ext in cache_key.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']):
-                                    first_image = cache_key
-                                    break
+        referenced_rids = set()
+        for match in re.finditer(r'r:embed="(rId\d+)"|r:id="(rId\d+)"', layout_xml):
+            for group in match.groups():
+                if group:
+                    referenced_rids.add(group)
+        return referenced_rids
 
-                            if first_image:
-                                target_path = f"../media/{os.path.basename(first_image)}"
-                                new_relationships.append(
-                                    f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="{target_path}"/>'
-                                )
+    def _add_missing_relationships(self, content: str, referenced_rids: set) -> Tuple[str, int]:
+        """Add image relationships for referenced rIds missing from a .rels file"""
+        import os
 
-                # Add new relationships to the file
-                if new_relationships:
-                    # Insert before closing </Relationships>
-                    new_rels_xml = ''.join(new_relationships)
-                    updated_content = content.replace(
-                        '</Relationships>', f'{new_rels_xml}</Relationships>')
+        # Add missing relationships for referenced rIds
+        new_relationships = []
+
+        for rid in sorted(referenced_rids, key=lambda x: int(x.replace('rId', ''))):
+            if rid not in content:
+                # Check if this rId should point to a media file
+                if self.media_cache:
+                    # For background images, typically use the first available image
+                    first_image = None
+                    for cache_key, cache_data in self.media_cache.items():
+                        if any(ext in cache_key.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']):
+                            first_image = cache_key
+                            break
 
-                    # Write updated content
-                    with open(rel_path, 'w', encoding='utf-8') as f:
-                        f.write(updated_content)
+                    if first_image:
+                        target_path = f"../media/{os.path.basename(first_image)}"
+                        new_relationships.append(
+                            f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="{target_path}"/>'
+                        )
 
-                    relationships_added += len(new_relationships)
+        if not new_relationships:
+            return content, 0
 
-        return relationships_added
+        # Insert before closing </Relationships>
+        new_rels_xml = ''.join(new_relationships)
+        return content.replace('</Relationships>', f'{new_rels_xml}</Relationships>'), len(new_relationships)
 
     def preserve_original_layouts(self, extract_dir: str):
         """Preserve original slide layout XML files instead of using generated ones"""
@@ -2914,32 +3061,22 @@ class PPTGenerator:
         except Exception as e:
             print(f"Warning: Could not add background to layout: {str(e)}")
 
-    def format_xml_as_single_line(self, xml_file_path: str):
-        """Format XML file as single line to match original"""
-        try:
-            with open(xml_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Remove all newlines and extra whitespace between tags
-            import re
-
-            # Remove newlines and extra spaces between tags
-            content = re.sub(r'>\s+<', '><', content)
-            content = re.sub(r'\n\s*', '', content)
-            content = re.sub(r'\s+', ' ', content)
-            content = re.sub(r'> <', '><', content)
-
-            # Ensure proper XML declaration format
-            if content.startswith("<?xml version='1.0'"):
-                content = content.replace("<?xml version='1.0' encoding='UTF-8' standalone='yes'?>",
-                                          '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>')
+    def _single_line_xml(self, content: str) -> str:
+        """Collapse XML content onto a single line to match original"""
+        # Remove all newlines and extra whitespace between tags
+        import re
 
-            with open(xml_file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        # Remove newlines and extra spaces between tags
+        content = re.sub(r'>\s+<', '><', content)
+        content = re.sub(r'\n\s*', '', content)
+        content = re.sub(r'\s+', ' ', content)
+        content = re.sub(r'> <', '><', content)
 
-        except Exception as e:
-            print(
-                f"Warning: Could not format XML file {xml_file_path}: {str(e)}")
+        # Ensure proper XML declaration format
+        if content.startswith("<?xml version='1.0'"):
+            content = content.replace("<?xml version='1.0' encoding='UTF-8' standalone='yes'?>",
+                                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>')
+        return content
 
     def apply_background_images(self):
         """Apply background images and fills using python-pptx API"""
@@ -2962,19 +3099,19 @@ class PPTGenerator:
                         self._apply_background_to_layout(
                             slide_layout, background_data)
 
+            # Collect custom slide backgrounds in one pass so lazily loaded
+            # shapes data is decoded once rather than once per slide
+            slide_backgrounds = {}
+            for shape_data in self.shapes_data:
+                if shape_data.get('type') == 'background' and shape_data.get('background'):
+                    slide_backgrounds.setdefault(
+                        shape_data.get('slide_index'), shape_data['background'])
+
             # Apply backgrounds to slides that have custom background data
             for slide_index, slide in enumerate(self.presentation.slides):
-                # Check if this slide has custom background in shapes data
-                slide_shapes = [s for s in self.shapes_data if s.get(
-                    'slide_index') == slide_index]
-
-                for shape_data in slide_shapes:
-                    if shape_data.get('type') == 'background':
-                        background_data = shape_data.get('background', {})
-                        if background_data:
-                            self._apply_background_to_slide(
-                                slide, background_data)
-                            break
+                if slide_index in slide_backgrounds:
+                    self._apply_background_to_slide(
+                        slide, slide_backgrounds[slide_index])
 
             print("Background application completed using python-pptx API")
 
@@ -3157,59 +3294,239 @@ class PPTGenerator:
             print(f"Warning: Could not apply gradient stops: {str(e)}")
 
 
+def generate_deck(job: Dict[str, Any]) -> PPTGenerator:
+    """Load, generate and save one deck described by a batch job dict"""
+    media_store = MediaStore(job['media_store']) if job.get('media_store') else None
+    with PPTGenerator(media_store=media_store,
+                      template_file=job.get('template', TEMPLATE_FILE)) as generator:
+        # Load JSON data including optional enhanced files
+        print("Loading JSON files...")
+        generator.load_json_files(
+            job['shapes_file'],
+            job.get('layouts_file'),
+            job.get('theme_file'),
+            media_file=job.get('media_file'),
+            properties_file=job.get('properties_file'),
+            lazy_shapes=True
+        )
+
+        if job.get('incremental'):
+            generator.enable_incremental(job['output'])
+
+        # Generate slides with enhanced fidelity
+        print("\nGenerating presentation...")
+        generator.generate_slides()
+
+        # Save presentation
+        generator.save_presentation(job['output'])
+
+    return generator
+
+
+def validate_job(job: Dict[str, Any]) -> Optional[str]:
+    """Check a job's input files, returning an error message or None"""
+    shapes_file = job.get('shapes_file')
+    if not shapes_file:
+        return "shapes_file is required"
+
+    if not Path(shapes_file).exists():
+        return f"File '{shapes_file}' does not exist."
+
+    required_files = []
+    if not is_container(shapes_file):
+        if not job.get('layouts_file') or not job.get('theme_file'):
+            return "layouts_file and theme_file are required unless shapes_file is a binary container."
+        required_files = [job['layouts_file'], job['theme_file']]
+
+    for file_path in required_files:
+        if not Path(file_path).exists():
+            return f"File '{file_path}' does not exist."
+
+    # Optional files are skipped rather than failing the job
+    if job.get('media_file') and not Path(job['media_file']).exists():
+        print(
+            f"Warning: Media file '{job['media_file']}' does not exist, skipping media integration.")
+        job['media_file'] = None
+
+    if job.get('properties_file') and not Path(job['properties_file']).exists():
+        print(
+            f"Warning: Properties file '{job['properties_file']}' does not exist, skipping properties integration.")
+        job['properties_file'] = None
+
+    return None
+
+
+BATCH_PATH_KEYS = ('shapes_file', 'layouts_file', 'theme_file', 'media_file',
+                   'properties_file', 'media_store', 'output', 'template')
+
+
+def iter_batch_jobs(manifest: str) -> Iterator[Dict[str, Any]]:
+    """Yield jobs from a batch manifest
+
+    The manifest is a JSON list of jobs, an object with a "jobs" list, or
+    JSON Lines with one job per line. '-' reads JSON Lines from stdin as
+    they arrive, so a long-running process can be fed jobs over a pipe.
+    Relative paths in a manifest file are resolved against its directory.
+    """
+    if manifest == '-':
+        for line_number, line in enumerate(sys.stdin, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                print(f"Warning: Skipping invalid job on line {line_number}: {str(e)}")
+        return
+
+    base_dir = Path(manifest).parent
+    with open(manifest, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    jobs = data.get('jobs', []) if isinstance(data, dict) else data
+
+    for job in jobs:
+        job = dict(job)
+        for key in BATCH_PATH_KEYS:
+            if job.get(key) and not Path(job[key]).is_absolute():
+                job[key] = str(base_dir / job[key])
+        yield job
+
+
+def _run_batch_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate one batch deck, capturing its log and reporting failures instead of raising"""
+    job.setdefault('output', 'generated_presentation.pptx')
+    result = {'output': job['output'], 'ok': False, 'slides': 0, 'error': None}
+    log = io.StringIO()
+    start_time = time.perf_counter()
+
+    with contextlib.redirect_stdout(log):
+        try:
+            error = validate_job(job)
+            if error:
+                result['error'] = error
+            else:
+                generator = generate_deck(job)
+                result['slides'] = len(generator.presentation.slides)
+                result['ok'] = True
+        except Exception as e:
+            result['error'] = str(e)
+            traceback.print_exc(file=log)
+
+    result['seconds'] = round(time.perf_counter() - start_time, 3)
+    result['log'] = log.getvalue()
+    return result
+
+
+def _report_batch_result(result: Dict[str, Any], verbose: bool) -> bool:
+    """Print one batch result and return whether it succeeded"""
+    if verbose or not result['ok']:
+        print(result['log'], end='')
+    if result['ok']:
+        print(f"OK    {result['output']} ({result['slides']} slides, {result['seconds']}s)")
+    else:
+        print(f"ERROR {result['output']}: {result['error']}")
+    return result['ok']
+
+
+def run_batch(manifest: str, workers: int = 1, verbose: bool = False) -> int:
+    """Generate every deck in a batch manifest and return the number of failures
+
+    The template and type mappings are loaded once per worker process and
+    reused for every deck that worker generates.
+    """
+    PPTGenerator.warm_caches()
+    results = []
+
+    if workers <= 1:
+        for job in iter_batch_jobs(manifest):
+            results.append(_report_batch_result(_run_batch_job(job), verbose))
+    else:
+        report_lock = threading.Lock()
+
+        def report(future, output):
+            # Runs in the executor's result thread as soon as a deck finishes,
+            # even while the manifest reader is blocked on its next line
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'output': output, 'ok': False, 'log': '', 'error': str(e)}
+            with report_lock:
+                results.append(_report_batch_result(result, verbose))
+
+        # Workers forked after warm_caches() inherit the loaded template;
+        # the initializer covers platforms that spawn instead
+        with ProcessPoolExecutor(max_workers=workers, initializer=PPTGenerator.warm_caches) as executor:
+            for job in iter_batch_jobs(manifest):
+                future = executor.submit(_run_batch_job, job)
+                future.add_done_callback(
+                    functools.partial(report, output=job.get('output', 'generated_presentation.pptx')))
+        # Leaving the with block waits for every job and its report
+
+    failures = results.count(False)
+    print(f"\nBatch completed: {len(results) - failures} succeeded, {failures} failed")
+    return failures
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Generate PowerPoint presentation from JSON files with enhanced fidelity'
     )
-    parser.add_argument('shapes_file', help='Path to shapes JSON file')
-    parser.add_argument('layouts_file', help='Path to layouts JSON file')
-    parser.add_argument('theme_file', help='Path to theme JSON file')
+    parser.add_argument(
+        'shapes_file', nargs='?',
+        help='Path to shapes JSON file, or a binary container from ppt_extractor.py --format binary')
+    parser.add_argument('layouts_file', nargs='?',
+                        help='Path to layouts JSON file (not needed with a container)')
+    parser.add_argument('theme_file', nargs='?',
+                        help='Path to theme JSON file (not needed with a container)')
     parser.add_argument(
         '--media-file', help='Path to media JSON file (optional)')
     parser.add_argument('--properties-file',
                         help='Path to properties JSON file (optional)')
+    parser.add_argument('--media-store',
+                        help='Media store directory for media JSON written with --media-store (optional)')
     parser.add_argument('--output', '-o', default='generated_presentation.pptx',
                         help='Output PowerPoint file name (default: generated_presentation.pptx)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only regenerate slides whose data changed since the last build of --output')
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help='Generate every deck listed in a JSON/JSON Lines manifest ("-" reads jobs from stdin)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes for --batch (default: 1)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print the full generation log of every --batch deck')
 
     args = parser.parse_args()
 
-    # Validate required input files
-    for file_path in [args.shapes_file, args.layouts_file, args.theme_file]:
-        if not Path(file_path).exists():
-            print(f"Error: File '{file_path}' does not exist.")
-            sys.exit(1)
-
-    # Validate optional files if provided
-    if args.media_file and not Path(args.media_file).exists():
-        print(
-            f"Warning: Media file '{args.media_file}' does not exist, skipping media integration.")
-        args.media_file = None
-
-    if args.properties_file and not Path(args.properties_file).exists():
-        print(
-            f"Warning: Properties file '{args.properties_file}' does not exist, skipping properties integration.")
-        args.properties_file = None
+    if args.batch:
+        failures = run_batch(args.batch, workers=args.workers, verbose=args.verbose)
+        sys.exit(1 if failures else 0)
+
+    if not args.shapes_file:
+        parser.error("shapes_file is required unless --batch is given")
+
+    job = {
+        'shapes_file': args.shapes_file,
+        'layouts_file': args.layouts_file,
+        'theme_file': args.theme_file,
+        'media_file': args.media_file,
+        'properties_file': args.properties_file,
+        'media_store': args.media_store,
+        'output': args.output,
+        'incremental': args.incremental
+    }
+
+    # Validate input files
+    error = validate_job(job)
+    if error:
+        print(f"Error: {error}")
+        sys.exit(1)
 
     try:
-        # Initialize generator
-        generator = PPTGenerator()
-
-        # Load JSON data including optional enhanced files
-        print("Loading JSON files...")
-        generator.load_json_files(
-            args.shapes_file,
-            args.layouts_file,
-            args.theme_file,
-            media_file=args.media_file,
-            properties_file=args.properties_file
-        )
-
-        # Generate slides with enhanced fidelity
-        print("\nGenerating presentation...")
-        generator.generate_slides()
-
-        # Save presentation
-        generator.save_presentation(args.output)
+        generate_deck(job)
 
         print(f"\nPresentation generation completed successfully!")
         print(f"Enhanced features applied:")
@@ -3220,14 +3537,13 @@ def main():
         print(f"  - Better table formatting")
         print(f"  - Intelligent layout selection")
         print(f"  - Custom geometry support (fallback)")
-        if args.media_file:
+        if job['media_file']:
             print(f"  - Real image embedding from media data")
-        if args.properties_file:
+        if job['properties_file']:
             print(f"  - Document properties integration")
 
     except Exception as e:
         print(f"Error generating presentation: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
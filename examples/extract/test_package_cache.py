@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test program for package_cache.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import package_cache
+from package_cache import copy_raw_member
+
+
+MEMBERS = {
+    '[Content_Types].xml': b'<?xml version="1.0"?><Types/>' * 20,
+    'ppt/slides/slide1.xml': b'<p:sld>' + b'<a:t>Slide text</a:t>' * 200 + b'</p:sld>',
+    'ppt/media/image1.png': bytes(range(256)) * 8,
+}
+
+
+def build_zip(members, compression=zipfile.ZIP_DEFLATED) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as zip_out:
+        for name, data in members.items():
+            zip_out.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+class TestCopyRawMember(unittest.TestCase):
+    """Round trips through copy_raw_member mixed with regular writes"""
+
+    def copy_package(self, source: io.BytesIO) -> io.BytesIO:
+        output = io.BytesIO()
+        with zipfile.ZipFile(source, 'r') as zip_in, \
+                zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+            for name in zip_in.namelist():
+                if name.endswith('.xml'):
+                    copy_raw_member(zip_in, zip_out, name)
+                else:
+                    zip_out.writestr(name, zip_in.read(name))
+            # Members written after raw copies must land after them
+            zip_out.writestr('docProps/app.xml', b'<Properties/>')
+        output.seek(0)
+        return output
+
+    def assert_round_trip(self, output: io.BytesIO):
+        with zipfile.ZipFile(output, 'r') as zip_check:
+            self.assertIsNone(zip_check.testzip())
+            self.assertEqual(zip_check.namelist(),
+                             list(MEMBERS) + ['docProps/app.xml'])
+            for name, data in MEMBERS.items():
+                self.assertEqual(zip_check.read(name), data)
+
+    def test_raw_copy_keeps_compressed_bytes(self):
+        """Copied members keep their compression and sizes"""
+        source = build_zip(MEMBERS)
+        with zipfile.ZipFile(source, 'r') as zip_in:
+            source_infos = {info.filename: info for info in zip_in.infolist()}
+        source.seek(0)
+
+        output = self.copy_package(source)
+        self.assert_round_trip(output)
+        with zipfile.ZipFile(output, 'r') as zip_check:
+            for name in ('[Content_Types].xml', 'ppt/slides/slide1.xml'):
+                info = zip_check.getinfo(name)
+                self.assertEqual(info.compress_size, source_infos[name].compress_size)
+                self.assertEqual(info.CRC, source_infos[name].CRC)
+
+    def test_raw_copy_of_stored_members(self):
+        """Uncompressed members are copied as they are"""
+        output = self.copy_package(build_zip(MEMBERS, zipfile.ZIP_STORED))
+        self.assert_round_trip(output)
+        with zipfile.ZipFile(output, 'r') as zip_check:
+            self.assertEqual(zip_check.getinfo('ppt/slides/slide1.xml').compress_type,
+                             zipfile.ZIP_STORED)
+
+    def test_round_trip_to_file(self):
+        """A copied package reopens from disk and copies raw again"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = os.path.join(temp_dir, 'first.pptx')
+            second = os.path.join(temp_dir, 'second.pptx')
+            with open(first, 'wb') as f:
+                f.write(self.copy_package(build_zip(MEMBERS)).getvalue())
+
+            with zipfile.ZipFile(first, 'r') as zip_in, \
+                    zipfile.ZipFile(second, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+                for name in zip_in.namelist():
+                    copy_raw_member(zip_in, zip_out, name)
+
+            with zipfile.ZipFile(second, 'r') as zip_check:
+                self.assertIsNone(zip_check.testzip())
+                self.assertEqual(zip_check.read('docProps/app.xml'), b'<Properties/>')
+            self.assertEqual(os.path.getsize(first), os.path.getsize(second))
+
+    def test_fallback_on_unsupported_python(self):
+        """Outside the supported range members are recompressed instead"""
+        with patch.object(package_cache, 'RAW_COPY_SUPPORTED', False):
+            output = self.copy_package(build_zip(MEMBERS))
+        self.assert_round_trip(output)
+
+
+    def test_fallback_on_missing_internals(self):
+        """ZipFile internals the raw path relies on are checked before it is taken"""
+        attributes = package_cache.RAW_COPY_ATTRIBUTES + ('_renamed_internal',)
+        with patch.object(package_cache, 'RAW_COPY_ATTRIBUTES', attributes):
+            output = self.copy_package(build_zip(MEMBERS))
+        self.assert_round_trip(output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test program for ppt_generator.py input checks
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.util import Inches
+
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ppt_container import STREAM_SHAPES_SCHEMA, write_container
+from ppt_extractor import PPTExtractor
+from ppt_generator import PPTGenerator, validate_job
+
+
+class TestStreamRecordsRejected(unittest.TestCase):
+    """ppt_extractor.py --stream output is refused instead of generating a bare deck"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        pptx_file = os.path.join(cls.temp_dir.name, 'deck.pptx')
+        presentation = Presentation()
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        slide.shapes.add_shape(MSO_SHAPE.OVAL, Inches(1), Inches(1), Inches(2), Inches(2))
+        presentation.save(pptx_file)
+
+        extractor = PPTExtractor(pptx_file)
+        cls.records = list(extractor.iter_slide_records())
+        cls.stream_json = os.path.join(cls.temp_dir.name, 'deck_stream_shapes.json')
+        cls.stream_container = os.path.join(cls.temp_dir.name, 'deck_stream.pptxbin')
+        with contextlib.redirect_stdout(io.StringIO()):
+            extractor.save_records_to_json(cls.records, cls.stream_json)
+            extractor.save_to_container(cls.stream_container, cls.records, {},
+                                        schema=STREAM_SHAPES_SCHEMA)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def assert_rejected(self, shapes_file: str, **kwargs):
+        generator = PPTGenerator()
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaisesRegex(ValueError, STREAM_SHAPES_SCHEMA):
+                generator.load_json_files(shapes_file, **kwargs)
+        self.assertIsNone(generator.container)
+
+    def test_stream_json(self):
+        self.assertEqual(self.records[0]['schema'], STREAM_SHAPES_SCHEMA)
+        self.assert_rejected(self.stream_json)
+        self.assert_rejected(self.stream_json, lazy_shapes=True)
+
+    def test_stream_container(self):
+        self.assert_rejected(self.stream_container)
+
+    def test_container_without_schema_header(self):
+        """Containers written before the index named a schema are caught by their records"""
+        container = os.path.join(self.temp_dir.name, 'old_stream.pptxbin')
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_container(container, self.records, {})
+        self.assert_rejected(container)
+
+
+class TestValidateJob(unittest.TestCase):
+    """Batch job checks"""
+
+    def test_missing_shapes_file(self):
+        missing = os.path.join(tempfile.gettempdir(), 'no_such_deck_shapes.json')
+        self.assertEqual(validate_job({'shapes_file': missing}),
+                         f"File '{missing}' does not exist.")
+
+
+if __name__ == '__main__':
+    unittest.main()
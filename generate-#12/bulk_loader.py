@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader for ECMA-376 Sections
+Streams parsed sections into ecma_sections with COPY FROM STDIN, assigning
+ids and parent_id client-side so loading needs no per-row round trips
+"""
+
+import io
+import hashlib
+import logging
+from typing import Dict, List, Optional, Sequence
+
+from section_index import embedding_columns
+
+logger = logging.getLogger(__name__)
+
+COPY_COLUMNS = (
+    'id', 'level1', 'level2', 'level3', 'level4', 'level5',
+    'full_section_number', 'title', 'description',
+    'page_reference', 'section_type', 'depth',
+    'parent_id', 'embedding', 'embedding_vector', 'content_hash'
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# COPY text format escapes
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value) -> str:
+    """Format one value as a COPY text-format field"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bytes):
+        # bytea hex format; the backslash itself must be escaped for COPY
+        return '\\\\x' + value.hex()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def hash_content(full_section_number: str, title: str, description: Optional[str]) -> str:
+    """Fingerprint stored in content_hash; changes whenever the parsed text does"""
+    content = '\0'.join((full_section_number, title, description or ''))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def section_hash(section) -> str:
+    """content_hash of a parsed Section"""
+    return hash_content(section.full_section_number, section.title, section.description)
+
+
+def reserve_ids(cur, count: int) -> List[int]:
+    """Take count ids from the ecma_sections sequence in one round trip"""
+    cur.execute("SELECT nextval('ecma_sections_id_seq') FROM generate_series(1, %s)", (count,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def copy_sections(conn, sections: Sequence, embeddings: Optional[Sequence] = None,
+                  storage: str = 'bytea', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  known_ids: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Insert sections with COPY, in chunks, inside the caller's transaction.
+
+    A section's parent_id is set when its parent_section appears earlier in
+    the list, matching what row-by-row insertion produced, or is already in
+    known_ids.
+
+    Args:
+        conn: Open psycopg2 connection; the caller commits
+        sections: Parsed Section objects in document order
+        embeddings: Optional vector per section (None entries stay NULL)
+        storage: Embedding storage mode, 'bytea' or 'json'
+        chunk_size: Rows per COPY statement
+        known_ids: full_section_number to id of rows already in the table
+
+    Returns:
+        Mapping of full_section_number to database id, including known_ids
+    """
+    if embeddings is not None and len(embeddings) != len(sections):
+        raise ValueError(f"Got {len(embeddings)} embeddings for {len(sections)} sections")
+
+    section_id_map = dict(known_ids or {})
+    copy_sql = f"COPY ecma_sections ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+
+    with conn.cursor() as cur:
+        if not sections:
+            return section_id_map
+        ids = reserve_ids(cur, len(sections))
+
+        for start in range(0, len(sections), chunk_size):
+            buffer = io.StringIO()
+            for i in range(start, min(start + chunk_size, len(sections))):
+                section = sections[i]
+
+                parent_id = None
+                if section.parent_section and section.parent_section in section_id_map:
+                    parent_id = section_id_map[section.parent_section]
+
+                embedding = embedding_json = None
+                if embeddings is not None and embeddings[i] is not None:
+                    embedding, embedding_json = embedding_columns(embeddings[i], storage)
+
+                row = (
+                    ids[i],
+                    section.level1,
+                    section.level2,
+                    section.level3,
+                    section.level4,
+                    section.level5,
+                    section.full_section_number,
+                    section.title,
+                    section.description,
+                    section.page_reference,
+                    section.section_type,
+                    section.depth,
+                    parent_id,
+                    embedding,
+                    embedding_json,
+                    section_hash(section)
+                )
+                buffer.write('\t'.join(copy_value(value) for value in row))
+                buffer.write('\n')
+                section_id_map[section.full_section_number] = ids[i]
+
+            buffer.seek(0)
+            cur.copy_expert(copy_sql, buffer)
+            logger.info(f"Copied {min(start + chunk_size, len(sections))}/{len(sections)} sections")
+
+    return section_id_map
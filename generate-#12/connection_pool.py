@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Pooled PostgreSQL Connections for the ECMA-376 Database
+Shares open connections between DatabaseManager instances and the
+maintenance scripts instead of connecting once per call
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.environ.get('ECMA_DB_POOL_SIZE', '8'))
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # seconds a connection may sit idle before being pinged
+DEFAULT_ACQUIRE_TIMEOUT = 30.0
+
+
+class ConnectionPool:
+    """Thread-safe, bounded pool of psycopg2 connections with health checks"""
+
+    def __init__(self, db_config: Dict, size: int = DEFAULT_POOL_SIZE,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        """
+        Create a pool; connections are opened lazily.
+
+        Args:
+            db_config: psycopg2 connection parameters
+            size: Maximum number of open connections
+            health_check_interval: Idle seconds after which a connection is
+                checked with SELECT 1 before being handed out
+            acquire_timeout: Seconds to wait for a free connection
+        """
+        self.db_config = dict(db_config)
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._pool = pg_pool.ThreadedConnectionPool(0, size, **self.db_config)
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait
+        self._slots = threading.BoundedSemaphore(size)
+        self._last_used: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a connection that has been idle too long"""
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn))
+        # Connections the pool just opened have never been returned
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.warning(f"Discarding broken database connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """
+        Borrow a connection for one transaction.
+
+        Commits when the block succeeds and rolls back when it raises, like
+        `with psycopg2.connect(...) as conn`, then returns the connection to
+        the pool instead of leaving it open.
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise pg_pool.PoolError(f"No database connection free after {self.acquire_timeout}s")
+
+        try:
+            conn = self._pool.getconn()
+            while not self._is_healthy(conn):
+                self._discard(conn)
+                conn = self._pool.getconn()
+
+            try:
+                yield conn
+                conn.commit()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                # The connection itself may be broken; never hand it out again
+                self._discard(conn)
+                raise
+            except BaseException:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self._discard(conn)
+                    raise
+                self._release(conn)
+                raise
+            else:
+                self._release(conn)
+        finally:
+            self._slots.release()
+
+    def _release(self, conn):
+        with self._lock:
+            self._last_used[id(conn)] = time.monotonic()
+        self._pool.putconn(conn)
+
+    def close(self):
+        """Close every pooled connection"""
+        self._pool.closeall()
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config: Dict, size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """Return the process-wide pool for a database, creating it on first use"""
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_config, size)
+        return pool
@@ -4,15 +4,30 @@ Database Manager for ECMA-376 Documentation
 Handles embedding generation and database operations
 """
 
-import json
+import sys
 import logging
-import psycopg2
 from typing import List, Optional, Dict, Any
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from pathlib import Path
 
 from ecma_parser import EcmaParser, Section
+from section_index import EMBEDDING_STORAGE, SectionVectorIndex
+from bulk_loader import DEFAULT_CHUNK_SIZE, copy_sections
+
+# psycopg2 is only needed for PostgreSQL; sqlite_store works without it
+try:
+    from connection_pool import DEFAULT_POOL_SIZE, get_pool
+except ImportError:
+    DEFAULT_POOL_SIZE = 8
+    get_pool = None
+
+try:
+    from embedding_cache import CachedEncoder, EmbeddingCache, QueryEncoder
+except ImportError:
+    # Not on the path: use the shared module at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from embedding_cache import CachedEncoder, EmbeddingCache, QueryEncoder
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,30 +36,57 @@ logger = logging.getLogger(__name__)
 class DatabaseManager:
     """Manages database operations and embedding generation for ECMA-376 sections"""
     
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    MIN_SIMILARITY = 0.3  # Minimum similarity for search results
+    SEARCH_COLUMNS = '''id, full_section_number, title, description,
+        level1, level2, level3, level4, level5,
+        depth, section_type, page_reference'''
+    
     def __init__(self, db_name: str = "ecma376_docs", 
                  db_user: str = "thomasjeon", 
                  db_host: str = "localhost", 
-                 db_port: int = 5432):
-        """Initialize database connection and embedding model"""
+                 db_port: int = 5432,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 embedding_storage: str = 'bytea',
+                 pool_size: int = DEFAULT_POOL_SIZE):
+        """Initialize database connection, embedding model and shared embedding cache
+        
+        embedding_storage selects how new embeddings are written: 'bytea'
+        (binary float32 in the embedding column) or 'json' (legacy text in
+        embedding_vector). Both are read back. Connections come from a
+        process-wide pool of up to pool_size connections per database.
+        """
         self.db_config = {
             'dbname': db_name,
             'user': db_user,
             'host': db_host,
             'port': db_port
         }
+        if embedding_storage not in EMBEDDING_STORAGE:
+            raise ValueError(f"Unknown embedding storage '{embedding_storage}'; expected one of {EMBEDDING_STORAGE}")
+        self.embedding_storage = embedding_storage
+        if get_pool is None:
+            raise ImportError("psycopg2 is required for PostgreSQL; use sqlite_store.SqliteDatabaseManager without it")
+        self.pool = get_pool(self.db_config, pool_size)
         
-        # Initialize embedding model
-        logger.info("Loading sentence transformer model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("Model loaded successfully!")
+        self._init_embeddings(embedding_cache)
+        self.section_index = SectionVectorIndex()
         
         # Test database connection
         self._test_connection()
     
+    def _init_embeddings(self, embedding_cache: Optional[EmbeddingCache]) -> None:
+        """Load the embedding model behind the shared embedding cache"""
+        logger.info("Loading sentence transformer model...")
+        self.embedding_model = SentenceTransformer(self.MODEL_NAME)
+        self.encoder = CachedEncoder(self.embedding_model, self.MODEL_NAME, embedding_cache)
+        self.query_encoder = QueryEncoder(self.embedding_model)
+        logger.info("Model loaded successfully!")
+    
     def _test_connection(self) -> None:
         """Test database connection"""
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with self.pool.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute("SELECT version();")
                     version = cur.fetchone()[0]
@@ -60,7 +102,7 @@ class DatabaseManager:
             return [0.0] * 384  # all-MiniLM-L6-v2 has 384 dimensions
         
         # Combine title and description for better semantic representation
-        embedding = self.embedding_model.encode(text, normalize_embeddings=True)
+        embedding = self.encoder.encode([text], normalize=True)[0]
         return embedding.tolist()
     
     def create_embedding_text(self, section: Section) -> str:
@@ -77,67 +119,34 @@ class DatabaseManager:
         
         return ". ".join(parts)
     
-    def insert_sections(self, sections: List[Section]) -> None:
+    def embed_sections(self, sections: List[Section], batch_size: int = 256) -> List[Optional[np.ndarray]]:
+        """Generate embeddings for sections in large batches; empty texts get a zero vector"""
+        texts = [self.create_embedding_text(section) for section in sections]
+        non_empty = [i for i, text in enumerate(texts) if text.strip()]
+        
+        embeddings = [np.zeros(384, dtype=np.float32)] * len(sections)  # all-MiniLM-L6-v2 has 384 dimensions
+        for start in range(0, len(non_empty), batch_size):
+            batch = non_empty[start:start + batch_size]
+            vectors = self.encoder.encode([texts[i] for i in batch], batch_size=batch_size, normalize=True)
+            for i, vector in zip(batch, vectors):
+                embeddings[i] = vector
+            logger.info(f"Embedded {min(start + batch_size, len(non_empty))}/{len(non_empty)} sections")
+        
+        return embeddings
+    
+    def insert_sections(self, sections: List[Section], chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
         """Insert sections into database with embeddings"""
         logger.info(f"Inserting {len(sections)} sections into database...")
         
-        insert_query = """
-        INSERT INTO ecma_sections (
-            level1, level2, level3, level4, level5,
-            full_section_number, title, description,
-            page_reference, section_type, depth, 
-            parent_id, embedding_vector
-        ) VALUES (
-            %s, %s, %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s
-        ) RETURNING id;
-        """
-        
-        # Create a mapping of section numbers to database IDs for parent relationships
-        section_id_map = {}
+        # Stage 1: embed everything before touching the database
+        embeddings = self.embed_sections(sections)
         
+        # Stage 2: stream rows with COPY; ids and parent_id are resolved client-side
         try:
-            with psycopg2.connect(**self.db_config) as conn:
-                with conn.cursor() as cur:
-                    for i, section in enumerate(sections):
-                        if i % 100 == 0:
-                            logger.info(f"Processing section {i+1}/{len(sections)}")
-                        
-                        # Generate embedding
-                        embedding_text = self.create_embedding_text(section)
-                        embedding_vector = self.generate_embedding(embedding_text)
-                        embedding_json = json.dumps(embedding_vector)
-                        
-                        # Find parent ID if exists
-                        parent_id = None
-                        if section.parent_section and section.parent_section in section_id_map:
-                            parent_id = section_id_map[section.parent_section]
-                        
-                        # Insert section
-                        cur.execute(insert_query, (
-                            section.level1,
-                            section.level2,
-                            section.level3,
-                            section.level4,
-                            section.level5,
-                            section.full_section_number,
-                            section.title,
-                            section.description,
-                            section.page_reference,
-                            section.section_type,
-                            section.depth,
-                            parent_id,
-                            embedding_json
-                        ))
-                        
-                        # Get the inserted ID and map it
-                        section_id = cur.fetchone()[0]
-                        section_id_map[section.full_section_number] = section_id
-                    
-                    conn.commit()
-                    logger.info(f"Successfully inserted {len(sections)} sections!")
+            with self.pool.connection() as conn:
+                copy_sections(conn, sections, embeddings, self.embedding_storage, chunk_size)
+                conn.commit()
+                logger.info(f"Successfully inserted {len(sections)} sections!")
                     
         except Exception as e:
             logger.error(f"Error inserting sections: {e}")
@@ -148,59 +157,44 @@ class DatabaseManager:
         logger.info(f"Searching for: '{query}'")
         
         # Generate query embedding
-        query_embedding = self.generate_embedding(query)
-        query_embedding_json = json.dumps(query_embedding)
+        query_embedding = self.query_encoder.encode(query)
         
-        # Use cosine similarity for semantic search
-        search_query = """
-        WITH query_embedding AS (
-            SELECT %s::text as embedding_vector
-        ),
-        similarities AS (
-            SELECT 
-                s.id, s.full_section_number, s.title, s.description,
-                s.level1, s.level2, s.level3, s.level4, s.level5,
-                s.depth, s.section_type, s.page_reference,
-                -- Calculate cosine similarity
-                (
-                    SELECT SUM(a.value * b.value) / 
-                    (SQRT(SUM(a.value * a.value)) * SQRT(SUM(b.value * b.value)))
-                    FROM (
-                        SELECT unnest(
-                            ARRAY(SELECT json_array_elements_text(s.embedding_vector::json))::float[]
-                        ) as value
-                    ) a,
-                    (
-                        SELECT unnest(
-                            ARRAY(SELECT json_array_elements_text(q.embedding_vector::json))::float[]
-                        ) as value
-                        FROM query_embedding q
-                    ) b
-                ) AS similarity
-            FROM ecma_sections s
-            CROSS JOIN query_embedding q
-            WHERE s.embedding_vector IS NOT NULL
-        )
-        SELECT * FROM similarities
-        WHERE similarity > 0.3  -- Minimum similarity threshold
-        ORDER BY similarity DESC
-        LIMIT %s;
+        # Rank every section in memory, then fetch only the winning rows
+        rows_query = f"""
+        SELECT {self.SEARCH_COLUMNS}
+        FROM ecma_sections
+        WHERE id = ANY(%s);
         """
         
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with self.pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(search_query, (query_embedding_json, limit))
-                    results = cur.fetchall()
+                    hits = self.section_index.search(cur, query_embedding, limit,
+                                                     self.MIN_SIMILARITY)
+                    if not hits:
+                        return []
                     
-                    # Convert to dictionaries
-                    columns = [desc[0] for desc in cur.description]
-                    return [dict(zip(columns, row)) for row in results]
+                    cur.execute(rows_query, ([section_id for section_id, _ in hits],))
+                    return self._rank_rows(cur, hits)
                     
         except Exception as e:
             logger.error(f"Error searching sections: {e}")
             raise
     
+    @staticmethod
+    def _rank_rows(cur, hits: List[tuple]) -> List[Dict[str, Any]]:
+        """Turn fetched section rows into results in similarity order"""
+        columns = [desc[0] for desc in cur.description]
+        rows = {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+        
+        # Keep similarity order; skip rows deleted since the matrix was loaded
+        results = []
+        for section_id, similarity in hits:
+            if section_id in rows:
+                rows[section_id]['similarity'] = similarity
+                results.append(rows[section_id])
+        return results
+    
     def get_section_hierarchy(self, section_number: str) -> List[Dict[str, Any]]:
         """Get the full hierarchy path for a section"""
         query = """
@@ -210,7 +204,7 @@ class DatabaseManager:
         """
         
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with self.pool.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, (section_number,))
                     results = cur.fetchall()
@@ -231,7 +225,7 @@ class DatabaseManager:
         """
         
         try:
-            with psycopg2.connect(**self.db_config) as conn:
+            with self.pool.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, (section_number,))
                     results = cur.fetchall()
@@ -245,6 +239,18 @@ class DatabaseManager:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cur:
+                    return self._collect_statistics(cur)
+                    
+        except Exception as e:
+            logger.error(f"Error getting statistics: {e}")
+            raise
+    
+    @staticmethod
+    def _collect_statistics(cur) -> Dict[str, Any]:
+        """Run the statistics queries, which are portable SQL, on an open cursor"""
         stats_query = """
         SELECT 
             COUNT(*) as total_sections,
@@ -253,7 +259,7 @@ class DatabaseManager:
             COUNT(DISTINCT level3) as level3_count,
             COUNT(DISTINCT level4) as level4_count,
             COUNT(DISTINCT level5) as level5_count,
-            COUNT(CASE WHEN embedding_vector IS NOT NULL THEN 1 END) as sections_with_embeddings
+            COUNT(CASE WHEN embedding IS NOT NULL OR embedding_vector IS NOT NULL THEN 1 END) as sections_with_embeddings
         FROM ecma_sections;
         """
         
@@ -271,30 +277,23 @@ class DatabaseManager:
         ORDER BY count DESC;
         """
         
-        try:
-            with psycopg2.connect(**self.db_config) as conn:
-                with conn.cursor() as cur:
-                    # Get general stats
-                    cur.execute(stats_query)
-                    stats = dict(zip([desc[0] for desc in cur.description], cur.fetchone()))
-                    
-                    # Get depth distribution
-                    cur.execute(depth_query)
-                    depth_dist = {row[0]: row[1] for row in cur.fetchall()}
-                    
-                    # Get type distribution
-                    cur.execute(type_query)
-                    type_dist = {row[0]: row[1] for row in cur.fetchall()}
-                    
-                    return {
-                        'general': stats,
-                        'depth_distribution': depth_dist,
-                        'type_distribution': type_dist
-                    }
-                    
-        except Exception as e:
-            logger.error(f"Error getting statistics: {e}")
-            raise
+        # Get general stats
+        cur.execute(stats_query)
+        stats = dict(zip([desc[0] for desc in cur.description], cur.fetchone()))
+        
+        # Get depth distribution
+        cur.execute(depth_query)
+        depth_dist = {row[0]: row[1] for row in cur.fetchall()}
+        
+        # Get type distribution
+        cur.execute(type_query)
+        type_dist = {row[0]: row[1] for row in cur.fetchall()}
+        
+        return {
+            'general': stats,
+            'depth_distribution': depth_dist,
+            'type_distribution': type_dist
+        }
 
 def main():
     """Main function for testing database operations"""
@@ -37,8 +37,13 @@ CREATE TABLE ecma_sections (
     parent_id INTEGER REFERENCES ecma_sections(id),
     
     -- Embedding vector for semantic search (384 dimensions for sentence-transformers)
-    -- Using TEXT to store JSON array until pgvector is available
-    embedding_vector TEXT,  -- Will store JSON array of floats
+    -- Stored as little-endian float32 bytes (384 * 4 = 1536 bytes) until pgvector is available
+    embedding BYTEA,
+    -- Legacy JSON array of floats; convert with migrate_embeddings.py
+    embedding_vector TEXT,
+    
+    -- SHA-256 of number, title and description; lets section_sync.py skip unchanged rows
+    content_hash TEXT,
     
     -- Timestamps
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -72,6 +77,27 @@ CREATE TRIGGER update_ecma_sections_updated_at
     FOR EACH ROW 
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Bumped once per writing statement, so in-memory search matrices know when
+-- to reload; unlike updated_at it cannot repeat within a transaction
+CREATE TABLE section_meta (
+    key TEXT PRIMARY KEY,
+    value BIGINT NOT NULL
+);
+INSERT INTO section_meta (key, value) VALUES ('generation', 0);
+
+CREATE OR REPLACE FUNCTION bump_section_generation()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE section_meta SET value = value + 1 WHERE key = 'generation';
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER ecma_sections_generation
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ecma_sections
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_section_generation();
+
 -- View for easy hierarchical queries
 CREATE VIEW ecma_hierarchy AS
 SELECT 
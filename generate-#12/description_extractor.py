@@ -7,15 +7,19 @@ Systematically extracts descriptions from the markdown file for missing level 5
 import re
 import json
 import logging
+from collections import defaultdict
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-import psycopg2
 from database_manager import DatabaseManager
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Table of contents lines (dots and page numbers) are never documentation
+TOC_LINE = re.compile(r'\\.{3,}.*?\d+\s*$')
+WORD = re.compile(r'\w+')
+
 class DescriptionExtractor:
     """Extracts descriptions for ECMA-376 elements from markdown"""
     
@@ -23,14 +27,64 @@ class DescriptionExtractor:
         self.markdown_file = Path(markdown_file)
         self.content = ""
         self.lines = []
+        self.indexed = False
         
     def load_content(self):
-        """Load the markdown file content"""
+        """Load the markdown file content and index it"""
         logger.info(f"Loading content from {self.markdown_file}")
         with open(self.markdown_file, 'r', encoding='utf-8') as f:
             self.content = f.read()
         self.lines = self.content.split('\n')
         logger.info(f"Loaded {len(self.lines)} lines")
+        self.build_index()
+    
+    def build_index(self):
+        """
+        Index every line once so section lookups never rescan the file.
+        
+        Lookups use these indexes to find candidate lines and then confirm
+        them with the original patterns, so results match a full scan:
+        - lines_by_first_token: first word of the line ("20.1.2.2.1"), for
+          section-number headers
+        - lines_by_call_prefix: text before the first "(" ("alpha" in
+          "alpha (Alpha)"), for element headers
+        - lines_by_tag_word: words inside <...> tags, for XML examples
+        """
+        self.lower_lines = [line.lower() for line in self.lines]
+        self.toc_lines = set()
+        self.lines_by_first_token = defaultdict(list)
+        self.lines_by_call_prefix = defaultdict(list)
+        self.lines_by_tag_word = defaultdict(list)
+        self.tag_lines = []
+        self._context_cache = {}
+        
+        for i, line in enumerate(self.lines):
+            line_stripped = line.strip()
+            if not line_stripped:
+                continue
+            
+            lowered = line_stripped.lower()
+            self.lines_by_first_token[lowered.split(None, 1)[0]].append(i)
+            
+            if TOC_LINE.search(line_stripped):
+                self.toc_lines.add(i)
+                continue
+            
+            if '(' in lowered:
+                self.lines_by_call_prefix[lowered[:lowered.index('(')].rstrip()].append(i)
+            
+            if '<' in lowered and '>' in lowered:
+                # The widest <...> span ending at each ">" covers every tag match
+                tags = [segment[segment.index('<') + 1:]
+                        for segment in lowered.split('>')[:-1] if '<' in segment]
+                if tags:
+                    self.tag_lines.append(i)
+                    for word in set(WORD.findall(' '.join(tags))):
+                        self.lines_by_tag_word[word].append(i)
+        
+        self.indexed = True
+        logger.info(f"Indexed {len(self.lines)} lines "
+                    f"({len(self.lines_by_tag_word)} distinct tag words)")
     
     def find_section_content(self, section_number: str, title: str) -> Optional[str]:
         """Find and extract content for a specific section"""
@@ -61,18 +115,19 @@ class DescriptionExtractor:
             rf'<[^>]*{re.escape(element_name)}[^>]*>',
         ]
         
+        doc_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in doc_patterns]
         potential_sections = []
         
-        # Search for documentation patterns
-        for i, line in enumerate(self.lines):
-            line_stripped = line.strip()
+        # Search for documentation patterns on the indexed candidate lines only
+        for i in self._documentation_candidates(section_number, element_name):
+            line_stripped = self.lines[i].strip()
             
             # Skip table of contents lines (those with dots and page numbers)
-            if re.search(r'\\.{3,}.*?\d+\s*$', line_stripped):
+            if i in self.toc_lines:
                 continue
             
             for pattern in doc_patterns:
-                if re.search(pattern, line_stripped, re.IGNORECASE):
+                if pattern.search(line_stripped):
                     # Check if this looks like actual documentation
                     if self._is_documentation_context(i, element_name):
                         potential_sections.append(i)
@@ -89,14 +144,39 @@ class DescriptionExtractor:
         
         return None
     
+    def _documentation_candidates(self, section_number: str, element_name: str) -> List[int]:
+        """Lines that may match a documentation pattern, in file order"""
+        if not self.indexed:
+            self.build_index()
+        
+        section_key = section_number.lower()
+        element_key = element_name.lower()
+        candidates = set(self.lines_by_first_token.get(section_key, ()))
+        candidates.update(self.lines_by_call_prefix.get(element_key, ()))
+        
+        if WORD.fullmatch(element_key):
+            # A word can only occur inside a longer word of the tag text
+            for word, lines in self.lines_by_tag_word.items():
+                if element_key in word:
+                    candidates.update(lines)
+        else:
+            candidates.update(self.tag_lines)
+        
+        return sorted(candidates)
+    
     def _is_documentation_context(self, line_index: int, element_name: str) -> bool:
         """Check if the context around a line looks like documentation"""
+        # The answer depends only on the line, so each window is checked once
+        cached = self._context_cache.get(line_index)
+        if cached is not None:
+            return cached
+        
         # Look at surrounding lines for documentation indicators
         start = max(0, line_index - 5)
         end = min(len(self.lines), line_index + 20)
         
-        context_lines = self.lines[start:end]
-        context_text = ' '.join(context_lines).lower()
+        context_lines = self.lower_lines[start:end]
+        context_text = ' '.join(context_lines)
         
         # Indicators of documentation content
         doc_indicators = [
@@ -114,7 +194,8 @@ class DescriptionExtractor:
         ]
         
         indicator_count = sum(1 for indicator in doc_indicators if indicator in context_text)
-        return indicator_count >= 2
+        self._context_cache[line_index] = indicator_count >= 2
+        return self._context_cache[line_index]
     
     def _extract_documentation_content(self, start_line: int, element_name: str) -> str:
         """Extract documentation content starting from a specific line"""
@@ -208,8 +289,12 @@ class DescriptionExtractor:
             rf'^{re.escape(section_number)}\s+{re.escape(title)}',
         ]
         
-        for i, line in enumerate(self.lines):
-            line_stripped = line.strip()
+        if not self.indexed:
+            self.build_index()
+        
+        # Both patterns start with the section number as the line's first word
+        for i in self.lines_by_first_token.get(section_number.lower(), ()):
+            line_stripped = self.lines[i].strip()
             for pattern in patterns:
                 if re.search(pattern, line_stripped, re.IGNORECASE):
                     return self._extract_content_after_header(i, section_number)
@@ -334,7 +419,7 @@ def extract_descriptions_for_missing_sections():
     db = DatabaseManager()
     
     # Get sections without descriptions
-    with psycopg2.connect(**db.db_config) as conn:
+    with db.pool.connection() as conn:
         with conn.cursor() as cur:
             cur.execute('''
                 SELECT full_section_number, title
@@ -357,14 +442,13 @@ def extract_descriptions_for_missing_sections():
             
             if description and len(description.strip()) > 10:  # Minimum meaningful length
                 # Update database
-                with psycopg2.connect(**db.db_config) as conn:
+                with db.pool.connection() as conn:
                     with conn.cursor() as cur:
                         cur.execute('''
                             UPDATE ecma_sections 
                             SET description = %s
                             WHERE full_section_number = %s
                         ''', (description, section_number))
-                        conn.commit()
                 
                 logger.info(f"✅ Updated {section_number} - {title}")
                 logger.info(f"   Description: {description[:100]}...")
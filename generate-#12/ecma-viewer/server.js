@@ -60,7 +60,7 @@ app.get('/api/stats', async (req, res) => {
         COUNT(DISTINCT level3) as level3_count,
         COUNT(DISTINCT level4) as level4_count,
         COUNT(DISTINCT level5) as level5_count,
-        COUNT(CASE WHEN embedding_vector IS NOT NULL THEN 1 END) as sections_with_embeddings
+        COUNT(CASE WHEN embedding IS NOT NULL OR embedding_vector IS NOT NULL THEN 1 END) as sections_with_embeddings
       FROM ecma_sections
     `);
     
@@ -4,12 +4,14 @@ ECMA-376 Markdown Parser
 Extracts hierarchical content structure from ECMA-376.md file
 """
 
-import re
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from ecma_tokenizer import (BARE_LEVEL1_HEADER, SECTION_HEADER_PATTERNS, Token,
+                            is_table_of_contents_line, should_skip_line, stream_lines,
+                            strip_page_reference, tokenize)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,22 +45,6 @@ class EcmaParser:
         self.sections: List[Section] = []
         self.section_hierarchy: Dict[str, str] = {}  # Maps section numbers to parent section numbers
         
-        # Regular expressions for parsing - more restrictive patterns
-        self.section_patterns = [
-            # Pattern for main sections with dots like "1.  Scope .... 1"
-            r'^(\d+)\.\s\s+([A-Z][A-Za-z\s\-]+?)(?:\s+\.{3,}\s*(\d+))?$',
-            # Pattern for main sections without dots like "12." (title on next line)
-            r'^(\d+)\.\s*$',
-            # Pattern for subsections like "8.4  WordprocessingML .... 16"
-            r'^(\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
-            # Pattern for detailed sections like "11.3.10  Main Document Part .... 432"
-            r'^(\d+\.\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
-            # Pattern for deep sections like "17.3.1.1  mirrorIndents .... 232"
-            r'^(\d+\.\d+\.\d+\.\d+)\s\s+([A-Za-z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
-            # Pattern for deepest sections like "20.1.2.2.1  bldChart (Build Chart) .... 2728"
-            r'^(\d+\.\d+\.\d+\.\d+\.\d+)\s\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]+)\)(?:\s+\.{3,}\s*(\d+))?$',
-        ]
-        
         # Known level 1 sections that should be captured
         self.level1_sections = {
             '1': 'Scope',
@@ -96,30 +82,30 @@ class EcmaParser:
         if not self.markdown_file.exists():
             raise FileNotFoundError(f"Markdown file not found: {self.markdown_file}")
         
-        with open(self.markdown_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        lines = content.split('\n')
-        self._parse_lines(lines)
+        self._parse_tokens(tokenize(stream_lines(self.markdown_file)))
         
         logger.info(f"Parsed {len(self.sections)} sections")
         return self.sections
     
     def _parse_lines(self, lines: List[str]) -> None:
         """Parse individual lines to extract sections"""
+        self._parse_tokens(tokenize(lines))
+    
+    def _parse_tokens(self, tokens: Iterable[Token]) -> None:
+        """Extract sections from a stream of tokenized lines"""
         current_description = []
         last_section = None
         seen_sections = set()  # Track seen section numbers to avoid duplicates
         
-        for i, line in enumerate(lines):
-            line = line.strip()
+        for token in tokens:
+            line = token.text
             
             # Skip lines that shouldn't be processed
-            if self._should_skip_line(line):
+            if should_skip_line(line):
                 continue
             
             # Try to match section patterns
-            section = self._parse_section_line(line, i, lines)
+            section = self._parse_section_line(token)
             
             if section:
                 # Skip duplicate section numbers
@@ -140,9 +126,9 @@ class EcmaParser:
                 
             else:
                 # Collect description text
-                if last_section and line and not self._is_table_of_contents_line(line):
+                if last_section and line and not is_table_of_contents_line(line):
                     # Skip page numbers and dots
-                    cleaned_line = re.sub(r'\.{3,}.*?\d+\s*$', '', line).strip()
+                    cleaned_line = strip_page_reference(line)
                     if cleaned_line and len(cleaned_line) > 3:
                         current_description.append(cleaned_line)
         
@@ -150,52 +136,50 @@ class EcmaParser:
         if last_section and current_description:
             last_section.description = ' '.join(current_description).strip()
     
-    def _parse_section_line(self, line: str, line_index: int, lines: List[str]) -> Optional[Section]:
+    def _parse_section_line(self, token: Token) -> Optional[Section]:
         """Parse a single line to extract section information"""
-        for i, pattern in enumerate(self.section_patterns):
-            match = re.match(pattern, line)
-            if match:
-                section_number = match.group(1)
-                
-                # Handle different pattern formats
-                if i == 1:  # Pattern for "12." (title on next line)
-                    # Check if this is a valid level 1 section
-                    if section_number in self.level1_sections:
-                        title = self.level1_sections[section_number]
-                        page_ref = None
-                    else:
-                        continue
-                elif i == 5:  # Level 5 pattern with parentheses: "20.1.2.2.1  bldChart (Build Chart)"
-                    element_name = match.group(2).strip()
-                    description = match.group(3).strip()
-                    title = f"{element_name} ({description})"
-                    page_ref = match.group(4) if len(match.groups()) > 3 and match.group(4) else None
+        for i, match in token.header_matches():
+            section_number = match.group(1)
+            
+            # Handle different pattern formats
+            if i == BARE_LEVEL1_HEADER:  # Pattern for "12." (title on next line)
+                # Check if this is a valid level 1 section
+                if section_number in self.level1_sections:
+                    title = self.level1_sections[section_number]
+                    page_ref = None
                 else:
-                    title = match.group(2).strip() if len(match.groups()) > 1 and match.group(2) else ""
-                    page_ref = match.group(3) if len(match.groups()) > 2 and match.group(3) else None
-                
-                # Skip if title is empty
-                if not title:
                     continue
-                
-                # Skip if title is too short (likely not a real section)
-                if len(title.strip()) < 3:
+            elif i == 5:  # Level 5 pattern with parentheses: "20.1.2.2.1  bldChart (Build Chart)"
+                element_name = match.group(2).strip()
+                description = match.group(3).strip()
+                title = f"{element_name} ({description})"
+                page_ref = match.group(4) if len(match.groups()) > 3 and match.group(4) else None
+            else:
+                title = match.group(2).strip() if len(match.groups()) > 1 and match.group(2) else ""
+                page_ref = match.group(3) if len(match.groups()) > 2 and match.group(3) else None
+            
+            # Skip if title is empty
+            if not title:
+                continue
+            
+            # Skip if title is too short (likely not a real section)
+            if len(title.strip()) < 3:
+                continue
+            
+            # Validate section number format
+            if not self._is_valid_section_number(section_number):
+                continue
+            
+            # For level 1 sections, only accept if it's in our known list and has proper context
+            if '.' not in section_number:
+                if section_number not in self.level1_sections:
                     continue
-                
-                # Validate section number format
-                if not self._is_valid_section_number(section_number):
+                # Additional validation for level 1 sections
+                if not self._is_valid_level1_context(token.text, token.index, token.ahead):
                     continue
-                
-                # For level 1 sections, only accept if it's in our known list and has proper context
-                if '.' not in section_number:
-                    if section_number not in self.level1_sections:
-                        continue
-                    # Additional validation for level 1 sections
-                    if not self._is_valid_level1_context(line, line_index, lines):
-                        continue
-                
-                return self._create_section(section_number, title, page_ref)
-        
+            
+            return self._create_section(section_number, title, page_ref)
+
         return None
     
     def _create_section(self, section_number: str, title: str, page_ref: Optional[str]) -> Section:
@@ -285,54 +269,25 @@ class EcmaParser:
         except:
             return False
     
-    def _is_table_of_contents_line(self, line: str) -> bool:
-        """Check if line is part of table of contents (has dots and page numbers)"""
-        return bool(re.search(r'\.{3,}.*?\d+\s*$', line))
-    
-    def _should_skip_line(self, line: str) -> bool:
-        """Check if line should be skipped during parsing"""
-        line = line.strip()
-        if not line:
-            return True
-            
-        # Skip lines that are clearly not section headers
-        skip_patterns = [
-            r'^[a-z]',  # Lines starting with lowercase (likely content)
-            r'^\[',     # Lines starting with brackets
-            r'^\s*$',   # Empty lines
-            r'^[A-Z]{2,}:',  # Lines like "NOTE:", "EXAMPLE:", etc.
-            r'^\s*\d+\s*$',  # Lines with just numbers
-            r'^[^0-9]',  # Lines not starting with numbers (except for specific patterns)
-            r'^\d+\s*[a-z]',  # Lines like "1 some text" without proper formatting
-        ]
-        
-        for pattern in skip_patterns:
-            if re.match(pattern, line):
-                return True
-                
-        return False
-    
-    def _is_valid_level1_context(self, line: str, line_index: int, lines: List[str]) -> bool:
+    def _is_valid_level1_context(self, line: str, line_index: int, ahead: Sequence[str]) -> bool:
         """Check if this is a valid level 1 section based on context"""
         # Check if we're in the table of contents area (first 1000 lines)
         # or in a main section area
         if line_index > 1000:
             # For sections after table of contents, be very strict
             # Only accept if the line has dots leading to page numbers
-            if re.search(r'\.{3,}.*?\d+\s*$', line):
+            if is_table_of_contents_line(line):
                 return True
             # Or if it's the simple format that appears at known locations
-            section_num = re.match(r'^(\d+)\.\s*$', line)
+            section_num = SECTION_HEADER_PATTERNS[BARE_LEVEL1_HEADER].match(line)
             if section_num:
                 num = section_num.group(1)
                 # Check if the next few lines contain the expected title
-                for j in range(1, 5):  # Check next 4 lines
-                    if line_index + j < len(lines):
-                        next_line = lines[line_index + j].strip()
-                        if next_line and num in self.level1_sections:
-                            expected_title = self.level1_sections[num]
-                            if expected_title.lower() in next_line.lower():
-                                return True
+                for next_line in ahead[:4]:  # Check next 4 lines
+                    if next_line and num in self.level1_sections:
+                        expected_title = self.level1_sections[num]
+                        if expected_title.lower() in next_line.lower():
+                            return True
                 return False
         
         # In table of contents area, accept valid sections
@@ -4,12 +4,12 @@ ECMA-376 Markdown Parser - FIXED VERSION
 Correctly extracts descriptions from element title to next element title
 """
 
-import re
 import json
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from ecma_tokenizer import SectionStart, Token, is_noise_line, section_starts, stream_lines, tokenize
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -43,9 +43,6 @@ class EcmaParserFixed:
         self.sections: List[Section] = []
         self.section_hierarchy: Dict[str, str] = {}
         
-        # Updated pattern to match section structure like "20.1.2.2.1"
-        self.section_number_pattern = r'^(\d+(?:\.\d+){0,4})$'
-        
         # Pattern to match element titles like "bldChart (Build Chart)"
         self.element_title_pattern = r'^([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]+)\)$'
         
@@ -59,120 +56,51 @@ class EcmaParserFixed:
         if not self.markdown_file.exists():
             raise FileNotFoundError(f"Markdown file not found: {self.markdown_file}")
         
-        with open(self.markdown_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        lines = content.split('\n')
-        self._parse_lines_fixed(lines)
+        self._parse_tokens(tokenize(stream_lines(self.markdown_file)))
         
         logger.info(f"Parsed {len(self.sections)} sections")
         return self.sections
     
     def _parse_lines_fixed(self, lines: List[str]) -> None:
         """Fixed parsing logic to correctly extract descriptions"""
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Skip empty lines
-            if not line:
-                i += 1
+        self._parse_tokens(tokenize(lines))
+    
+    def _parse_tokens(self, tokens: Iterable[Token]) -> None:
+        """
+        Extract sections in one pass: a section runs from its number and
+        title to the next section number that is followed by a title.
+        """
+        current = None
+        description_lines = []
+        skip_until = -1
+        
+        for token, start in section_starts(tokens):
+            # Lines between a section number and its title belong to neither
+            if token.index <= skip_until:
                 continue
-                
-            # Check if this line is a section number
-            section_match = re.match(self.section_number_pattern, line)
             
-            if section_match:
-                section_number = section_match.group(1)
+            if start:
+                if current:
+                    self._add_section(current, description_lines)
+                    current = None
                 
-                # Look for the title in the next few lines
-                title_line_idx = self._find_title_line(lines, i + 1)
+                # Skip table of contents entries (have dots and page numbers)
+                if start.is_table_of_contents:
+                    continue
                 
-                if title_line_idx != -1:
-                    title = lines[title_line_idx].strip()
-                    
-                    # Skip table of contents entries (have dots and page numbers)
-                    if '...' in title and re.search(r'\d+\s*$', title):
-                        i += 1
-                        continue
-                    
-                    # Extract description starting from after the title
-                    description_start = title_line_idx + 1
-                    description_end = self._find_next_section_start(lines, description_start)
-                    
-                    # Extract description text
-                    description_lines = []
-                    for desc_idx in range(description_start, description_end):
-                        desc_line = lines[desc_idx].strip()
-                        if desc_line and not self._is_noise_line(desc_line):
-                            description_lines.append(desc_line)
-                    
-                    description = ' '.join(description_lines).strip()
-                    
-                    # Clean up title (remove page numbers and dots)
-                    clean_title = re.sub(r'\s*\.{3,}.*$', '', title).strip()
-                    
-                    # Create section
-                    section = self._create_section(section_number, clean_title, description)
-                    self.sections.append(section)
-                    
-                    # Move to the next section
-                    i = description_end
-                else:
-                    i += 1
-            else:
-                i += 1
-    
-    def _find_title_line(self, lines: List[str], start_idx: int) -> int:
-        """Find the title line after a section number"""
-        # Look in the next few lines for the title
-        for i in range(start_idx, min(start_idx + 5, len(lines))):
-            line = lines[i].strip()
-            if line and not line.isdigit() and len(line) > 2:
-                # Skip obvious noise lines
-                if not self._is_noise_line(line):
-                    return i
-        return -1
-    
-    def _find_next_section_start(self, lines: List[str], start_idx: int) -> int:
-        """Find where the next section starts"""
-        for i in range(start_idx, len(lines)):
-            line = lines[i].strip()
-            
-            # Check if this is a section number
-            if re.match(self.section_number_pattern, line):
-                # Verify it's followed by a title
-                title_idx = self._find_title_line(lines, i + 1)
-                if title_idx != -1:
-                    return i
-        
-        return len(lines)
+                current = start
+                description_lines = []
+                skip_until = start.title_index
+            elif current and token.text and not is_noise_line(token.text):
+                description_lines.append(token.text)
+        
+        if current:
+            self._add_section(current, description_lines)
     
-    def _is_noise_line(self, line: str) -> bool:
-        """Check if line is noise (page numbers, headers, etc.)"""
-        line = line.strip()
-        
-        # Skip very short lines
-        if len(line) < 3:
-            return True
-            
-        # Skip lines that are just numbers
-        if line.isdigit():
-            return True
-            
-        # Skip lines that are just page references
-        if re.match(r'^\d+\s*$', line):
-            return True
-            
-        # Skip obvious headers
-        if line in ['ECMA-376 Part 1', '20. DrawingML - Framework Reference Material']:
-            return True
-            
-        # Skip lines with just dots
-        if re.match(r'^\.+$', line):
-            return True
-            
-        return False
+    def _add_section(self, start: SectionStart, description_lines: List[str]) -> None:
+        """Create a section from its start and collected description lines"""
+        description = ' '.join(description_lines).strip()
+        self.sections.append(self._create_section(start.section_number, start.clean_title, description))
     
     def _create_section(self, section_number: str, title: str, description: str) -> Section:
         """Create a Section object from parsed components"""
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+ECMA-376 Markdown Tokenizer
+Streams ecma-376.md line by line with precompiled patterns and a small
+lookahead window, shared by EcmaParser and EcmaParserFixed
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+# One-line section headers, tried in order by EcmaParser
+SECTION_HEADER_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    # Pattern for main sections with dots like "1.  Scope .... 1"
+    r'^(\d+)\.\s\s+([A-Z][A-Za-z\s\-]+?)(?:\s+\.{3,}\s*(\d+))?$',
+    # Pattern for main sections without dots like "12." (title on next line)
+    r'^(\d+)\.\s*$',
+    # Pattern for subsections like "8.4  WordprocessingML .... 16"
+    r'^(\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+    # Pattern for detailed sections like "11.3.10  Main Document Part .... 432"
+    r'^(\d+\.\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+    # Pattern for deep sections like "17.3.1.1  mirrorIndents .... 232"
+    r'^(\d+\.\d+\.\d+\.\d+)\s\s+([A-Za-z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+    # Pattern for deepest sections like "20.1.2.2.1  bldChart (Build Chart) .... 2728"
+    r'^(\d+\.\d+\.\d+\.\d+\.\d+)\s\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]+)\)(?:\s+\.{3,}\s*(\d+))?$',
+))
+
+# Index of the "12." pattern, whose title is on a following line
+BARE_LEVEL1_HEADER = 1
+
+# A section number alone on its line, like "20.1.2.2.1"
+SECTION_NUMBER_PATTERN = re.compile(r'^(\d+(?:\.\d+){0,4})$')
+
+# Table of contents entries end in dot leaders and a page number
+TOC_LINE_PATTERN = re.compile(r'\.{3,}.*?\d+\s*$')
+TOC_TITLE_PATTERN = re.compile(r'\s*\.{3,}.*$')
+PAGE_NUMBER_PATTERN = re.compile(r'\d+\s*$')
+
+# Lines that can never start a one-line header: lowercase, brackets, blank,
+# "NOTE:" labels, bare numbers, non-digits and "1 some text"
+SKIP_LINE_PATTERN = re.compile(r'[a-z]|\[|\s*$|[A-Z]{2,}:|\s*\d+\s*$|[^0-9]|\d+\s*[a-z]')
+
+DOTS_PATTERN = re.compile(r'\.+$')
+NOISE_HEADERS = frozenset({'ECMA-376 Part 1', '20. DrawingML - Framework Reference Material'})
+
+# Lines EcmaParserFixed searches for a title after a section number
+TITLE_LOOKAHEAD = 5
+
+
+class Token(NamedTuple):
+    """One stripped line of the document and the stripped lines that follow it"""
+    index: int
+    text: str
+    ahead: Tuple[str, ...]
+
+    def header_matches(self) -> Iterator[Tuple[int, re.Match]]:
+        """(pattern index, match) for each one-line header pattern the line matches"""
+        for i, pattern in enumerate(SECTION_HEADER_PATTERNS):
+            match = pattern.match(self.text)
+            if match:
+                yield i, match
+
+
+@dataclass(frozen=True)
+class SectionStart:
+    """A section number followed by its title within TITLE_LOOKAHEAD lines"""
+    section_number: str
+    title: str
+    title_index: int
+
+    @property
+    def is_table_of_contents(self) -> bool:
+        """Table of contents entries have dot leaders and a page number"""
+        return '...' in self.title and bool(PAGE_NUMBER_PATTERN.search(self.title))
+
+    @property
+    def clean_title(self) -> str:
+        """Title without dot leaders and page number"""
+        return TOC_TITLE_PATTERN.sub('', self.title).strip()
+
+
+def is_table_of_contents_line(line: str) -> bool:
+    """Check if line is part of table of contents (has dots and page numbers)"""
+    return bool(TOC_LINE_PATTERN.search(line))
+
+
+def strip_page_reference(line: str) -> str:
+    """Remove trailing dot leaders and page number"""
+    return TOC_LINE_PATTERN.sub('', line).strip()
+
+
+def should_skip_line(line: str) -> bool:
+    """Check if a stripped line cannot be a one-line section header"""
+    return not line or SKIP_LINE_PATTERN.match(line) is not None
+
+
+def is_noise_line(line: str) -> bool:
+    """Check if line is noise (page numbers, headers, dot rows)"""
+    return (len(line) < 3 or line.isdigit() or PAGE_NUMBER_PATTERN.match(line) is not None
+            or line in NOISE_HEADERS or DOTS_PATTERN.match(line) is not None)
+
+
+def find_title(token: Token) -> Optional[Tuple[int, str]]:
+    """(line index, title) of the first plausible title after a token"""
+    for offset, line in enumerate(token.ahead[:TITLE_LOOKAHEAD], 1):
+        if not is_noise_line(line):
+            return token.index + offset, line
+    return None
+
+
+def stream_lines(markdown_file: Union[str, Path]) -> Iterator[str]:
+    """Read a file one line at a time without holding it in memory"""
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line
+
+
+def tokenize(lines: Iterable[str], lookahead: int = TITLE_LOOKAHEAD) -> Iterator[Token]:
+    """
+    Yield a Token per line, each carrying the next `lookahead` stripped lines.
+
+    Only lookahead + 1 lines are held at a time, so a whole file can be
+    streamed through stream_lines().
+    """
+    window = deque()
+    make_token = Token._make
+    index = 0
+    for line in lines:
+        window.append(line.strip())
+        if len(window) > lookahead:
+            yield make_token((index, window.popleft(), tuple(window)))
+            index += 1
+    while window:
+        yield make_token((index, window.popleft(), tuple(window)))
+        index += 1
+
+
+def section_starts(tokens: Iterable[Token]) -> Iterator[Tuple[Token, Optional[SectionStart]]]:
+    """
+    Pair every token with the SectionStart it opens, or None.
+
+    A section starts at a line holding only a section number that is
+    followed by a title line within TITLE_LOOKAHEAD lines.
+    """
+    for token in tokens:
+        start = None
+        # Cheap first-character test before the regex; most lines are prose
+        if token.text[:1].isdigit():
+            match = SECTION_NUMBER_PATTERN.match(token.text)
+            title = find_title(token) if match else None
+            if title is not None:
+                start = SectionStart(match.group(1), title[1], title[0])
+        yield token, start
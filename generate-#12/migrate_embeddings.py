@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Migrate ECMA-376 Section Embeddings to Binary Storage
+Converts JSON text embeddings in embedding_vector to little-endian float32
+bytes in the embedding bytea column, in bulk and resumably
+"""
+
+import argparse
+import logging
+import psycopg2
+from psycopg2.extras import execute_values
+from section_index import vector_from_row, vector_to_bytes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def ensure_embedding_column(conn):
+    """Add the embedding bytea column to databases created before it existed"""
+    with conn.cursor() as cur:
+        cur.execute("ALTER TABLE ecma_sections ADD COLUMN IF NOT EXISTS embedding BYTEA;")
+    conn.commit()
+
+def ensure_content_hash_column(conn):
+    """Add the content_hash column that section_sync.py diffs against"""
+    with conn.cursor() as cur:
+        cur.execute("ALTER TABLE ecma_sections ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+    conn.commit()
+
+def ensure_generation_counter(conn):
+    """Add the section_meta generation counter and its trigger to databases created before them"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS section_meta (
+                key TEXT PRIMARY KEY,
+                value BIGINT NOT NULL
+            );
+            INSERT INTO section_meta (key, value) VALUES ('generation', 0)
+                ON CONFLICT (key) DO NOTHING;
+
+            CREATE OR REPLACE FUNCTION bump_section_generation()
+            RETURNS TRIGGER AS $$
+            BEGIN
+                UPDATE section_meta SET value = value + 1 WHERE key = 'generation';
+                RETURN NULL;
+            END;
+            $$ language 'plpgsql';
+
+            DROP TRIGGER IF EXISTS ecma_sections_generation ON ecma_sections;
+            CREATE TRIGGER ecma_sections_generation
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ecma_sections
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION bump_section_generation();
+        """)
+    conn.commit()
+
+def migrate_embeddings(db_config: dict, batch_size: int = 1000, keep_json: bool = False) -> int:
+    """
+    Convert every JSON-only embedding to bytea.
+
+    Rows are processed in id order, one transaction per batch, so an
+    interrupted run can simply be restarted.
+
+    Args:
+        db_config: psycopg2 connection parameters
+        batch_size: Rows converted per transaction
+        keep_json: Leave the JSON text in place instead of clearing it
+
+    Returns:
+        Number of rows converted
+    """
+    update_query = f"""
+    UPDATE ecma_sections AS s
+    SET embedding = v.embedding{'' if keep_json else ', embedding_vector = NULL'}
+    FROM (VALUES %s) AS v(id, embedding)
+    WHERE s.id = v.id;
+    """
+
+    converted = 0
+    last_id = 0
+
+    with psycopg2.connect(**db_config) as conn:
+        ensure_embedding_column(conn)
+        ensure_content_hash_column(conn)
+        ensure_generation_counter(conn)
+
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT COUNT(*) FROM ecma_sections
+                WHERE embedding IS NULL AND embedding_vector IS NOT NULL
+            ''')
+            total = cur.fetchone()[0]
+            logger.info(f"Found {total} sections with JSON embeddings to convert")
+
+            while True:
+                cur.execute('''
+                    SELECT id, embedding_vector FROM ecma_sections
+                    WHERE id > %s AND embedding IS NULL AND embedding_vector IS NOT NULL
+                    ORDER BY id
+                    LIMIT %s
+                ''', (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+
+                values = [(section_id, psycopg2.Binary(vector_to_bytes(vector_from_row(None, text))))
+                          for section_id, text in rows]
+                execute_values(cur, update_query, values, template="(%s, %s::bytea)",
+                               page_size=batch_size)
+                conn.commit()
+
+                converted += len(rows)
+                last_id = rows[-1][0]
+                logger.info(f"Converted {converted}/{total} embeddings")
+
+    return converted
+
+def main():
+    """Convert JSON embeddings in the ECMA-376 database to bytea"""
+    parser = argparse.ArgumentParser(description='Convert JSON text embeddings to binary float32 storage')
+    parser.add_argument('--db-name', default='ecma376_docs', help='Database name (default: ecma376_docs)')
+    parser.add_argument('--db-user', default='thomasjeon', help='Database user (default: thomasjeon)')
+    parser.add_argument('--db-host', default='localhost', help='Database host (default: localhost)')
+    parser.add_argument('--db-port', type=int, default=5432, help='Database port (default: 5432)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per transaction (default: 1000)')
+    parser.add_argument('--keep-json', action='store_true',
+                        help='Keep the JSON text after conversion instead of clearing it')
+
+    args = parser.parse_args()
+    db_config = {
+        'dbname': args.db_name,
+        'user': args.db_user,
+        'host': args.db_host,
+        'port': args.db_port
+    }
+
+    try:
+        converted = migrate_embeddings(db_config, args.batch_size, args.keep_json)
+        logger.info(f"✅ Migrated {converted} embeddings to bytea")
+        if converted and not args.keep_json:
+            logger.info("Run VACUUM FULL ecma_sections; to return the freed JSON space to the OS")
+    except Exception as e:
+        logger.error(f"❌ Migration failed: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
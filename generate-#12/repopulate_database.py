@@ -3,25 +3,31 @@
 Repopulate database with correctly parsed ECMA-376 sections
 """
 
-import psycopg2
 from ecma_parser_fixed import EcmaParserFixed
+from bulk_loader import copy_sections
+from connection_pool import get_pool
+from section_sync import sync_sections
+import argparse
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Database connection, pooled across the clear/populate/verify steps
+DB_CONFIG = {
+    'dbname': 'ecma376_docs',
+    'user': 'thomasjeon',
+    'host': 'localhost',
+    'port': 5432
+}
+
 def clear_database():
     """Clear existing data from the database"""
     logger.info("Clearing existing database data...")
     
     try:
-        with psycopg2.connect(
-            dbname="ecma376_docs",
-            user="thomasjeon",
-            host="localhost",
-            port=5432
-        ) as conn:
+        with get_pool(DB_CONFIG).connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("DELETE FROM ecma_sections;")
                 cur.execute("ALTER SEQUENCE ecma_sections_id_seq RESTART WITH 1;")
@@ -31,8 +37,14 @@ def clear_database():
         logger.error(f"Error clearing database: {e}")
         raise
 
-def populate_database_with_fixed_data():
-    """Populate database with correctly parsed sections"""
+def load_section_embedder():
+    """DatabaseManager.embed_sections and its storage mode; loads the embedding model"""
+    from database_manager import DatabaseManager
+    db = DatabaseManager()
+    return db.embed_sections, db.embedding_storage
+
+def populate_database_with_fixed_data(embed=None, storage: str = 'bytea'):
+    """Populate database with correctly parsed sections, embedded when embed is given"""
     logger.info("Parsing ECMA-376 with fixed parser...")
     
     # Parse the markdown file with the fixed parser
@@ -41,69 +53,39 @@ def populate_database_with_fixed_data():
     
     logger.info(f"Parsed {len(sections)} sections")
     
-    # Database connection
-    db_config = {
-        'dbname': 'ecma376_docs',
-        'user': 'thomasjeon',
-        'host': 'localhost',
-        'port': 5432
-    }
+    # Embed before touching the database, like DatabaseManager.insert_sections
+    embeddings = embed(sections) if embed is not None else None
     
-    insert_query = """
-    INSERT INTO ecma_sections (
-        level1, level2, level3, level4, level5,
-        full_section_number, title, description,
-        page_reference, section_type, depth, 
-        parent_id, embedding_vector
-    ) VALUES (
-        %s, %s, %s, %s, %s,
-        %s, %s, %s,
-        %s, %s, %s,
-        %s, %s
-    ) RETURNING id;
-    """
+    try:
+        with get_pool(DB_CONFIG).connection() as conn:
+            # Bulk COPY; parent ids are resolved client-side
+            copy_sections(conn, sections, embeddings, storage)
+            conn.commit()
+            logger.info(f"Successfully inserted {len(sections)} sections!")
+                
+    except Exception as e:
+        logger.error(f"Error inserting sections: {e}")
+        raise
+
+def sync_database_with_fixed_data(delete_missing: bool = True, embed=None, storage: str = 'bytea'):
+    """Apply only the sections that changed since the last load, re-embedding them when embed is given"""
+    logger.info("Parsing ECMA-376 with fixed parser...")
     
-    # Create a mapping of section numbers to database IDs for parent relationships
-    section_id_map = {}
+    parser = EcmaParserFixed('ecma-376.md')
+    sections = parser.parse_file()
+    
+    logger.info(f"Parsed {len(sections)} sections")
     
     try:
-        with psycopg2.connect(**db_config) as conn:
-            with conn.cursor() as cur:
-                for i, section in enumerate(sections):
-                    if i % 100 == 0:
-                        logger.info(f"Processing section {i+1}/{len(sections)}")
-                    
-                    # Find parent ID if exists
-                    parent_id = None
-                    if section.parent_section and section.parent_section in section_id_map:
-                        parent_id = section_id_map[section.parent_section]
-                    
-                    # Insert section (without embedding for now)
-                    cur.execute(insert_query, (
-                        section.level1,
-                        section.level2,
-                        section.level3,
-                        section.level4,
-                        section.level5,
-                        section.full_section_number,
-                        section.title,
-                        section.description,
-                        section.page_reference,
-                        section.section_type,
-                        section.depth,
-                        parent_id,
-                        None  # No embedding for now
-                    ))
-                    
-                    # Get the inserted ID and map it
-                    section_id = cur.fetchone()[0]
-                    section_id_map[section.full_section_number] = section_id
-                
-                conn.commit()
-                logger.info(f"Successfully inserted {len(sections)} sections!")
+        with get_pool(DB_CONFIG).connection() as conn:
+            diff = sync_sections(conn, sections, delete_missing=delete_missing,
+                                 embed=embed, storage=storage)
+            conn.commit()
+            logger.info(f"Synced sections: {diff.summary()}")
+            return diff
                 
     except Exception as e:
-        logger.error(f"Error inserting sections: {e}")
+        logger.error(f"Error syncing sections: {e}")
         raise
 
 def verify_bldchart_section():
@@ -111,12 +93,7 @@ def verify_bldchart_section():
     logger.info("Verifying bldChart section...")
     
     try:
-        with psycopg2.connect(
-            dbname="ecma376_docs",
-            user="thomasjeon",
-            host="localhost",
-            port=5432
-        ) as conn:
+        with get_pool(DB_CONFIG).connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT full_section_number, title, description, section_type, depth
@@ -148,14 +125,31 @@ def verify_bldchart_section():
 
 def main():
     """Main function to repopulate the database"""
+    parser = argparse.ArgumentParser(description='Reload ECMA-376 sections with the fixed parser')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only insert, update and delete sections whose content changed')
+    parser.add_argument('--keep-missing', action='store_true',
+                        help='With --incremental, keep stored sections the parser no longer produces')
+    parser.add_argument('--embed', action='store_true',
+                        help='Embed the loaded sections (with --incremental, the new and changed ones)')
+    args = parser.parse_args()
+    
     logger.info("🚀 Starting database repopulation with fixed parser...")
     
     try:
-        # Step 1: Clear existing data
-        clear_database()
+        # Loads the embedding model, so only when asked for
+        embed, storage = load_section_embedder() if args.embed else (None, 'bytea')
         
-        # Step 2: Populate with correctly parsed data
-        populate_database_with_fixed_data()
+        if args.incremental:
+            # Steps 1-2: Diff against stored content hashes and write only the changes
+            sync_database_with_fixed_data(delete_missing=not args.keep_missing,
+                                          embed=embed, storage=storage)
+        else:
+            # Step 1: Clear existing data
+            clear_database()
+            
+            # Step 2: Populate with correctly parsed data
+            populate_database_with_fixed_data(embed, storage)
         
         # Step 3: Verify the bldChart section
         verify_bldchart_section()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+In-Memory Vector Index for ECMA-376 Sections
+Holds every section embedding in one contiguous NumPy matrix so a search is
+a single matrix-vector product instead of per-row JSON parsing in SQL.
+"""
+
+import os
+import json
+import logging
+import threading
+import numpy as np
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Binary embeddings in the `embedding` bytea column are little-endian float32
+VECTOR_DTYPE = np.dtype('<f4')
+
+EMBEDDING_STORAGE = ('bytea', 'json')
+
+
+def vector_to_bytes(vector) -> bytes:
+    """Encode an embedding for the `embedding` bytea column"""
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def vector_from_row(embedding: Optional[Union[bytes, memoryview]],
+                    embedding_vector: Optional[str]) -> np.ndarray:
+    """Decode a stored embedding, preferring the binary column over legacy JSON text"""
+    if embedding is not None:
+        # psycopg2 returns bytea as a memoryview; no copy is made here
+        return np.frombuffer(embedding, dtype=VECTOR_DTYPE)
+    return np.asarray(json.loads(embedding_vector), dtype=np.float32)
+
+
+def embedding_columns(vector, storage: str = 'bytea') -> Tuple[Optional[bytes], Optional[str]]:
+    """Values for the (embedding, embedding_vector) columns in the given storage mode"""
+    if storage == 'bytea':
+        return vector_to_bytes(vector), None
+    if storage == 'json':
+        return None, json.dumps(np.asarray(vector, dtype=np.float32).tolist())
+    raise ValueError(f"Unknown embedding storage '{storage}'; expected one of {EMBEDDING_STORAGE}")
+
+
+class SectionVectorIndex:
+    """Row-normalized float32 matrix of section embeddings, reloaded when the table changes"""
+
+    # Changes whenever a row is inserted, deleted or updated; the generation
+    # is bumped by trigger on every writing statement (see database_schema.sql)
+    SIGNATURE_QUERY = """
+        SELECT COUNT(*), MAX(id), (SELECT value FROM section_meta WHERE key = 'generation')
+        FROM ecma_sections
+        WHERE embedding IS NOT NULL OR embedding_vector IS NOT NULL
+    """
+
+    LOAD_QUERY = """
+        SELECT id, embedding, embedding_vector
+        FROM ecma_sections
+        WHERE embedding IS NOT NULL OR embedding_vector IS NOT NULL
+        ORDER BY id
+    """
+
+    def __init__(self, dimension: int = 384, cache_path: Optional[str] = None,
+                 signature_query: Optional[str] = None, save_cache: bool = True):
+        """
+        Create an empty index; it loads on the first search.
+
+        Args:
+            dimension: Embedding dimension
+            cache_path: Base path for a persisted copy of the matrix
+                (<cache_path>.npy, .ids.npy, .json); when its stamp matches the
+                table it is memory-mapped instead of decoded row by row
+            signature_query: Query returning one row that changes whenever
+                section embeddings change (defaults to SIGNATURE_QUERY)
+            save_cache: Write the persisted copy after a load; when False an
+                existing copy is only read
+        """
+        self.dimension = dimension
+        self.cache_path = cache_path
+        self.save_cache = save_cache
+        self.signature_query = signature_query or self.SIGNATURE_QUERY
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.signature: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Force a reload before the next search"""
+        with self._lock:
+            self.signature = None
+
+    def refresh(self, cur) -> None:
+        """Reload the matrix if the table changed since the last load"""
+        cur.execute(self.signature_query)
+        signature = tuple(cur.fetchone())
+
+        with self._lock:
+            if signature == self.signature:
+                return
+            if self._load_cache(signature):
+                self.signature = signature
+                return
+
+            cur.execute(self.LOAD_QUERY)
+            rows = cur.fetchall()
+
+            matrix = np.zeros((len(rows), self.dimension), dtype=np.float32)
+            ids = np.empty(len(rows), dtype=np.int64)
+            for i, (section_id, embedding, embedding_vector) in enumerate(rows):
+                ids[i] = section_id
+                matrix[i] = vector_from_row(embedding, embedding_vector)
+
+            # Stored vectors are not all normalized; normalize rows so the
+            # product with a unit query is cosine similarity
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms == 0, 1, norms)
+
+            self.matrix = matrix
+            self.ids = ids
+            self.signature = signature
+            logger.info(f"Loaded {len(rows)} section embeddings into search matrix")
+            self._save_cache(signature)
+
+    @staticmethod
+    def _stamp(signature: tuple) -> List[str]:
+        """JSON-safe form of a signature"""
+        return [str(value) for value in signature]
+
+    def _load_cache(self, signature: tuple) -> bool:
+        """Memory-map the persisted matrix if it was saved for this signature"""
+        if not self.cache_path:
+            return False
+        try:
+            with open(f"{self.cache_path}.json", 'r', encoding='utf-8') as f:
+                stamp = json.load(f)
+            if stamp.get('signature') != self._stamp(signature) or stamp.get('dimension') != self.dimension:
+                return False
+            matrix = np.load(f"{self.cache_path}.npy", mmap_mode='r')
+            ids = np.load(f"{self.cache_path}.ids.npy")
+        except (OSError, ValueError) as e:
+            logger.debug(f"No usable section vector cache at {self.cache_path}: {e}")
+            return False
+
+        if matrix.shape != (len(ids), self.dimension):
+            return False
+        self.matrix = matrix
+        self.ids = ids
+        logger.info(f"Memory-mapped {len(ids)} section embeddings from {self.cache_path}.npy")
+        return True
+
+    def _save_cache(self, signature: tuple) -> None:
+        """Persist the matrix next to the database; a failed write only costs the next load"""
+        if not self.cache_path or not self.save_cache:
+            return
+        try:
+            # Drop the old stamp first, then write under temporary names, so
+            # readers never pair a stamp with arrays it does not describe
+            if os.path.exists(f"{self.cache_path}.json"):
+                os.remove(f"{self.cache_path}.json")
+            for suffix, array in (('.npy', self.matrix), ('.ids.npy', self.ids)):
+                with open(f"{self.cache_path}{suffix}.tmp", 'wb') as f:
+                    np.save(f, array)
+                os.replace(f"{self.cache_path}{suffix}.tmp", f"{self.cache_path}{suffix}")
+            with open(f"{self.cache_path}.json.tmp", 'w', encoding='utf-8') as f:
+                json.dump({'signature': self._stamp(signature), 'dimension': self.dimension}, f)
+            os.replace(f"{self.cache_path}.json.tmp", f"{self.cache_path}.json")
+        except OSError as e:
+            logger.warning(f"Could not save section vector cache {self.cache_path}: {e}")
+
+    def search(self, cur, query_embedding: np.ndarray, limit: int,
+               min_similarity: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Find the sections most similar to a query.
+
+        Args:
+            cur: Open database cursor, used to check for and load changes
+            query_embedding: Normalized query vector
+            limit: Maximum number of results
+            min_similarity: Cosine similarity a result must exceed
+
+        Returns:
+            (section id, similarity) pairs, most similar first
+        """
+        self.refresh(cur)
+        matrix, ids = self.matrix, self.ids
+        if limit <= 0 or len(ids) == 0:
+            return []
+
+        scores = matrix @ np.asarray(query_embedding, dtype=np.float32)
+
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = top[scores[top] > min_similarity]
+
+        return [(int(ids[i]), float(scores[i])) for i in top]
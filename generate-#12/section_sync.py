@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Incremental Sync of Parsed ECMA-376 Sections
+Diffs a fresh parse against the content hashes stored in ecma_sections and
+writes only the rows that were added, changed or removed, so a parser fix
+touching a few sections does not cost a full reload and re-embedding
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from psycopg2.extras import execute_values
+from bulk_loader import DEFAULT_CHUNK_SIZE, copy_sections, hash_content, section_hash
+from section_index import embedding_columns
+
+logger = logging.getLogger(__name__)
+
+# Title and description are only needed to backfill rows loaded before content_hash existed
+STORED_QUERY = """
+    SELECT id, full_section_number, content_hash,
+           CASE WHEN content_hash IS NULL THEN title END,
+           CASE WHEN content_hash IS NULL THEN description END
+    FROM ecma_sections
+    ORDER BY id
+"""
+
+# Changed text invalidates the embedding; it is replaced, or cleared when not re-embedding
+UPDATE_QUERY = """
+    UPDATE ecma_sections AS s
+    SET title = v.title,
+        description = v.description,
+        page_reference = v.page_reference,
+        section_type = v.section_type,
+        content_hash = v.content_hash,
+        embedding = v.embedding,
+        embedding_vector = v.embedding_vector
+    FROM (VALUES %s) AS v(id, title, description, page_reference, section_type, content_hash,
+                          embedding, embedding_vector)
+    WHERE s.id = v.id;
+"""
+
+# NULL embeddings need explicit types inside VALUES
+UPDATE_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s::bytea, %s::text)"
+
+BACKFILL_QUERY = """
+    UPDATE ecma_sections AS s
+    SET content_hash = v.content_hash
+    FROM (VALUES %s) AS v(id, content_hash)
+    WHERE s.id = v.id;
+"""
+
+# A row's parent number is the level column one above its depth
+RELINK_QUERY = """
+    UPDATE ecma_sections AS c
+    SET parent_id = (SELECT MAX(p.id) FROM ecma_sections p WHERE p.full_section_number = {parent})
+    WHERE c.parent_id IS NULL AND c.depth > 1 AND {parent} = ANY(%s);
+""".format(parent="CASE c.depth WHEN 2 THEN c.level1 WHEN 3 THEN c.level2 "
+                  "WHEN 4 THEN c.level3 WHEN 5 THEN c.level4 END")
+
+
+@dataclass
+class SectionDiff:
+    """Differences between a parse and the stored sections"""
+    inserted: List = field(default_factory=list)  # Sections with no stored row
+    updated: List[Tuple[int, object]] = field(default_factory=list)  # (id, Section) with changed text
+    deleted: List[Tuple[int, str]] = field(default_factory=list)  # (id, number) no longer parsed
+    backfilled: List[Tuple[int, str]] = field(default_factory=list)  # (id, hash) for unhashed, unchanged rows
+    unchanged: int = 0
+    known_ids: Dict[str, int] = field(default_factory=dict)  # Number to id of rows that are kept
+
+    def summary(self) -> Dict[str, int]:
+        """Row counts per kind of change"""
+        return {
+            'inserted': len(self.inserted),
+            'updated': len(self.updated),
+            'deleted': len(self.deleted),
+            'backfilled': len(self.backfilled),
+            'unchanged': self.unchanged
+        }
+
+
+def _occurrence_keys(numbers: Iterable[str]) -> Iterable[Tuple[str, int]]:
+    """(number, n) keys, n counting earlier repeats of the same number"""
+    seen = defaultdict(int)
+    for number in numbers:
+        yield number, seen[number]
+        seen[number] += 1
+
+
+def diff_sections(stored_rows: Sequence[tuple], sections: Sequence) -> SectionDiff:
+    """
+    Match parsed sections to stored rows and classify every difference.
+
+    Sections are matched by section number; a number the parser emits more
+    than once is matched by occurrence, in id and document order.
+
+    Args:
+        stored_rows: (id, full_section_number, content_hash, title, description)
+            rows ordered by id, as returned by STORED_QUERY
+        sections: Parsed Section objects in document order
+
+    Returns:
+        SectionDiff describing the writes needed
+    """
+    stored = {}
+    for key, row in zip(_occurrence_keys(row[1] for row in stored_rows), stored_rows):
+        section_id, number, content_hash, title, description = row
+        if content_hash is None:
+            # Rows loaded before content_hash existed; hash what is stored
+            stored[key] = (section_id, hash_content(number, title, description), True)
+        else:
+            stored[key] = (section_id, content_hash, False)
+
+    diff = SectionDiff()
+    for key, section in zip(_occurrence_keys(s.full_section_number for s in sections), sections):
+        match = stored.pop(key, None)
+        if match is None:
+            diff.inserted.append(section)
+            continue
+
+        section_id, stored_hash, unhashed = match
+        diff.known_ids[section.full_section_number] = section_id
+        new_hash = section_hash(section)
+        if new_hash != stored_hash:
+            diff.updated.append((section_id, section))
+        elif unhashed:
+            diff.backfilled.append((section_id, new_hash))
+        else:
+            diff.unchanged += 1
+
+    diff.deleted = sorted((section_id, key[0]) for key, (section_id, _, _) in stored.items())
+    return diff
+
+
+def sync_sections(conn, sections: Sequence, delete_missing: bool = True,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  embed: Optional[Callable[[List], Sequence]] = None,
+                  storage: str = 'bytea') -> SectionDiff:
+    """
+    Bring ecma_sections in line with a parse inside the caller's transaction.
+
+    With embed, such as DatabaseManager.embed_sections, inserted and changed
+    sections are embedded with the same text a full load uses and written
+    together with their rows. Without it they are left without embeddings,
+    since the stored ones no longer match their text.
+
+    Args:
+        conn: Open psycopg2 connection; the caller commits
+        sections: Parsed Section objects in document order
+        delete_missing: Delete stored sections the parse no longer produces
+        chunk_size: Rows per UPDATE and COPY statement
+        embed: Optional callable returning one vector per Section
+        storage: Embedding storage mode, 'bytea' or 'json'
+
+    Returns:
+        The SectionDiff that was applied
+    """
+    with conn.cursor() as cur:
+        cur.execute(STORED_QUERY)
+        diff = diff_sections(cur.fetchall(), sections)
+        logger.info(f"Section changes: {diff.summary()}")
+
+        relink_numbers = {section.full_section_number for section in diff.inserted}
+
+        updated_embeddings = inserted_embeddings = None
+        if embed is not None and (diff.updated or diff.inserted):
+            # One batch for both, so only changed text reaches the model
+            embeddings = embed([section for _, section in diff.updated] + diff.inserted)
+            updated_embeddings = embeddings[:len(diff.updated)]
+            inserted_embeddings = embeddings[len(diff.updated):]
+        elif diff.updated:
+            logger.warning(f"Clearing the embeddings of {len(diff.updated)} changed sections "
+                           f"without re-embedding them")
+
+        if diff.deleted and delete_missing:
+            deleted_ids = [section_id for section_id, _ in diff.deleted]
+            # Children of removed sections are re-parented below
+            cur.execute("UPDATE ecma_sections SET parent_id = NULL WHERE parent_id = ANY(%s);", (deleted_ids,))
+            cur.execute("DELETE FROM ecma_sections WHERE id = ANY(%s);", (deleted_ids,))
+            relink_numbers.update(number for _, number in diff.deleted)
+        elif diff.deleted:
+            logger.info(f"Keeping {len(diff.deleted)} stored sections the parse no longer produces")
+
+        if diff.updated:
+            values = []
+            for i, (section_id, section) in enumerate(diff.updated):
+                embedding = embedding_json = None
+                if updated_embeddings is not None:
+                    embedding, embedding_json = embedding_columns(updated_embeddings[i], storage)
+                values.append((section_id, section.title, section.description, section.page_reference,
+                               section.section_type, section_hash(section), embedding, embedding_json))
+            execute_values(cur, UPDATE_QUERY, values, template=UPDATE_TEMPLATE, page_size=chunk_size)
+
+        if diff.backfilled:
+            execute_values(cur, BACKFILL_QUERY, diff.backfilled, page_size=chunk_size)
+
+    if diff.inserted:
+        copy_sections(conn, diff.inserted, inserted_embeddings, storage,
+                      chunk_size=chunk_size, known_ids=diff.known_ids)
+
+    if relink_numbers:
+        with conn.cursor() as cur:
+            cur.execute(RELINK_QUERY, (sorted(relink_numbers),))
+
+    return diff
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Embedded SQLite Store for ECMA-376 Documentation
+Offers the DatabaseManager API without a PostgreSQL server: sections live in
+a single SQLite file and their embeddings in a memory-mapped NumPy matrix
+next to it, so a prebuilt index can ship with the generator
+"""
+
+import os
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import List, Optional, Dict, Any
+
+from database_manager import DatabaseManager
+from embedding_cache import EmbeddingCache
+from ecma_parser import Section
+from section_index import SectionVectorIndex, vector_from_row, vector_to_bytes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = os.environ.get('ECMA_SQLITE_PATH', 'ecma376_docs.sqlite')
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ecma_sections (
+    id INTEGER PRIMARY KEY,
+    level1 TEXT,
+    level2 TEXT,
+    level3 TEXT,
+    level4 TEXT,
+    level5 TEXT,
+    full_section_number TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    page_reference TEXT,
+    section_type VARCHAR(50),
+    depth INTEGER NOT NULL CHECK (depth >= 1 AND depth <= 5),
+    parent_id INTEGER REFERENCES ecma_sections(id),
+    embedding BLOB,
+    embedding_vector TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ecma_sections_full_number ON ecma_sections(full_section_number);
+CREATE INDEX IF NOT EXISTS idx_ecma_sections_depth ON ecma_sections(depth);
+CREATE INDEX IF NOT EXISTS idx_ecma_sections_parent_id ON ecma_sections(parent_id);
+
+-- Bumped by triggers on every change, so the vector matrix knows when to reload
+CREATE TABLE IF NOT EXISTS section_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO section_meta (key, value) VALUES ('generation', 0);
+
+CREATE TRIGGER IF NOT EXISTS ecma_sections_insert_generation AFTER INSERT ON ecma_sections
+BEGIN
+    UPDATE section_meta SET value = value + 1 WHERE key = 'generation';
+END;
+
+CREATE TRIGGER IF NOT EXISTS ecma_sections_update_generation AFTER UPDATE ON ecma_sections
+BEGIN
+    UPDATE section_meta SET value = value + 1 WHERE key = 'generation';
+END;
+
+CREATE TRIGGER IF NOT EXISTS ecma_sections_delete_generation AFTER DELETE ON ecma_sections
+BEGIN
+    UPDATE section_meta SET value = value + 1 WHERE key = 'generation';
+END;
+"""
+
+SIGNATURE_QUERY = """
+    SELECT COUNT(*), MAX(id), (SELECT value FROM section_meta WHERE key = 'generation')
+    FROM ecma_sections
+    WHERE embedding IS NOT NULL OR embedding_vector IS NOT NULL
+"""
+
+# Same traversals as get_section_path()/get_section_children() in database_schema.sql
+SECTION_PATH_QUERY = """
+WITH RECURSIVE path AS (
+    SELECT s.id, s.full_section_number, s.title, s.depth, s.parent_id
+    FROM ecma_sections s
+    WHERE s.id = (SELECT id FROM ecma_sections WHERE full_section_number = ?)
+
+    UNION ALL
+
+    SELECT s.id, s.full_section_number, s.title, s.depth, s.parent_id
+    FROM ecma_sections s
+    INNER JOIN path p ON s.id = p.parent_id
+)
+SELECT p.id, p.full_section_number, p.title, p.depth
+FROM path p
+ORDER BY p.depth;
+"""
+
+SECTION_CHILDREN_QUERY = """
+WITH RECURSIVE root AS (
+    SELECT id FROM ecma_sections WHERE full_section_number = ?
+),
+children AS (
+    SELECT s.id, s.full_section_number, s.title, s.depth
+    FROM ecma_sections s
+    WHERE s.id = (SELECT id FROM root)
+
+    UNION ALL
+
+    SELECT s.id, s.full_section_number, s.title, s.depth
+    FROM ecma_sections s
+    INNER JOIN children c ON s.parent_id = c.id
+)
+SELECT c.id, c.full_section_number, c.title, c.depth
+FROM children c
+WHERE c.id != (SELECT id FROM root)
+ORDER BY c.full_section_number;
+"""
+
+SECTION_COLUMNS = (
+    'id', 'level1', 'level2', 'level3', 'level4', 'level5',
+    'full_section_number', 'title', 'description',
+    'page_reference', 'section_type', 'depth',
+    'parent_id', 'embedding'
+)
+
+
+class SqliteDatabaseManager(DatabaseManager):
+    """DatabaseManager backed by an embedded SQLite file and a memory-mapped vector matrix"""
+
+    def __init__(self, db_path: str = DEFAULT_SQLITE_PATH,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 read_only: bool = False):
+        """Open or create a SQLite section database
+
+        The vector matrix is kept in <db_path>.vectors.npy (with .ids.npy and
+        .json); read_only opens a prebuilt file without ever writing to it or
+        its vector files, which are then only read if they are current.
+        """
+        self.db_path = db_path
+        self.read_only = read_only
+        self.embedding_storage = 'bytea'
+        self._local = threading.local()
+
+        if read_only and not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite section database not found: {db_path}")
+        if not read_only:
+            with self._connection() as conn:
+                conn.executescript(SQLITE_SCHEMA)
+
+        self._init_embeddings(embedding_cache)
+        self.section_index = SectionVectorIndex(cache_path=f"{db_path}.vectors",
+                                                signature_query=SIGNATURE_QUERY,
+                                                save_cache=not read_only)
+
+        self._test_connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection; use as `with ...:` for one transaction"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            else:
+                conn = sqlite3.connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def _test_connection(self) -> None:
+        """Report the database that was opened"""
+        cur = self._connection().cursor()
+        cur.execute("SELECT COUNT(*) FROM ecma_sections;")
+        logger.info(f"Opened SQLite section database {self.db_path} "
+                    f"({cur.fetchone()[0]} sections, SQLite {sqlite3.sqlite_version})")
+
+    def insert_sections(self, sections: List[Section], chunk_size: int = 2000) -> None:
+        """Insert sections into database with embeddings"""
+        logger.info(f"Inserting {len(sections)} sections into database...")
+        embeddings = self.embed_sections(sections)
+
+        insert_query = f"""
+        INSERT INTO ecma_sections ({', '.join(SECTION_COLUMNS)})
+        VALUES ({', '.join('?' * len(SECTION_COLUMNS))});
+        """
+
+        try:
+            with self._connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT COALESCE(MAX(id), 0) FROM ecma_sections;")
+                next_id = cur.fetchone()[0] + 1
+
+                # Ids and parent_id are assigned here, as in bulk_loader.copy_sections
+                section_id_map = {}
+                rows = []
+                for i, section in enumerate(sections):
+                    parent_id = None
+                    if section.parent_section and section.parent_section in section_id_map:
+                        parent_id = section_id_map[section.parent_section]
+
+                    rows.append((
+                        next_id + i,
+                        section.level1,
+                        section.level2,
+                        section.level3,
+                        section.level4,
+                        section.level5,
+                        section.full_section_number,
+                        section.title,
+                        section.description,
+                        section.page_reference,
+                        section.section_type,
+                        section.depth,
+                        parent_id,
+                        vector_to_bytes(embeddings[i])
+                    ))
+                    section_id_map[section.full_section_number] = next_id + i
+
+                for start in range(0, len(rows), chunk_size):
+                    cur.executemany(insert_query, rows[start:start + chunk_size])
+                logger.info(f"Successfully inserted {len(sections)} sections!")
+
+        except Exception as e:
+            logger.error(f"Error inserting sections: {e}")
+            raise
+
+    def copy_from(self, source: DatabaseManager, chunk_size: int = 2000) -> int:
+        """Copy every section and its stored embedding from another database, keeping ids"""
+        select_query = f"SELECT {', '.join(SECTION_COLUMNS)}, embedding_vector FROM ecma_sections ORDER BY id;"
+        insert_query = f"""
+        INSERT OR REPLACE INTO ecma_sections ({', '.join(SECTION_COLUMNS)})
+        VALUES ({', '.join('?' * len(SECTION_COLUMNS))});
+        """
+
+        copied = 0
+        with source.pool.connection() as source_conn, self._connection() as conn:
+            with source_conn.cursor() as source_cur:
+                source_cur.execute(select_query)
+                cur = conn.cursor()
+                while True:
+                    rows = source_cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+
+                    values = []
+                    for row in rows:
+                        *fields, embedding, embedding_vector = row
+                        if embedding is not None or embedding_vector is not None:
+                            embedding = vector_to_bytes(vector_from_row(embedding, embedding_vector))
+                        values.append((*fields, embedding))
+                    cur.executemany(insert_query, values)
+                    copied += len(rows)
+                    logger.info(f"Copied {copied} sections")
+
+        return copied
+
+    def build_index(self) -> None:
+        """Load the vector matrix now and persist it for memory-mapped reuse"""
+        self.section_index.refresh(self._connection().cursor())
+
+    def search_sections(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search sections using semantic similarity"""
+        logger.info(f"Searching for: '{query}'")
+        query_embedding = self.query_encoder.encode(query)
+
+        try:
+            cur = self._connection().cursor()
+            hits = self.section_index.search(cur, query_embedding, limit, self.MIN_SIMILARITY)
+            if not hits:
+                return []
+
+            cur.execute(f"""
+            SELECT {self.SEARCH_COLUMNS}
+            FROM ecma_sections
+            WHERE id IN ({', '.join('?' * len(hits))});
+            """, [section_id for section_id, _ in hits])
+            return self._rank_rows(cur, hits)
+
+        except Exception as e:
+            logger.error(f"Error searching sections: {e}")
+            raise
+
+    def _fetch_dicts(self, query: str, params: tuple) -> List[Dict[str, Any]]:
+        cur = self._connection().cursor()
+        cur.execute(query, params)
+        columns = [desc[0] for desc in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def get_section_hierarchy(self, section_number: str) -> List[Dict[str, Any]]:
+        """Get the full hierarchy path for a section"""
+        try:
+            return self._fetch_dicts(SECTION_PATH_QUERY, (section_number,))
+        except Exception as e:
+            logger.error(f"Error getting section hierarchy: {e}")
+            raise
+
+    def get_section_children(self, section_number: str) -> List[Dict[str, Any]]:
+        """Get all children of a section"""
+        try:
+            return self._fetch_dicts(SECTION_CHILDREN_QUERY, (section_number,))
+        except Exception as e:
+            logger.error(f"Error getting section children: {e}")
+            raise
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        try:
+            return self._collect_statistics(self._connection().cursor())
+        except Exception as e:
+            logger.error(f"Error getting statistics: {e}")
+            raise
+
+
+def create_database_manager(backend: Optional[str] = None, **kwargs) -> DatabaseManager:
+    """
+    Open the ECMA-376 section database with the configured backend.
+
+    Args:
+        backend: 'postgres' or 'sqlite'; defaults to $ECMA_DB_BACKEND, then 'postgres'
+        **kwargs: Passed to DatabaseManager or SqliteDatabaseManager
+
+    Returns:
+        A DatabaseManager-compatible object
+    """
+    backend = backend or os.environ.get('ECMA_DB_BACKEND', 'postgres')
+    if backend == 'sqlite':
+        return SqliteDatabaseManager(**kwargs)
+    if backend == 'postgres':
+        return DatabaseManager(**kwargs)
+    raise ValueError(f"Unknown ECMA database backend '{backend}'; expected 'postgres' or 'sqlite'")
+
+
+def main():
+    """Build a prebuilt SQLite section database and its vector matrix"""
+    parser = argparse.ArgumentParser(description='Build an embedded SQLite ECMA-376 section database')
+    parser.add_argument('output', nargs='?', default=DEFAULT_SQLITE_PATH,
+                        help=f'SQLite file to write (default: {DEFAULT_SQLITE_PATH})')
+    parser.add_argument('--parse', metavar='MARKDOWN',
+                        help='Parse and embed this ECMA-376 markdown file instead of copying from PostgreSQL')
+
+    args = parser.parse_args()
+    store = SqliteDatabaseManager(args.output)
+
+    if args.parse:
+        from ecma_parser_fixed import EcmaParserFixed
+        store.insert_sections(EcmaParserFixed(args.parse).parse_file())
+    else:
+        store.copy_from(DatabaseManager())
+
+    store.build_index()
+    stats = store.get_statistics()
+    print(f"\n=== Built {args.output} ===")
+    print(f"Total sections: {stats['general']['total_sections']}")
+    print(f"Sections with embeddings: {stats['general']['sections_with_embeddings']}")
+    print(f"Vector matrix: {args.output}.vectors.npy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared ECMA-376 tokenizer
+Runs EcmaParser and EcmaParserFixed over randomized documents and checks
+them against reference subclasses that keep the original list-and-regex
+parsing they replaced, so any behaviour change in the tokenizer shows up
+"""
+
+import logging
+import os
+import random
+import re
+import tempfile
+import unittest
+from typing import List, Optional
+
+from ecma_parser import EcmaParser, Section
+from ecma_parser_fixed import EcmaParserFixed
+from ecma_tokenizer import tokenize
+
+# Lines that exercise every header pattern, skip rule, table of contents
+# entry and noise rule, plus prose
+VOCABULARY = [
+    '', '  ', '12.', '12. ', '3', '20.1', '20.1.2.2.1', '5.5.5.5.5', '1.', '13.', '7',
+    '1.  Scope ....... 1', '12.  SpreadsheetML', '8.4  WordprocessingML .... 16',
+    '11.3.10  Main Document Part .... 432', '17.3.1.1  mirrorIndents .... 232',
+    '20.1.2.2.1  bldChart (Build Chart) .... 2728', '20.1.2.2.1  bldChart (Build Chart)',
+    'SpreadsheetML', 'bldChart (Build Chart)', 'bldChart (Build Chart) ....... 55', 'Scope',
+    'ECMA-376 Part 1', '20. DrawingML - Framework Reference Material', '.....', 'ab',
+    'This element specifies things.', 'NOTE: x', '[Example: foo]', '1 some text', '2.3 Xy',
+    '101.2  Big Section', '4.4  Ab', '99', 'Normative References here', '9.1.2.3.4.5',
+    '0.1  Zero', '3.  Normative References ..... 7', 'text ... 12', '15.2  Shared (x) ... 3',
+    '\tcontent with tab\t', 'PresentationML', '13.  PresentationML',
+]
+
+# Long documents reach EcmaParser's stricter rules past line 1000
+DOCUMENT_SIZES = (30, 300, 1500)
+SEEDS = range(150)
+
+
+class ReferenceEcmaParser(EcmaParser):
+    """EcmaParser with its original line-list parsing"""
+
+    section_patterns = [
+        r'^(\d+)\.\s\s+([A-Z][A-Za-z\s\-]+?)(?:\s+\.{3,}\s*(\d+))?$',
+        r'^(\d+)\.\s*$',
+        r'^(\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+        r'^(\d+\.\d+\.\d+)\s\s+([A-Z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+        r'^(\d+\.\d+\.\d+\.\d+)\s\s+([A-Za-z][A-Za-z\s\-()]+?)(?:\s+\.{3,}\s*(\d+))?$',
+        r'^(\d+\.\d+\.\d+\.\d+\.\d+)\s\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(([^)]+)\)(?:\s+\.{3,}\s*(\d+))?$',
+    ]
+
+    def parse_file(self) -> List[Section]:
+        with open(self.markdown_file, 'r', encoding='utf-8') as f:
+            self._parse_lines(f.read().split('\n'))
+        return self.sections
+
+    def _parse_lines(self, lines: List[str]) -> None:
+        current_description = []
+        last_section = None
+        seen_sections = set()
+
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if self._should_skip_line(line):
+                continue
+
+            section = self._parse_section_line(line, i, lines)
+            if section:
+                if section.full_section_number in seen_sections:
+                    continue
+                if last_section and current_description:
+                    last_section.description = ' '.join(current_description).strip()
+                    current_description = []
+                self.sections.append(section)
+                seen_sections.add(section.full_section_number)
+                last_section = section
+                self._update_hierarchy(section)
+            elif last_section and line and not self._is_table_of_contents_line(line):
+                cleaned_line = re.sub(r'\.{3,}.*?\d+\s*$', '', line).strip()
+                if cleaned_line and len(cleaned_line) > 3:
+                    current_description.append(cleaned_line)
+
+        if last_section and current_description:
+            last_section.description = ' '.join(current_description).strip()
+
+    def _parse_section_line(self, line: str, line_index: int, lines: List[str]) -> Optional[Section]:
+        for i, pattern in enumerate(self.section_patterns):
+            match = re.match(pattern, line)
+            if not match:
+                continue
+            section_number = match.group(1)
+
+            if i == 1:
+                if section_number not in self.level1_sections:
+                    continue
+                title = self.level1_sections[section_number]
+                page_ref = None
+            elif i == 5:
+                title = f"{match.group(2).strip()} ({match.group(3).strip()})"
+                page_ref = match.group(4) if match.group(4) else None
+            else:
+                title = match.group(2).strip() if match.group(2) else ""
+                page_ref = match.group(3) if len(match.groups()) > 2 and match.group(3) else None
+
+            if not title or len(title.strip()) < 3:
+                continue
+            if not self._is_valid_section_number(section_number):
+                continue
+            if '.' not in section_number:
+                if section_number not in self.level1_sections:
+                    continue
+                if not self._is_valid_level1_context(line, line_index, lines):
+                    continue
+            return self._create_section(section_number, title, page_ref)
+        return None
+
+    def _is_table_of_contents_line(self, line: str) -> bool:
+        return bool(re.search(r'\.{3,}.*?\d+\s*$', line))
+
+    def _should_skip_line(self, line: str) -> bool:
+        line = line.strip()
+        if not line:
+            return True
+        skip_patterns = [r'^[a-z]', r'^\[', r'^\s*$', r'^[A-Z]{2,}:', r'^\s*\d+\s*$',
+                         r'^[^0-9]', r'^\d+\s*[a-z]']
+        return any(re.match(pattern, line) for pattern in skip_patterns)
+
+    def _is_valid_level1_context(self, line: str, line_index: int, lines: List[str]) -> bool:
+        if line_index > 1000:
+            if re.search(r'\.{3,}.*?\d+\s*$', line):
+                return True
+            section_num = re.match(r'^(\d+)\.\s*$', line)
+            if section_num:
+                num = section_num.group(1)
+                for j in range(1, 5):
+                    if line_index + j < len(lines):
+                        next_line = lines[line_index + j].strip()
+                        if next_line and num in self.level1_sections:
+                            if self.level1_sections[num].lower() in next_line.lower():
+                                return True
+                return False
+        return True
+
+
+class ReferenceEcmaParserFixed(EcmaParserFixed):
+    """EcmaParserFixed with its original look-ahead and look-behind scans"""
+
+    section_number_pattern = r'^(\d+(?:\.\d+){0,4})$'
+
+    def parse_file(self) -> List[Section]:
+        with open(self.markdown_file, 'r', encoding='utf-8') as f:
+            self._parse_lines_fixed(f.read().split('\n'))
+        return self.sections
+
+    def _parse_lines_fixed(self, lines: List[str]) -> None:
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            section_match = re.match(self.section_number_pattern, line) if line else None
+            title_line_idx = self._find_title_line(lines, i + 1) if section_match else -1
+            if title_line_idx == -1:
+                i += 1
+                continue
+
+            title = lines[title_line_idx].strip()
+            if '...' in title and re.search(r'\d+\s*$', title):
+                i += 1
+                continue
+
+            description_start = title_line_idx + 1
+            description_end = self._find_next_section_start(lines, description_start)
+            description_lines = []
+            for desc_idx in range(description_start, description_end):
+                desc_line = lines[desc_idx].strip()
+                if desc_line and not self._is_noise_line(desc_line):
+                    description_lines.append(desc_line)
+
+            clean_title = re.sub(r'\s*\.{3,}.*$', '', title).strip()
+            self.sections.append(self._create_section(
+                section_match.group(1), clean_title, ' '.join(description_lines).strip()))
+            i = description_end
+
+    def _find_title_line(self, lines: List[str], start_idx: int) -> int:
+        for i in range(start_idx, min(start_idx + 5, len(lines))):
+            line = lines[i].strip()
+            if line and not line.isdigit() and len(line) > 2 and not self._is_noise_line(line):
+                return i
+        return -1
+
+    def _find_next_section_start(self, lines: List[str], start_idx: int) -> int:
+        for i in range(start_idx, len(lines)):
+            if re.match(self.section_number_pattern, lines[i].strip()):
+                if self._find_title_line(lines, i + 1) != -1:
+                    return i
+        return len(lines)
+
+    def _is_noise_line(self, line: str) -> bool:
+        line = line.strip()
+        return (len(line) < 3 or line.isdigit() or bool(re.match(r'^\d+\s*$', line))
+                or line in ['ECMA-376 Part 1', '20. DrawingML - Framework Reference Material']
+                or bool(re.match(r'^\.+$', line)))
+
+
+def random_document(seed: int) -> str:
+    """A document of VOCABULARY lines with varied size, line endings and final newline"""
+    rnd = random.Random(seed)
+    lines = [rnd.choice(VOCABULARY) for _ in range(rnd.choice(DOCUMENT_SIZES))]
+    text = '\n'.join(lines) + rnd.choice(['', '\n', '\r\n'])
+    if seed % 3 == 0:
+        text = text.replace('\n', '\r\n')
+    return text
+
+
+class TestTokenizer(unittest.TestCase):
+    """Token windows over a line stream"""
+
+    def test_lookahead_window(self):
+        tokens = list(tokenize([' a ', 'b', 'c\n', 'd'], lookahead=2))
+        self.assertEqual([token.index for token in tokens], [0, 1, 2, 3])
+        self.assertEqual([token.text for token in tokens], ['a', 'b', 'c', 'd'])
+        self.assertEqual([token.ahead for token in tokens],
+                         [('b', 'c'), ('c', 'd'), ('d',), ()])
+
+    def test_short_input(self):
+        self.assertEqual(list(tokenize([])), [])
+        self.assertEqual([token.ahead for token in tokenize(['x', 'y'], lookahead=5)],
+                         [('y',), ()])
+
+
+class TestParserEquivalence(unittest.TestCase):
+    """Tokenizer-based parsers against the original parsing on random documents"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.INFO)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def assert_same_sections(self, parser_class, reference_class, path: str, seed: int):
+        parsed = [section.to_dict() for section in parser_class(path).parse_file()]
+        expected = [section.to_dict() for section in reference_class(path).parse_file()]
+        self.assertEqual(parsed, expected, f"{parser_class.__name__} differs for seed {seed}")
+
+    def test_random_documents(self):
+        for seed in SEEDS:
+            fd, path = tempfile.mkstemp(suffix='.md')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                    f.write(random_document(seed))
+                self.assert_same_sections(EcmaParser, ReferenceEcmaParser, path, seed)
+                self.assert_same_sections(EcmaParserFixed, ReferenceEcmaParserFixed, path, seed)
+            finally:
+                os.remove(path)
+
+    def test_line_lists(self):
+        """_parse_lines and _parse_lines_fixed still accept a list of lines"""
+        for seed in SEEDS[:20]:
+            lines = random_document(seed).split('\n')
+            for parser_class, reference_class, method in (
+                    (EcmaParser, ReferenceEcmaParser, '_parse_lines'),
+                    (EcmaParserFixed, ReferenceEcmaParserFixed, '_parse_lines_fixed')):
+                parser, reference = parser_class('unused.md'), reference_class('unused.md')
+                getattr(parser, method)(lines)
+                getattr(reference, method)(lines)
+                self.assertEqual([section.to_dict() for section in parser.sections],
+                                 [section.to_dict() for section in reference.sections],
+                                 f"{parser_class.__name__}.{method} differs for seed {seed}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the embedded SQLite backend
+Builds a small store from parsed sections and checks search, hierarchy,
+children and statistics against it
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ecma_parser_fixed import EcmaParserFixed
+from sqlite_store import SqliteDatabaseManager
+from embedding_cache import EmbeddingCache  # Importable once sqlite_store is loaded
+
+SAMPLE_MARKDOWN = """20
+DrawingML - Framework Reference Material
+The DrawingML framework describes shapes, pictures and charts.
+20.1
+DrawingML - Main
+Main DrawingML elements shared by all document types.
+20.1.2
+Basics
+Basic elements used throughout DrawingML.
+20.1.2.2
+Core Drawing Object Information
+Elements describing core drawing objects.
+20.1.2.2.1
+bldChart (Build Chart)
+This element specifies how to build the animation for a chart.
+20.1.2.2.2
+bldDgm (Build Diagram)
+This element specifies how to build the animation for a diagram.
+21
+DrawingML - Charts
+Chart parts and their elements.
+"""
+
+
+class TestSqliteStore(unittest.TestCase):
+    """SqliteDatabaseManager over the sections parsed from SAMPLE_MARKDOWN"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        markdown_path = os.path.join(cls.temp_dir, 'sample.md')
+        with open(markdown_path, 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_MARKDOWN)
+
+        cls.sections = EcmaParserFixed(markdown_path).parse_file()
+        cls.db_path = os.path.join(cls.temp_dir, 'sections.sqlite')
+        cls.embedding_cache = EmbeddingCache(os.path.join(cls.temp_dir, 'embeddings.sqlite'))
+        cls.db = SqliteDatabaseManager(cls.db_path, embedding_cache=cls.embedding_cache)
+        cls.db.insert_sections(cls.sections)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def section(self, number: str):
+        return next(s for s in self.sections if s.full_section_number == number)
+
+    def vector_files(self):
+        return sorted(name for name in os.listdir(self.temp_dir) if '.vectors' in name)
+
+    def test_statistics(self):
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['general']['total_sections'], 7)
+        self.assertEqual(stats['general']['level1_count'], 2)
+        self.assertEqual(stats['general']['sections_with_embeddings'], 7)
+        self.assertEqual(stats['depth_distribution'], {1: 2, 2: 1, 3: 1, 4: 1, 5: 2})
+        self.assertEqual(stats['type_distribution']['element'], 2)
+
+    def test_hierarchy(self):
+        path = self.db.get_section_hierarchy('20.1.2.2.1')
+        self.assertEqual([row['full_section_number'] for row in path],
+                         ['20', '20.1', '20.1.2', '20.1.2.2', '20.1.2.2.1'])
+        self.assertEqual(path[-1]['title'], 'bldChart (Build Chart)')
+        self.assertEqual(self.db.get_section_hierarchy('99'), [])
+
+    def test_children(self):
+        children = self.db.get_section_children('20.1.2')
+        self.assertEqual([row['full_section_number'] for row in children],
+                         ['20.1.2.2', '20.1.2.2.1', '20.1.2.2.2'])
+        self.assertEqual(self.db.get_section_children('21'), [])
+
+    def test_search(self):
+        for number in ('20.1.2.2.1', '21'):
+            query = self.db.create_embedding_text(self.section(number))
+            results = self.db.search_sections(query, limit=3)
+            self.assertEqual(results[0]['full_section_number'], number)
+            self.assertGreater(results[0]['similarity'], 0.99)
+            self.assertLessEqual(len(results), 3)
+
+    def test_read_only_does_not_write_vector_files(self):
+        read_only_path = os.path.join(self.temp_dir, 'read_only.sqlite')
+        shutil.copyfile(self.db_path, read_only_path)
+        before = self.vector_files()
+
+        db = SqliteDatabaseManager(read_only_path, embedding_cache=self.embedding_cache,
+                                   read_only=True)
+        query = self.db.create_embedding_text(self.section('20.1.2.2.2'))
+        self.assertEqual(db.search_sections(query, limit=1)[0]['full_section_number'], '20.1.2.2.2')
+        self.assertEqual(self.vector_files(), before)
+
+        with self.assertRaises(FileNotFoundError):
+            SqliteDatabaseManager(os.path.join(self.temp_dir, 'missing.sqlite'), read_only=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,9 @@ Update Embeddings for ECMA-376 Sections
 Regenerates embeddings for sections that have updated descriptions
 """
 
-import json
 import logging
-import psycopg2
-from sentence_transformers import SentenceTransformer
 from database_manager import DatabaseManager
+from section_index import embedding_columns
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,13 +15,10 @@ logger = logging.getLogger(__name__)
 def update_embeddings_for_sections():
     """Update embeddings for all level 5 sections with descriptions"""
     
-    logger.info("Loading sentence transformer model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    logger.info("Model loaded successfully!")
-    
+    # DatabaseManager loads the model behind the shared embedding cache
     db = DatabaseManager()
     
-    with psycopg2.connect(**db.db_config) as conn:
+    with db.pool.connection() as conn:
         with conn.cursor() as cur:
             # Get all level 5 sections with descriptions
             cur.execute('''
@@ -55,17 +50,17 @@ def update_embeddings_for_sections():
                 
                 # Generate embeddings for the batch
                 logger.info(f"Generating embeddings for batch {i//batch_size + 1}/{(len(sections)-1)//batch_size + 1}")
-                embeddings = model.encode(texts)
+                embeddings = db.encoder.encode(texts)
                 
                 # Update database with new embeddings
                 for j, (section_id, embedding) in enumerate(zip(section_ids, embeddings)):
-                    embedding_json = json.dumps(embedding.tolist())
+                    embedding_bytes, embedding_json = embedding_columns(embedding, db.embedding_storage)
                     
                     cur.execute('''
                         UPDATE ecma_sections 
-                        SET embedding_vector = %s
+                        SET embedding = %s, embedding_vector = %s
                         WHERE id = %s
-                    ''', (embedding_json, section_id))
+                    ''', (embedding_bytes, embedding_json, section_id))
                     
                     updated_count += 1
                     
@@ -81,7 +76,7 @@ def update_embeddings_for_sections():
             cur.execute('''
                 SELECT COUNT(*) as total_with_embeddings
                 FROM ecma_sections 
-                WHERE embedding_vector IS NOT NULL
+                WHERE embedding IS NOT NULL OR embedding_vector IS NOT NULL
             ''')
             
             total_with_embeddings = cur.fetchone()[0]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+FAISS index construction for the slide vector database.
+Builds exhaustive or approximate nearest-neighbour indexes over normalized
+embeddings, where inner product equals cosine similarity.
+"""
+
+import math
+import numpy as np
+import faiss
+from typing import Optional
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'hnsw')
+
+# 'auto' switches from exhaustive search to HNSW, then to compressed IVF-PQ
+AUTO_ANN_THRESHOLD = 50_000
+AUTO_PQ_THRESHOLD = 1_000_000
+
+# k-means wants roughly 39 training points per centroid
+POINTS_PER_CENTROID = 39
+PQ_BITS = 8
+PQ_SUB_VECTOR_DIM = 8
+IVF_MIN_TRAIN = POINTS_PER_CENTROID
+PQ_MIN_TRAIN = POINTS_PER_CENTROID * (1 << PQ_BITS)
+MAX_TRAIN_SAMPLE = 100_000
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+
+
+def choose_index_type(requested: str, count: int) -> str:
+    """
+    Resolve the index type to build for a corpus of the given size.
+
+    Args:
+        requested: One of INDEX_TYPES or 'auto'
+        count: Number of vectors the index will hold
+
+    Returns:
+        Concrete index type; IVF types fall back to a simpler index when
+        there are too few vectors to train them
+    """
+    if requested == 'auto':
+        if count < AUTO_ANN_THRESHOLD:
+            return 'flat'
+        if count < AUTO_PQ_THRESHOLD:
+            return 'hnsw'
+        requested = 'ivf_pq'
+
+    if requested not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{requested}'; expected 'auto' or one of {INDEX_TYPES}")
+
+    if requested == 'ivf_pq' and count < PQ_MIN_TRAIN:
+        requested = 'ivf_flat'
+    if requested == 'ivf_flat' and count < IVF_MIN_TRAIN:
+        requested = 'flat'
+    return requested
+
+
+def _nlist_for(count: int) -> int:
+    """Number of IVF cells: about 4*sqrt(n), with enough points to train each."""
+    return max(1, min(int(4 * math.sqrt(count)), count // POINTS_PER_CENTROID))
+
+
+def create_index(index_type: str, dimension: int, count: int) -> faiss.Index:
+    """Create an empty inner-product index of the given concrete type."""
+    if index_type == 'flat':
+        return faiss.IndexFlatIP(dimension)
+
+    if index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index
+
+    nlist = _nlist_for(count)
+    quantizer = faiss.IndexFlatIP(dimension)
+    if index_type == 'ivf_flat':
+        return faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+
+    if index_type == 'ivf_pq':
+        if dimension % PQ_SUB_VECTOR_DIM:
+            raise ValueError(f"Dimension {dimension} is not divisible by {PQ_SUB_VECTOR_DIM}")
+        return faiss.IndexIVFPQ(quantizer, dimension, nlist,
+                                dimension // PQ_SUB_VECTOR_DIM, PQ_BITS,
+                                faiss.METRIC_INNER_PRODUCT)
+
+    raise ValueError(f"Unknown index type '{index_type}'")
+
+
+def build_index(index_type: str, vectors: np.ndarray, nprobe: int = DEFAULT_NPROBE,
+                ef_search: int = DEFAULT_EF_SEARCH, ids: Optional[np.ndarray] = None) -> faiss.Index:
+    """
+    Create, train and fill an index.
+
+    Args:
+        index_type: Concrete index type (see choose_index_type)
+        vectors: Normalized float32 vectors, one per row
+        nprobe: IVF cells visited per query
+        ef_search: HNSW candidate list size per query
+        ids: Stable int64 ids for the vectors; the index is then wrapped in
+            an IndexIDMap2 and searches return these ids. Without ids,
+            vector i gets FAISS id i.
+
+    Returns:
+        Index ready for search and further add()/add_with_ids() calls
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+    index = create_index(index_type, dimension, count)
+
+    if not index.is_trained:
+        # Train on a fixed random sample so rebuilds are reproducible
+        if count > MAX_TRAIN_SAMPLE:
+            sample = np.random.default_rng(0).choice(count, MAX_TRAIN_SAMPLE, replace=False)
+            index.train(vectors[np.sort(sample)])
+        else:
+            index.train(vectors)
+
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype=np.int64))
+    else:
+        index.add(vectors)
+    apply_search_params(index, nprobe, ef_search)
+    return index
+
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    """Unwrap an IndexIDMap to the index that stores the vectors."""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def apply_search_params(index: faiss.Index, nprobe: int = DEFAULT_NPROBE,
+                        ef_search: int = DEFAULT_EF_SEARCH):
+    """Set query-time accuracy/speed parameters; they are not saved with the index."""
+    index = base_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(nprobe, index.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Name the concrete type of an index."""
+    index = base_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(index, faiss.IndexIVFFlat):
+        return 'ivf_flat'
+    if isinstance(index, faiss.IndexHNSW):
+        return 'hnsw'
+    return 'flat'
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Recall/latency benchmark for the vector database index types.
+Compares each approximate index against exact flat search on stored slide
+vectors or on a synthetic clustered corpus.
+"""
+
+import time
+import sqlite3
+import argparse
+import numpy as np
+import faiss
+from ann_index import (DEFAULT_EF_SEARCH, DEFAULT_NPROBE, INDEX_TYPES,
+                       build_index, choose_index_type)
+
+
+def load_db_vectors(db_path: str) -> np.ndarray:
+    """Load the stored float32 vectors of a vector database in FAISS id order."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT e.vector
+        FROM slides s
+        JOIN embeddings e ON s.id = e.slide_id
+        WHERE e.vector IS NOT NULL
+        ORDER BY s.embedding_id
+    ''')
+    vectors = [np.frombuffer(row[0], dtype=np.float32) for row in cursor.fetchall()]
+    conn.close()
+
+    if not vectors:
+        raise ValueError(f"No stored vectors in {db_path}; open it with VectorDatabase first")
+    return np.vstack(vectors)
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Normalized vectors drawn around random topic centres, like slide embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    vectors = centres[labels] + 0.6 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def sample_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of corpus vectors, so every query has close neighbours."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    return np.ascontiguousarray(queries / np.linalg.norm(queries, axis=1, keepdims=True),
+                                dtype=np.float32)
+
+
+def benchmark_index(index_type: str, vectors: np.ndarray, queries: np.ndarray,
+                    ground_truth: np.ndarray, k: int, nprobe: int, ef_search: int) -> dict:
+    """Build one index type and measure build time, size, latency and recall@k."""
+    start = time.perf_counter()
+    index = build_index(index_type, vectors, nprobe, ef_search)
+    build_seconds = time.perf_counter() - start
+
+    # One query at a time, as RAGChatBot.chat issues them
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[np.newaxis, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+
+    recall = np.mean([
+        len(set(ids[ids != -1]) & set(truth)) / len(truth)
+        for ids, truth in zip(found, ground_truth)
+    ])
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        'index_type': index_type,
+        'build_s': build_seconds,
+        'size_mb': faiss.serialize_index(index).nbytes / 1e6,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'recall': float(recall)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark approximate FAISS index types against exact flat search')
+    parser.add_argument('--db', help='Vector database to read stored vectors from')
+    parser.add_argument('--synthetic', type=int, default=20000,
+                        help='Size of the synthetic corpus when --db is not given (default: 20000)')
+    parser.add_argument('--dimension', type=int, default=384,
+                        help='Synthetic vector dimension (default: 384)')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries (default: 200)')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query (default: 10)')
+    parser.add_argument('--types', default=','.join(INDEX_TYPES),
+                        help=f"Comma-separated index types (default: {','.join(INDEX_TYPES)})")
+    parser.add_argument('--nprobe', type=int, default=DEFAULT_NPROBE,
+                        help=f'IVF cells visited per query (default: {DEFAULT_NPROBE})')
+    parser.add_argument('--ef-search', type=int, default=DEFAULT_EF_SEARCH,
+                        help=f'HNSW candidate list size (default: {DEFAULT_EF_SEARCH})')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='FAISS OpenMP threads (default: 1, one chat request per core)')
+
+    args = parser.parse_args()
+    faiss.omp_set_num_threads(args.threads)
+
+    if args.db:
+        vectors = load_db_vectors(args.db)
+        print(f"Loaded {len(vectors)} vectors from {args.db}")
+    else:
+        vectors = synthetic_vectors(args.synthetic, args.dimension)
+        print(f"Generated {len(vectors)} synthetic vectors of dimension {args.dimension}")
+
+    k = min(args.k, len(vectors))
+    queries = sample_queries(vectors, args.queries)
+
+    # Exact neighbours from the flat index are the recall reference
+    flat = faiss.IndexFlatIP(vectors.shape[1])
+    flat.add(vectors)
+    _, ground_truth = flat.search(queries, k)
+
+    print(f"'auto' would build: {choose_index_type('auto', len(vectors))}\n")
+    print(f"{'index':<10}{'built as':<10}{'build s':>9}{'size MB':>9}{'p50 ms':>9}{'p95 ms':>9}{f'recall@{k}':>11}")
+
+    for requested in [name.strip() for name in args.types.split(',') if name.strip()]:
+        index_type = choose_index_type(requested, len(vectors))
+        result = benchmark_index(index_type, vectors, queries, ground_truth,
+                                 k, args.nprobe, args.ef_search)
+        print(f"{requested:<10}{index_type:<10}{result['build_s']:>9.2f}{result['size_mb']:>9.1f}"
+              f"{result['p50_ms']:>9.3f}{result['p95_ms']:>9.3f}{result['recall']:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
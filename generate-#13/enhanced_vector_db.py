@@ -64,6 +64,7 @@ def process_all_slides():
     images_dir = Path("sample1-pdf")
     
     processed_count = 0
+    pending_slides = []
     
     # Process all available slides
     for i in range(1, 35):  # We have 34 slides
@@ -80,15 +81,24 @@ def process_all_slides():
                 
                 # Analyze slide
                 slide_data = analyzer.analyze_slide_image(str(image_path), str(xml_path))
-                
-                # Add to vector database
-                slide_id = vector_db.add_slide(slide_data, xml_content, str(image_path))
-                print(f"   ✅ Added slide {i} (ID: {slide_id}) - {len(slide_data['shapes'])} shapes")
-                processed_count += 1
+                pending_slides.append((slide_data, xml_content, str(image_path)))
                 
             except Exception as e:
                 print(f"   ❌ Error processing slide {i}: {e}")
     
+    # Add to vector database in one batch
+    if pending_slides:
+        try:
+            slide_ids = vector_db.add_slides(pending_slides)
+            for (slide_data, _, _), slide_id in zip(pending_slides, slide_ids):
+                print(f"   ✅ Added slide {slide_data['slide_number']} (ID: {slide_id}) - {len(slide_data['shapes'])} shapes")
+            processed_count = len(slide_ids)
+            
+            # Save the index so the next startup maps it instead of rebuilding
+            vector_db.save_index()
+        except Exception as e:
+            print(f"   ❌ Error adding slides to database: {e}")
+    
     print(f"\n🎉 Processed {processed_count} slides successfully!")
     return vector_db
 
@@ -33,7 +33,7 @@ class RAGSlideGenerator:
             Complete slide XML string
         """
         # Search for relevant reference slides
-        relevant_slides = self.vector_db.search_similar(query, top_k=3)
+        relevant_slides = self.vector_db.search_similar(query, top_k=3, include_xml=False)
         
         if not relevant_slides:
             # Fallback to basic slide if no relevant content found
@@ -41,7 +41,7 @@ class RAGSlideGenerator:
         
         # Use the most relevant slide as base template
         base_slide = relevant_slides[0]
-        base_xml = base_slide.get('xml_content', '')
+        base_xml = self.vector_db.get_xml_content(base_slide['slide_id'])
         
         if not base_xml:
             return self._generate_basic_slide(title or "New Slide", subtitle or "Generated content")
@@ -405,7 +405,7 @@ class RAGSlideChat:
         if hasattr(self.vector_db, '_load_existing_embeddings'):
             try:
                 # Try to trigger loading if not already done
-                test_search = self.vector_db.search_similar("test", top_k=1)
+                test_search = self.vector_db.search_similar("test", top_k=1, include_xml=False)
                 if not test_search:
                     print("📂 Loading vector database...")
             except:
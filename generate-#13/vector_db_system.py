@@ -6,16 +6,35 @@ Includes a RAG chat program for querying the database.
 """
 
 import os
+import sys
 import json
 import base64
 import sqlite3
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import xml.etree.ElementTree as ET
 from sentence_transformers import SentenceTransformer
 from PIL import Image
 import faiss
+from ann_index import (DEFAULT_EF_SEARCH, DEFAULT_NPROBE, apply_search_params,
+                       base_index, build_index, choose_index_type, index_type_of)
+
+try:
+    from embedding_cache import CachedEncoder, EmbeddingCache, QueryEncoder
+except ImportError:
+    # Not on the path: use the shared module at the repository root
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from embedding_cache import CachedEncoder, EmbeddingCache, QueryEncoder
+
+# Bound parameters per IN (...) lookup; SQLite builds before 3.32 allow 999
+SQLITE_MAX_IN_PARAMS = 900
+
+
+def _chunks(values: List, size: int = SQLITE_MAX_IN_PARAMS):
+    """Split values into lists small enough for one IN (...) lookup."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 class SlideAnalyzer:
     """Analyzes PowerPoint slides to generate detailed descriptions."""
@@ -122,13 +141,60 @@ class SlideAnalyzer:
 class VectorDatabase:
     """Vector database for storing slide descriptions, embeddings, and XML data."""
     
-    def __init__(self, db_path: str = "slides_vector_db.sqlite"):
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    INDEX_FORMAT_VERSION = 2  # 2: FAISS ids are slides.id via IndexIDMap2
+    
+    # Lightweight columns returned by search_similar; xml_content is optional
+    SEARCH_COLUMNS = ('id, slide_number, title, description, image_path, '
+                      'shapes_json, overall_purpose')
+    
+    # Slides are unique per deck rather than globally; embedding_id mirrors id
+    SLIDES_TABLE_SQL = '''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                slide_number INTEGER,
+                title TEXT,
+                description TEXT,
+                xml_content TEXT,
+                image_path TEXT,
+                shapes_json TEXT,
+                overall_purpose TEXT,
+                embedding_id INTEGER,
+                deck TEXT NOT NULL DEFAULT ''
+            )
+        '''
+    
+    def __init__(self, db_path: str = "slides_vector_db.sqlite", index_path: Optional[str] = None,
+                 index_type: str = 'auto', nprobe: int = DEFAULT_NPROBE, ef_search: int = DEFAULT_EF_SEARCH,
+                 embedding_cache: Optional[EmbeddingCache] = None):
+        """
+        Open or create a slide vector database.
+        
+        Args:
+            db_path: SQLite database file
+            index_path: Saved FAISS index file (defaults to <db_path>.faiss)
+            index_type: 'flat', 'ivf_flat', 'ivf_pq', 'hnsw', or 'auto' to pick
+                by corpus size (see ann_index.choose_index_type)
+            nprobe: IVF cells visited per query
+            ef_search: HNSW candidate list size per query
+            embedding_cache: Shared on-disk embedding cache (defaults to
+                embedding_cache.default_cache_path())
+        """
         self.db_path = db_path
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.index_path = index_path or f"{db_path}.faiss"
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.embedding_model = SentenceTransformer(self.MODEL_NAME)
+        self.encoder = CachedEncoder(self.embedding_model, self.MODEL_NAME, embedding_cache)
+        self.query_encoder = QueryEncoder(self.embedding_model)
         self.dimension = 384  # Embedding dimension for all-MiniLM-L6-v2
         
-        # Initialize FAISS index
-        self.faiss_index = faiss.IndexFlatIP(self.dimension)  # Inner product for similarity
+        # Initialize FAISS index; inner product for similarity, ids are slides.id.
+        # Empty until vectors exist; the first add_slides() builds index_type
+        self.faiss_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+        self._index_mapped = False  # True while the index is a read-only memory map
+        self._stale_vectors = 0  # Vectors of updated/deleted slides the index could not remove
         
         # Initialize SQLite database
         self._init_database()
@@ -138,69 +204,238 @@ class VectorDatabase:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS slides (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                slide_number INTEGER UNIQUE,
-                title TEXT,
-                description TEXT,
-                xml_content TEXT,
-                image_path TEXT,
-                shapes_json TEXT,
-                overall_purpose TEXT,
-                embedding_id INTEGER
-            )
-        ''')
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'slides'")
+        if cursor.fetchone() is None:
+            cursor.execute(self.SLIDES_TABLE_SQL.format(table='slides'))
+        else:
+            self._migrate_slides_table(cursor)
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_slides_deck_slide ON slides (deck, slide_number)")
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS embeddings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 slide_id INTEGER,
                 embedding_text TEXT,
+                vector BLOB,
                 FOREIGN KEY (slide_id) REFERENCES slides (id)
             )
         ''')
         
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_slide_id ON embeddings (slide_id)")
+        
+        # Databases created before vectors were persisted only store the text
+        cursor.execute("PRAGMA table_info(embeddings)")
+        if 'vector' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE embeddings ADD COLUMN vector BLOB")
+        
+        # Bumped on every write so a saved index file can tell it is stale
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO index_meta (key, value) VALUES ('generation', '0')")
+        
         conn.commit()
         conn.close()
         
         # Load existing embeddings into FAISS index
         self._load_existing_embeddings()
     
+    def _migrate_slides_table(self, cursor):
+        """Rebuild a slides table that predates decks (slide_number globally UNIQUE)."""
+        cursor.execute("PRAGMA table_info(slides)")
+        if 'deck' in [column[1] for column in cursor.fetchall()]:
+            return
+        
+        # SQLite cannot drop a column constraint, so copy into a new table
+        columns = ('id, slide_number, title, description, xml_content, image_path, '
+                   'shapes_json, overall_purpose')
+        cursor.execute(self.SLIDES_TABLE_SQL.format(table='slides_new'))
+        cursor.execute(f"INSERT INTO slides_new ({columns}, embedding_id) "
+                       f"SELECT {columns}, id FROM slides")
+        cursor.execute("DROP TABLE slides")
+        cursor.execute("ALTER TABLE slides_new RENAME TO slides")
+        print("Migrated slides table to per-deck slide numbers")
+    
     def _load_existing_embeddings(self):
-        """Load existing embeddings from database into FAISS index."""
+        """Load existing embeddings into the FAISS index.
+        
+        The saved index file is memory-mapped when its stamp matches the
+        database; otherwise the index is rebuilt from the stored vectors and
+        saved again. Only rows written before vectors were persisted are
+        re-encoded, once, and their vectors stored.
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        # Get all slides with their embedding texts
+        stamp = self._index_stamp(cursor)
+        if stamp['count'] and self._load_index_file(stamp):
+            conn.close()
+            print(f"Loaded {self.faiss_index.ntotal} existing embeddings from {self.index_path}")
+            return
+        
+        self._rebuild_index(conn)
+        conn.close()
+    
+    def rebuild_index(self):
+        """
+        Rebuild the FAISS index from the stored vectors and save it.
+        
+        Use after bulk ingestion to retrain an approximate index or to switch
+        to the index type 'auto' selects for the new corpus size.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._rebuild_index(conn)
+        finally:
+            conn.close()
+    
+    def _rebuild_index(self, conn):
+        """Build, train and save the index from stored vectors, encoding legacy rows once."""
+        cursor = conn.cursor()
+        
+        # Get all slides with their embedding texts and stored vectors
         cursor.execute('''
-            SELECT s.embedding_id, e.embedding_text 
+            SELECT s.id, e.id, e.embedding_text, e.vector
             FROM slides s
             JOIN embeddings e ON s.id = e.slide_id
-            ORDER BY s.embedding_id
+            ORDER BY s.id
         ''')
         
         rows = cursor.fetchall()
-        conn.close()
-        
-        if rows:
-            # Regenerate embeddings and add to FAISS index
-            embedding_texts = [row[1] for row in rows]
-            embeddings = self.embedding_model.encode(embedding_texts)
-            
-            # Normalize embeddings for cosine similarity
-            normalized_embeddings = []
-            for embedding in embeddings:
-                normalized = embedding / np.linalg.norm(embedding)
-                normalized_embeddings.append(normalized)
-            
-            # Add all embeddings to FAISS index
-            embeddings_array = np.array(normalized_embeddings, dtype=np.float32)
-            self.faiss_index.add(embeddings_array)
+        if not rows:
+            return
+        
+        missing = [i for i, row in enumerate(rows) if row[3] is None]
+        vectors = {}
+        if missing:
+            # Encode legacy rows once and persist their vectors
+            embeddings = self.encoder.encode([rows[i][2] for i in missing], normalize=True)
+            vectors = dict(zip(missing, embeddings))
+            cursor.executemany(
+                "UPDATE embeddings SET vector = ? WHERE id = ?",
+                [(vectors[i].tobytes(), rows[i][1]) for i in missing]
+            )
+            conn.commit()
+            print(f"Stored vectors for {len(missing)} embedding(s)")
+        
+        embeddings_array = np.vstack([
+            vectors[i] if i in vectors else np.frombuffer(row[3], dtype=np.float32)
+            for i, row in enumerate(rows)
+        ]).astype(np.float32)
+        
+        # Build (and train, for IVF types) the index over all embeddings
+        stamp = self._index_stamp(cursor)
+        self.faiss_index = build_index(stamp['index_type'], embeddings_array,
+                                       self.nprobe, self.ef_search,
+                                       ids=np.array([row[0] for row in rows], dtype=np.int64))
+        self._index_mapped = False
+        self._stale_vectors = 0
+        
+        try:
+            self.save_index(stamp)
+        except Exception as e:
+            print(f"Warning: Could not save index file {self.index_path}: {e}")
+        print(f"Loaded {len(rows)} existing embeddings into FAISS index ({stamp['index_type']})")
+    
+    def _index_stamp(self, cursor) -> Dict[str, Any]:
+        """Describe the database state that a saved index file must match."""
+        cursor.execute("SELECT value FROM index_meta WHERE key = 'generation'")
+        generation = int(cursor.fetchone()[0])
+        cursor.execute('''
+            SELECT COUNT(*), MAX(e.id)
+            FROM slides s
+            JOIN embeddings e ON s.id = e.slide_id
+        ''')
+        count, last_id = cursor.fetchone()
+        
+        return {
+            'version': self.INDEX_FORMAT_VERSION,
+            'model': self.MODEL_NAME,
+            'dimension': self.dimension,
+            'generation': generation,
+            'count': count,
+            'last_embedding_id': last_id,
+            'index_type': choose_index_type(self.index_type, count)
+        }
+    
+    def _bump_generation(self, cursor):
+        """Mark saved index files as stale; call inside the writing transaction."""
+        cursor.execute(
+            "UPDATE index_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'generation'")
+    
+    def _load_index_file(self, stamp: Dict[str, Any]) -> bool:
+        """Memory-map the saved index file if its stamp matches the database."""
+        stamp_path = f"{self.index_path}.json"
+        if not (os.path.exists(self.index_path) and os.path.exists(stamp_path)):
+            return False
+        
+        try:
+            with open(stamp_path, 'r', encoding='utf-8') as f:
+                if json.load(f) != stamp:
+                    return False
             
-            print(f"Loaded {len(rows)} existing embeddings into FAISS index")
+            if stamp['index_type'] == 'flat':
+                # IO_FLAG_MMAP_IFC maps flat index codes without copying them
+                # (faiss >= 1.10); older releases fall back to IO_FLAG_MMAP
+                mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+                index = faiss.read_index(self.index_path, mmap_flag)
+            else:
+                # Approximate indexes stay writable so add_slides() can extend them
+                index = faiss.read_index(self.index_path)
+            if (index.ntotal != stamp['count'] or index.d != self.dimension
+                    or not isinstance(index, faiss.IndexIDMap)):
+                return False
+        except Exception as e:
+            print(f"Warning: Could not load index file {self.index_path}: {e}")
+            return False
+        
+        apply_search_params(index, self.nprobe, self.ef_search)
+        self.faiss_index = index
+        self._index_mapped = stamp['index_type'] == 'flat'
+        return True
+    
+    def _ensure_writable_index(self):
+        """Copy a memory-mapped index into memory before it is modified."""
+        if self._index_mapped:
+            mapped = base_index(self.faiss_index)
+            vectors = mapped.reconstruct_n(0, mapped.ntotal)
+            ids = faiss.vector_to_array(self.faiss_index.id_map)
+            self.faiss_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            self.faiss_index.add_with_ids(vectors, ids)
+            self._index_mapped = False
+    
+    def save_index(self, stamp: Optional[Dict[str, Any]] = None):
+        """
+        Save the FAISS index next to the database for memory-mapped startup.
+        
+        Args:
+            stamp: Database state the index reflects (read from the database if omitted)
+        """
+        if stamp is None:
+            conn = sqlite3.connect(self.db_path)
+            stamp = self._index_stamp(conn.cursor())
+            conn.close()
+        # Record what was actually built; an index that outgrew its type is
+        # then rebuilt as the configured type on the next startup
+        stamp = dict(stamp, index_type=index_type_of(self.faiss_index))
+        
+        # Write to temp files first so a running service never maps a partial file
+        temp_index_path = f"{self.index_path}.tmp"
+        faiss.write_index(self.faiss_index, temp_index_path)
+        os.replace(temp_index_path, self.index_path)
+        
+        temp_stamp_path = f"{self.index_path}.json.tmp"
+        with open(temp_stamp_path, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        os.replace(temp_stamp_path, f"{self.index_path}.json")
     
-    def add_slide(self, slide_data: Dict[str, Any], xml_content: str, image_path: str) -> int:
+    def add_slide(self, slide_data: Dict[str, Any], xml_content: str, image_path: str,
+                  deck: str = '') -> int:
         """
         Add a slide to the vector database.
         
@@ -208,53 +443,268 @@ class VectorDatabase:
             slide_data: Analyzed slide data from SlideAnalyzer
             xml_content: Raw XML content of the slide
             image_path: Path to the slide image
+            deck: Deck the slide belongs to; slide numbers are unique per deck
             
         Returns:
             Slide ID in database
         """
-        # Create comprehensive text for embedding
-        embedding_text = self._create_embedding_text(slide_data)
+        return self.add_slides([(slide_data, xml_content, image_path)], deck=deck)[0]
+    
+    def add_slides(self, slides: List[Tuple[Dict[str, Any], str, str]], batch_size: int = 64,
+                   deck: str = '') -> List[int]:
+        """
+        Add many slides to the vector database in one batch.
         
-        # Generate embedding
-        embedding = self.embedding_model.encode([embedding_text])[0]
+        Embeddings are computed in batches, all rows are written in a single
+        transaction, and the FAISS index is extended with one call. Nothing
+        is added if any row fails to insert.
         
-        # Normalize embedding for cosine similarity
-        embedding = embedding / np.linalg.norm(embedding)
+        Args:
+            slides: (slide_data, xml_content, image_path) tuples, as for add_slide
+            batch_size: Number of texts encoded per model call
+            deck: Deck all the slides belong to
+            
+        Returns:
+            Slide IDs in database, in input order
+        """
+        slides = list(slides)
+        if not slides:
+            return []
+        
+        # Create comprehensive text for embedding
+        embedding_texts = [self._create_embedding_text(slide_data) for slide_data, _, _ in slides]
         
-        # Add to FAISS index
-        faiss_id = self.faiss_index.ntotal
-        self.faiss_index.add(np.array([embedding], dtype=np.float32))
+        # Generate embeddings, normalized for cosine similarity
+        embeddings = self.encoder.encode(embedding_texts, batch_size=batch_size, normalize=True)
         
         # Store in SQLite
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                INSERT INTO slides (slide_number, title, description, xml_content, image_path, 
+                                  shapes_json, overall_purpose, deck)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                self._slide_row(slide_data, embedding_text, xml_content, image_path) + (deck,)
+                for (slide_data, xml_content, image_path), embedding_text in zip(slides, embedding_texts)
+            ])
+            
+            # executemany() does not report row ids; (deck, slide_number) is unique
+            slide_ids = self._slide_ids(cursor, deck, [slide_data['slide_number'] for slide_data, _, _ in slides])
+            cursor.execute(
+                "UPDATE slides SET embedding_id = id WHERE deck = ? AND embedding_id IS NULL", (deck,))
+            
+            cursor.executemany('''
+                INSERT INTO embeddings (slide_id, embedding_text, vector)
+                VALUES (?, ?, ?)
+            ''', [
+                (slide_id, embedding_text, embedding.tobytes())
+                for slide_id, embedding_text, embedding in zip(slide_ids, embedding_texts, embeddings)
+            ])
+            self._bump_generation(cursor)
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        # Add to FAISS index only once the rows are committed
+        self._add_to_index(embeddings, np.array(slide_ids, dtype=np.int64))
+        
+        return slide_ids
+    
+    def upsert_slide(self, slide_data: Dict[str, Any], xml_content: str, image_path: str,
+                     deck: str = '') -> int:
+        """
+        Insert a slide, or update it in place if its deck already has that slide number.
+        
+        Args:
+            slide_data: Analyzed slide data from SlideAnalyzer
+            xml_content: Raw XML content of the slide
+            image_path: Path to the slide image
+            deck: Deck the slide belongs to
+            
+        Returns:
+            Slide ID in database; unchanged for an existing slide
+        """
+        return self.upsert_slides([(slide_data, xml_content, image_path)], deck=deck)[0]
+    
+    def upsert_slides(self, slides: List[Tuple[Dict[str, Any], str, str]], batch_size: int = 64,
+                      deck: str = '') -> List[int]:
+        """
+        Insert or update many slides of one deck, keeping existing slide IDs.
+        
+        Only slides whose embedding text changed are re-encoded; their vectors
+        are replaced in the FAISS index under the same ID.
+        
+        Args:
+            slides: (slide_data, xml_content, image_path) tuples, as for add_slide
+            batch_size: Number of texts encoded per model call
+            deck: Deck all the slides belong to
+            
+        Returns:
+            Slide IDs in database, in input order
+        """
+        slides = list(slides)
+        if not slides:
+            return []
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        existing = {}
+        for chunk in _chunks([slide_data['slide_number'] for slide_data, _, _ in slides]):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT s.slide_number, s.id, e.embedding_text
+                FROM slides s
+                JOIN embeddings e ON s.id = e.slide_id
+                WHERE s.deck = ? AND s.slide_number IN ({placeholders})
+            ''', [deck] + chunk)
+            existing.update((row[0], (row[1], row[2])) for row in cursor.fetchall())
+        conn.close()
         
-        cursor.execute('''
-            INSERT INTO slides (slide_number, title, description, xml_content, image_path, 
-                              shapes_json, overall_purpose, embedding_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        new_slides = [slide for slide in slides if slide[0]['slide_number'] not in existing]
+        new_ids = dict(zip([slide_data['slide_number'] for slide_data, _, _ in new_slides],
+                           self.add_slides(new_slides, batch_size, deck=deck)))
+        
+        updates = [slide for slide in slides if slide[0]['slide_number'] in existing]
+        if updates:
+            self._update_slides(updates, existing, batch_size)
+        
+        return [existing[slide_data['slide_number']][0] if slide_data['slide_number'] in existing
+                else new_ids[slide_data['slide_number']]
+                for slide_data, _, _ in slides]
+    
+    def _update_slides(self, updates: List[Tuple[Dict[str, Any], str, str]],
+                       existing: Dict[int, Tuple[int, str]], batch_size: int):
+        """Rewrite existing slide rows, re-encoding and re-indexing only changed text."""
+        embedding_texts = [self._create_embedding_text(slide_data) for slide_data, _, _ in updates]
+        slide_ids = [existing[slide_data['slide_number']][0] for slide_data, _, _ in updates]
+        changed = [i for i, (slide_data, _, _) in enumerate(updates)
+                   if embedding_texts[i] != existing[slide_data['slide_number']][1]]
+        
+        embeddings = np.empty((0, self.dimension), dtype=np.float32)
+        if changed:
+            embeddings = self.encoder.encode([embedding_texts[i] for i in changed],
+                                             batch_size=batch_size, normalize=True)
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE slides
+                SET slide_number = ?, title = ?, description = ?, xml_content = ?, image_path = ?,
+                    shapes_json = ?, overall_purpose = ?
+                WHERE id = ?
+            ''', [
+                self._slide_row(slide_data, embedding_text, xml_content, image_path) + (slide_id,)
+                for (slide_data, xml_content, image_path), embedding_text, slide_id
+                in zip(updates, embedding_texts, slide_ids)
+            ])
+            cursor.executemany(
+                "UPDATE embeddings SET embedding_text = ?, vector = ? WHERE slide_id = ?",
+                [(embedding_texts[i], embedding.tobytes(), slide_ids[i])
+                 for i, embedding in zip(changed, embeddings)]
+            )
+            self._bump_generation(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        if changed:
+            changed_ids = np.array([slide_ids[i] for i in changed], dtype=np.int64)
+            self._remove_from_index(changed_ids)
+            self._add_to_index(embeddings, changed_ids)
+    
+    def delete_slide(self, slide_number: int, deck: str = '') -> bool:
+        """
+        Delete a slide and remove its vector from the index.
+        
+        Args:
+            slide_number: Slide number within the deck
+            deck: Deck the slide belongs to
+            
+        Returns:
+            True if a slide was deleted
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM slides WHERE deck = ? AND slide_number = ?",
+                           (deck, slide_number))
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            
+            cursor.execute("DELETE FROM embeddings WHERE slide_id = ?", (row[0],))
+            cursor.execute("DELETE FROM slides WHERE id = ?", (row[0],))
+            self._bump_generation(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        self._remove_from_index(np.array([row[0]], dtype=np.int64))
+        return True
+    
+    def _add_to_index(self, embeddings: np.ndarray, slide_ids: np.ndarray):
+        """Add vectors by slide ID; an empty index is built as the configured type first."""
+        if self.faiss_index.ntotal == 0:
+            # Nothing to keep, so build (and train) what index_type asks for
+            # instead of extending the placeholder flat index
+            index_type = choose_index_type(self.index_type, len(slide_ids))
+            self.faiss_index = build_index(index_type, embeddings, self.nprobe, self.ef_search,
+                                           ids=slide_ids)
+            self._index_mapped = False
+            self._stale_vectors = 0
+            return
+        
+        self._ensure_writable_index()
+        self.faiss_index.add_with_ids(embeddings, slide_ids)
+    
+    def _remove_from_index(self, slide_ids: np.ndarray):
+        """Remove vectors by slide ID, or count them as stale if the index cannot remove."""
+        self._ensure_writable_index()
+        try:
+            self.faiss_index.remove_ids(slide_ids)
+        except RuntimeError:
+            # HNSW has no removal; search_similar skips ids whose rows are
+            # gone and re-scores replaced ones until the next rebuild
+            self._stale_vectors += len(slide_ids)
+    
+    @staticmethod
+    def _slide_row(slide_data: Dict[str, Any], embedding_text: str, xml_content: str,
+                   image_path: str) -> Tuple:
+        """Column values shared by slide inserts and updates."""
+        return (
             slide_data['slide_number'],
             slide_data.get('title', ''),
             embedding_text,
             xml_content,
             image_path,
             json.dumps(slide_data.get('shapes', [])),
-            slide_data.get('overall_purpose', ''),
-            faiss_id
-        ))
-        
-        slide_id = cursor.lastrowid
-        
-        cursor.execute('''
-            INSERT INTO embeddings (slide_id, embedding_text)
-            VALUES (?, ?)
-        ''', (slide_id, embedding_text))
-        
-        conn.commit()
-        conn.close()
-        
-        return slide_id
+            slide_data.get('overall_purpose', '')
+        )
+    
+    @staticmethod
+    def _slide_ids(cursor, deck: str, slide_numbers: List[int]) -> List[int]:
+        """Look up slide IDs for slide numbers of one deck, in the given order."""
+        ids = {}
+        for chunk in _chunks(list(slide_numbers)):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f"SELECT slide_number, id FROM slides WHERE deck = ? AND slide_number IN ({placeholders})",
+                           [deck] + chunk)
+            ids.update(cursor.fetchall())
+        return [ids[slide_number] for slide_number in slide_numbers]
     
     def _create_embedding_text(self, slide_data: Dict[str, Any]) -> str:
         """Create comprehensive text for embedding generation."""
@@ -281,13 +731,15 @@ class VectorDatabase:
         
         return " | ".join(text_parts)
     
-    def search_similar(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def search_similar(self, query: str, top_k: int = 5, include_xml: bool = True) -> List[Dict[str, Any]]:
         """
         Search for similar slides based on query.
         
         Args:
             query: Search query
             top_k: Number of results to return
+            include_xml: Fetch xml_content with the results; when False it is
+                left as None and can be loaded with get_xml_content()
             
         Returns:
             List of similar slides with metadata
@@ -297,11 +749,10 @@ class VectorDatabase:
             return []
         
         # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0]
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        query_embedding = self.query_encoder.encode(query)
         
-        # Search in FAISS
-        search_k = min(top_k, self.faiss_index.ntotal)
+        # Search in FAISS, over-fetching to make up for stale vectors
+        search_k = min(top_k + self._stale_vectors, self.faiss_index.ntotal)
         if search_k <= 0:
             return []
             
@@ -310,33 +761,90 @@ class VectorDatabase:
             search_k
         )
         
-        # Retrieve detailed information from SQLite
-        results = []
+        # FAISS ids are slide IDs; a replaced slide can appear more than once
+        hits = []
+        seen = set()
+        for score, idx in zip(scores[0], indices[0]):
+            slide_id = int(idx)
+            if slide_id != -1 and slide_id not in seen:  # Valid index
+                seen.add(slide_id)
+                hits.append((float(score), slide_id))
+        if not hits:
+            return []
+        
+        # Retrieve all hits from SQLite by primary key
+        columns = self.SEARCH_COLUMNS + (', xml_content' if include_xml else '')
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        rows = {}
+        for chunk in _chunks([slide_id for _, slide_id in hits]):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT {columns} FROM slides WHERE id IN ({placeholders})
+            ''', chunk)
+            rows.update((row[0], row) for row in cursor.fetchall())
+        if self._stale_vectors:
+            hits = self._rescore_hits(cursor, hits, query_embedding)
+        conn.close()
         
-        for score, idx in zip(scores[0], indices[0]):
-            if idx != -1:  # Valid index
-                cursor.execute('''
-                    SELECT * FROM slides WHERE embedding_id = ?
-                ''', (int(idx),))
-                
-                row = cursor.fetchone()
-                if row:
-                    results.append({
-                        'slide_id': row[0],
-                        'slide_number': row[1],
-                        'title': row[2],
-                        'description': row[3],
-                        'xml_content': row[4],
-                        'image_path': row[5],
-                        'shapes_json': json.loads(row[6]),
-                        'overall_purpose': row[7],
-                        'similarity_score': float(score)
-                    })
+        # Keep FAISS ranking order
+        results = []
+        for score, slide_id in hits:
+            row = rows.get(slide_id)
+            if row and len(results) < top_k:
+                results.append({
+                    'slide_id': row[0],
+                    'slide_number': row[1],
+                    'title': row[2],
+                    'description': row[3],
+                    'xml_content': row[7] if include_xml else None,
+                    'image_path': row[4],
+                    'shapes_json': json.loads(row[5]),
+                    'overall_purpose': row[6],
+                    'similarity_score': score
+                })
         
-        conn.close()
         return results
+    
+    @staticmethod
+    def _rescore_hits(cursor, hits: List[Tuple[float, int]],
+                      query_embedding: np.ndarray) -> List[Tuple[float, int]]:
+        """Score hits against their stored current vectors and re-rank them.
+        
+        An index that could not remove replaced vectors may have matched a
+        slide through its superseded vector; the stored vector is the truth.
+        """
+        current = {}
+        for chunk in _chunks([slide_id for _, slide_id in hits]):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f"SELECT slide_id, vector FROM embeddings WHERE slide_id IN ({placeholders})",
+                           chunk)
+            current.update(cursor.fetchall())
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        rescored = [
+            (float(np.dot(np.frombuffer(current[slide_id], dtype=np.float32), query))
+             if current.get(slide_id) is not None else score, slide_id)
+            for score, slide_id in hits
+        ]
+        return sorted(rescored, key=lambda hit: hit[0], reverse=True)
+    
+    def get_xml_content(self, slide_id: int) -> str:
+        """
+        Fetch a slide's XML content on demand.
+        
+        Args:
+            slide_id: Slide ID in database (the 'slide_id' of a search result)
+            
+        Returns:
+            Raw XML content of the slide, or an empty string if not found
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT xml_content FROM slides WHERE id = ?", (slide_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row and row[0] is not None else ''
 
 class RAGChatBot:
     """RAG-based chat bot for querying the slide vector database."""
@@ -356,7 +864,7 @@ class RAGChatBot:
             Generated response based on retrieved slides
         """
         # Search for relevant slides
-        relevant_slides = self.vector_db.search_similar(query, top_k=3)
+        relevant_slides = self.vector_db.search_similar(query, top_k=3, include_xml=False)
         
         if not relevant_slides:
             return "I couldn't find any relevant slides for your query. Please try a different search term."
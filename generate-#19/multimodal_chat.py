@@ -15,6 +15,7 @@ from typing import Dict, List, Any, Optional, Tuple
 import tempfile
 import shutil
 import re
+import mmap
 
 # Load environment variables from .env file
 try:
@@ -94,56 +95,236 @@ except ImportError:
 class ECMA376ContextLoader:
     """Loads relevant ECMA-376 specification sections for DrawingML generation"""
     
-    def __init__(self, ecma_file_path: str = "../generate-#12/ecma-376.md"):
+    # Bump when the patterns below change so persisted indexes are rebuilt
+    INDEX_VERSION = 1
+    
+    PATH_ELEMENTS = ['moveTo', 'lnTo', 'arcTo', 'close', 'cubicBezTo', 'quadBezTo']
+    GUIDE_ELEMENTS = ['avLst', 'gdLst', 'pathLst', 'gd', 'pt']
+    
+    # A section runs until the next numbered section or the end of a note
+    SECTION_END = rb'.*?(?=^\d+\.\d+\.\d+\.\d+|\n20\.\d+\.\d+|\nend note\])'
+    
+    # Retrieval mode: sections are split into chunks of about CHUNK_CHARS and
+    # the best matches are kept within a token budget (about 4 characters per token)
+    RETRIEVAL_MODEL = 'all-MiniLM-L6-v2'
+    CHUNK_CHARS = 800
+    CHARS_PER_TOKEN = 4
+    DEFAULT_TOP_K = 8
+    DEFAULT_TOKEN_BUDGET = 1500
+    
+    def __init__(self, ecma_file_path: str = "../generate-#12/ecma-376.md", index_path: Optional[str] = None,
+                 retrieval: bool = False):
+        """
+        Open the specification and its section index; section text is read on demand.
+        
+        Args:
+            ecma_file_path: ECMA-376 markdown, relative to this file
+            index_path: Persisted element -> byte offset index
+                (default: <ecma file>.drawingml-index.json next to it)
+            retrieval: Have get_context_for_shape return only the chunks most
+                similar to the shape and feedback instead of whole sections
+        """
         self.ecma_file_path = ecma_file_path
-        self.drawingml_sections = {}
+        self.index_path = index_path
+        self.retrieval = retrieval
+        self.drawingml_sections = {}  # Element name -> section text, filled by get_section()
+        self.section_offsets = {}  # Element name -> (start, end) byte offsets
+        self._content = None
+        self._chunks = None  # (element, text) pairs, built on the first retrieval
+        self._chunk_matrix = None
+        self._encoder = None
         self._load_drawingml_sections()
     
     def _load_drawingml_sections(self):
-        """Load key DrawingML sections from ECMA-376"""
+        """Load the section index for key DrawingML sections, building it on first use"""
         try:
             ecma_path = Path(__file__).parent / self.ecma_file_path
-            with open(ecma_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            index_path = Path(self.index_path) if self.index_path else ecma_path.with_name(
+                ecma_path.name + '.drawingml-index.json')
             
-            # Extract custGeom section
-            custgeom_match = re.search(
-                r'custGeom \(Custom Geometry\).*?(?=^\d+\.\d+\.\d+\.\d+|\n20\.\d+\.\d+|\nend note\])',
-                content, re.MULTILINE | re.DOTALL
-            )
-            if custgeom_match:
-                self.drawingml_sections['custGeom'] = custgeom_match.group(0)
-            
-            # Extract path elements section
-            path_elements = ['moveTo', 'lnTo', 'arcTo', 'close', 'cubicBezTo', 'quadBezTo']
-            for element in path_elements:
-                pattern = f'{element} \\([^)]+\\).*?(?=^\\d+\\.\\d+\\.\\d+\\.\\d+|\\n20\\.\\d+\\.\\d+|\\nend note\\])'
-                match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-                if match:
-                    self.drawingml_sections[element] = match.group(0)
-            
-            # Extract guide and adjust value sections
-            guide_elements = ['avLst', 'gdLst', 'pathLst', 'gd', 'pt']
-            for element in guide_elements:
-                pattern = f'{element} \\([^)]+\\).*?(?=^\\d+\\.\\d+\\.\\d+\\.\\d+|\\n20\\.\\d+\\.\\d+|\\nend note\\])'
-                match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-                if match:
-                    self.drawingml_sections[element] = match.group(0)
-                    
-            print(f"✅ Loaded {len(self.drawingml_sections)} ECMA-376 DrawingML sections")
+            with open(ecma_path, 'rb') as f:
+                self._content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            
+            # The index is valid only for this exact file and pattern set
+            stat = ecma_path.stat()
+            stamp = [self.INDEX_VERSION, stat.st_size, stat.st_mtime_ns]
+            
+            offsets = self._read_index(index_path, stamp)
+            if offsets is None:
+                offsets = self._build_index()
+                self._write_index(index_path, stamp, offsets)
+            self.section_offsets = offsets
+            
+            print(f"✅ Indexed {len(self.section_offsets)} ECMA-376 DrawingML sections")
             
         except Exception as e:
             print(f"Warning: Could not load ECMA-376 file: {e}")
-            self.drawingml_sections = {}
+            self.section_offsets = {}
+    
+    def _build_index(self) -> Dict[str, Tuple[int, int]]:
+        """Find each section's byte range with one search per element over the mapped file"""
+        patterns = {'custGeom': rb'custGeom \(Custom Geometry\)'}
+        for element in self.PATH_ELEMENTS + self.GUIDE_ELEMENTS:
+            patterns[element] = element.encode() + rb' \([^)]+\)'
+        
+        offsets = {}
+        for element, pattern in patterns.items():
+            match = re.search(pattern + self.SECTION_END, self._content, re.MULTILINE | re.DOTALL)
+            if match:
+                offsets[element] = match.span()
+        return offsets
+    
+    @staticmethod
+    def _read_index(index_path: Path, stamp: List) -> Optional[Dict[str, Tuple[int, int]]]:
+        """Offsets from a persisted index, or None if it is missing or stale"""
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get('stamp') != stamp:
+            return None
+        return {element: tuple(span) for element, span in index.get('sections', {}).items()}
+    
+    @staticmethod
+    def _write_index(index_path: Path, stamp: List, offsets: Dict[str, Tuple[int, int]]):
+        """Persist the index; failing only means rebuilding it next time"""
+        try:
+            tmp_path = index_path.with_name(index_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stamp': stamp, 'sections': offsets}, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"Warning: Could not save ECMA-376 section index {index_path}: {e}")
+    
+    def get_section(self, element: str) -> Optional[str]:
+        """Text of one indexed section, read from the mapped file on first request"""
+        if element not in self.drawingml_sections:
+            span = self.section_offsets.get(element)
+            if span is None:
+                return None
+            start, end = span
+            text = self._content[start:end].decode('utf-8')
+            # Match text-mode reading of CRLF files; a section ends before the
+            # newline of the next heading, which leaves its \r behind
+            text = text.replace('\r\n', '\n')
+            self.drawingml_sections[element] = text[:-1] if text.endswith('\r') else text
+        return self.drawingml_sections[element]
+    
+    def _chunk_sections(self) -> List[Tuple[str, str]]:
+        """Split every indexed section into (element, text) chunks on line boundaries"""
+        chunks = []
+        for element in self.section_offsets:
+            current = []
+            size = 0
+            for line in self.get_section(element).split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                if current and size + len(line) > self.CHUNK_CHARS:
+                    chunks.append((element, '\n'.join(current)))
+                    current, size = [], 0
+                current.append(line)
+                size += len(line) + 1
+            if current:
+                chunks.append((element, '\n'.join(current)))
+        return chunks
+    
+    def _build_retrieval_index(self) -> bool:
+        """Embed the section chunks once; vectors persist in the shared embedding cache"""
+        if self._chunk_matrix is not None:
+            return True
+        
+        # Imported here so startup does not load torch unless retrieval is used
+        try:
+            from sentence_transformers import SentenceTransformer
+            try:
+                from embedding_cache import CachedEncoder
+            except ImportError:
+                # Not on the path: use the shared module at the repository root
+                sys.path.append(str(Path(__file__).resolve().parent.parent))
+                from embedding_cache import CachedEncoder
+        except ImportError:
+            SentenceTransformer = None
+        if SentenceTransformer is None or not NUMPY_AVAILABLE:
+            print("Warning: ECMA-376 context retrieval needs sentence-transformers and NumPy; using whole sections")
+            self.retrieval = False
+            return False
+        
+        try:
+            self._encoder = CachedEncoder(SentenceTransformer(self.RETRIEVAL_MODEL), self.RETRIEVAL_MODEL)
+            self._chunks = self._chunk_sections()
+            # Element names are part of the embedded text so chunks keep their context
+            texts = [f"{element}: {text}" for element, text in self._chunks]
+            self._chunk_matrix = self._encoder.encode(texts, normalize=True)
+            print(f"✅ Embedded {len(self._chunks)} ECMA-376 context chunks")
+            return True
+        except Exception as e:
+            print(f"Warning: Could not build ECMA-376 retrieval index: {e}")
+            self.retrieval = False
+            return False
+    
+    def retrieve_context(self, shape_type: str, feedback: str = "", top_k: int = DEFAULT_TOP_K,
+                         token_budget: int = DEFAULT_TOKEN_BUDGET) -> Optional[str]:
+        """
+        Get the specification chunks most relevant to a shape and feedback.
+        
+        Args:
+            shape_type: Shape being generated, e.g. 'circle'
+            feedback: Comparison feedback from the previous iteration
+            top_k: Maximum number of chunks
+            token_budget: Approximate maximum size of the context in tokens
+        
+        Returns:
+            Context text in document order, or None if retrieval is unavailable
+            or selects nothing, so the caller falls back to whole sections
+        """
+        if not self._build_retrieval_index() or not self._chunks:
+            return None
+        
+        query = f"DrawingML custom geometry path for a {shape_type} shape. {feedback}".strip()
+        query_embedding = self._encoder.encode([query], normalize=True)[0]
+        scores = self._chunk_matrix @ query_embedding
+        
+        # Greedily take the best chunks that still fit the budget
+        budget = token_budget * self.CHARS_PER_TOKEN
+        selected = []
+        for i in np.argsort(-scores, kind='stable'):
+            if len(selected) == top_k:
+                break
+            size = len(self._chunks[i][1])
+            if size <= budget:
+                selected.append(i)
+                budget -= size
+        
+        if not selected:
+            if top_k < 1 or budget < 1:
+                return None
+            # Every chunk is over budget: keep the best one, trimmed to fit
+            element, text = self._chunks[int(np.argmax(scores))]
+            return f"=== {element} Element (excerpt) ===\n\n{text[:budget]}"
+        
+        context_parts = []
+        for i in sorted(selected):
+            element, text = self._chunks[i]
+            context_parts.append(f"=== {element} Element (excerpt) ===")
+            context_parts.append(text)
+        return "\n\n".join(context_parts)
     
-    def get_context_for_shape(self, shape_type: str) -> str:
+    def get_context_for_shape(self, shape_type: str, feedback: str = "") -> str:
         """Get relevant ECMA-376 context for a specific shape type"""
+        if self.retrieval:
+            context = self.retrieve_context(shape_type, feedback)
+            if context is not None:
+                return context
+        
         context_parts = []
         
         # Always include custGeom specification
-        if 'custGeom' in self.drawingml_sections:
+        custgeom = self.get_section('custGeom')
+        if custgeom is not None:
             context_parts.append("=== ECMA-376 Custom Geometry Specification ===")
-            context_parts.append(self.drawingml_sections['custGeom'])
+            context_parts.append(custgeom)
         
         # Include relevant path elements
         path_elements = ['moveTo', 'lnTo', 'close']
@@ -153,16 +334,17 @@ class ECMA376ContextLoader:
             path_elements.extend(['cubicBezTo', 'quadBezTo'])
         
         for element in path_elements:
-            if element in self.drawingml_sections:
+            section = self.get_section(element)
+            if section is not None:
                 context_parts.append(f"=== {element} Element ===")
-                context_parts.append(self.drawingml_sections[element])
+                context_parts.append(section)
         
         # Include guide sections
-        guide_elements = ['avLst', 'gdLst', 'pathLst', 'gd', 'pt']
-        for element in guide_elements:
-            if element in self.drawingml_sections:
+        for element in self.GUIDE_ELEMENTS:
+            section = self.get_section(element)
+            if section is not None:
                 context_parts.append(f"=== {element} Element ===")
-                context_parts.append(self.drawingml_sections[element])
+                context_parts.append(section)
         
         return "\n\n".join(context_parts)
 
@@ -1968,7 +2150,7 @@ Be specific and actionable in your feedback."""
 class GeminiImageComparator:
     """Uses Google Gemini's multimodal LLM with large context for image comparison and ECMA-376 specification analysis"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, ecma_retrieval: bool = False):
         if not GEMINI_AVAILABLE:
             raise ImportError("Google Gemini library not available. Install with: pip install google-generativeai")
         
@@ -1981,9 +2163,10 @@ class GeminiImageComparator:
         self.model = genai.GenerativeModel('gemini-1.5-pro')
         
         # Initialize ECMA-376 context loader
-        self.ecma_loader = ECMA376ContextLoader()
+        self.ecma_loader = ECMA376ContextLoader(retrieval=ecma_retrieval)
         
-    def compare_images(self, original_path: str, generated_path: str, shape_type: str = "circle") -> Dict[str, Any]:
+    def compare_images(self, original_path: str, generated_path: str, shape_type: str = "circle",
+                       feedback: str = "") -> Dict[str, Any]:
         """Compare images using Gemini with ECMA-376 specification context"""
         try:
             # Prepare images
@@ -1991,7 +2174,7 @@ class GeminiImageComparator:
             generated_image = self._load_image(generated_path)
             
             # Get ECMA-376 context for this shape type
-            ecma_context = self.ecma_loader.get_context_for_shape(shape_type)
+            ecma_context = self.ecma_loader.get_context_for_shape(shape_type, feedback)
             
             # Create comprehensive prompt with ECMA-376 specification
             prompt = self._create_comparison_prompt_with_ecma(shape_type, ecma_context)
@@ -2125,7 +2308,7 @@ class FeedbackLoopGenerator:
     """Orchestrates the iterative improvement process using visual feedback"""
     
     def __init__(self, template_path: str, max_iterations: int = 3, use_openai: bool = True, use_gemini: bool = False, 
-                 openai_api_key: str = None, gemini_api_key: str = None):
+                 openai_api_key: str = None, gemini_api_key: str = None, ecma_retrieval: bool = False):
         self.template_path = template_path
         self.max_iterations = max_iterations
         self.ppt_converter = PowerPointConverter()
@@ -2136,7 +2319,8 @@ class FeedbackLoopGenerator:
         # Choose image comparator based on availability and preference
         if use_gemini and GEMINI_AVAILABLE:
             try:
-                self.image_comparator = GeminiImageComparator(api_key=gemini_api_key)
+                self.image_comparator = GeminiImageComparator(api_key=gemini_api_key,
+                                                              ecma_retrieval=ecma_retrieval)
                 print("🔮 Using Google Gemini multimodal comparison with ECMA-376 context")
                 self.use_multimodal = True
             except Exception as e:
@@ -2180,6 +2364,7 @@ class FeedbackLoopGenerator:
         best_pptx = output_path
         best_similarity = 0.0
         current_shape_type = "circle"  # Default, will be updated
+        improvement_suggestions = ""
         
         for iteration in range(self.max_iterations):
             if verbose:
@@ -2265,7 +2450,8 @@ class FeedbackLoopGenerator:
                 # Call comparison with shape_type for Gemini
                 if hasattr(self.image_comparator, '__class__') and 'Gemini' in self.image_comparator.__class__.__name__:
                     comparison_result = self.image_comparator.compare_images(
-                        original_image_path, generated_png, shape_type=current_shape_type
+                        original_image_path, generated_png, shape_type=current_shape_type,
+                        feedback=improvement_suggestions
                     )
                 else:
                     comparison_result = self.image_comparator.compare_images(
@@ -2548,7 +2734,8 @@ class MultimodalChatGenerator:
     def generate_shape_with_feedback(self, image_path: str, output_path: str = "output.pptx", 
                                    verbose: bool = False, max_iterations: int = 3, 
                                    use_openai: bool = True, use_gemini: bool = False,
-                                   openai_api_key: str = None, gemini_api_key: str = None) -> str:
+                                   openai_api_key: str = None, gemini_api_key: str = None,
+                                   ecma_retrieval: bool = False) -> str:
         """Generate shape with iterative improvement using visual feedback"""
         
         if verbose:
@@ -2570,7 +2757,8 @@ class MultimodalChatGenerator:
                 use_openai=use_openai,
                 use_gemini=use_gemini,
                 openai_api_key=openai_api_key,
-                gemini_api_key=gemini_api_key
+                gemini_api_key=gemini_api_key,
+                ecma_retrieval=ecma_retrieval
             )
             
             # Generate with feedback
@@ -2655,6 +2843,8 @@ def main():
                        help="Use Google Gemini multimodal LLM with ECMA-376 context (recommended)")
     parser.add_argument("--gemini-api-key", type=str,
                        help="Google API key (or set GOOGLE_API_KEY environment variable)")
+    parser.add_argument("--ecma-retrieval", action="store_true",
+                       help="With --use-gemini, send only the ECMA-376 excerpts most relevant to the shape and feedback")
     
     args = parser.parse_args()
     
@@ -2675,7 +2865,8 @@ def main():
                 generator.generate_shape_with_feedback(
                     args.image, args.output, verbose=verbose, max_iterations=args.max_iterations,
                     use_openai=use_openai, use_gemini=use_gemini,
-                    openai_api_key=args.openai_api_key, gemini_api_key=args.gemini_api_key
+                    openai_api_key=args.openai_api_key, gemini_api_key=args.gemini_api_key,
+                    ecma_retrieval=args.ecma_retrieval
                 )
             else:
                 generator.generate_shape_from_image(args.image, args.output, verbose=verbose)
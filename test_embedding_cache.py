@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared embedding cache
+Encodes through CachedEncoder from the creating thread and from worker
+threads, with a small deterministic model in place of SentenceTransformer
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from embedding_cache import CachedEncoder, EmbeddingCache
+
+DIMENSION = 8
+
+
+class HashModel:
+    """Deterministic vector per text, counting the texts it encodes"""
+
+    def __init__(self):
+        self.encoded = 0
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIMENSION
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        with self._lock:
+            self.encoded += len(texts)
+        return np.array([self.vector(text) for text in texts], dtype=np.float32)
+
+    @staticmethod
+    def vector(text: str) -> np.ndarray:
+        seed = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32)
+
+
+class TestCachedEncoder(unittest.TestCase):
+    """CachedEncoder over an EmbeddingCache in a temporary directory"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = EmbeddingCache(os.path.join(self.temp_dir, 'embeddings.sqlite'))
+        self.model = HashModel()
+        self.encoder = CachedEncoder(self.model, 'hash-model', self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_hits_reuse_cached_vectors(self):
+        texts = ['first text', 'second  text', 'first text']
+        first = self.encoder.encode(texts)
+        self.assertEqual(self.model.encoded, 2)
+
+        # Whitespace differences share an entry
+        second = self.encoder.encode(['second text', 'first text'])
+        self.assertEqual(self.model.encoded, 2)
+        np.testing.assert_array_equal(second, first[[1, 0]])
+        np.testing.assert_array_equal(first[0], HashModel.vector('first text'))
+
+    def test_encode_from_worker_threads(self):
+        """The cache is built on the main thread and used from others"""
+        texts = [f"text {i}" for i in range(40)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda i: self.encoder.encode(texts[i::4], normalize=True),
+                                        range(4)))
+            # Every text is now cached, whichever thread stored it
+            repeated = list(executor.map(lambda i: self.encoder.encode(texts[i::4]), range(4)))
+
+        for i, (vectors, again) in enumerate(zip(results, repeated)):
+            expected = np.array([HashModel.vector(text) for text in texts[i::4]])
+            np.testing.assert_allclose(again, expected)
+            np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+        self.assertEqual(self.model.encoded, len(texts))
+        self.assertEqual(len(self.cache), len(texts))
+
+    def test_recent_hits_do_not_write(self):
+        self.encoder.encode(['first text', 'second text'])
+        conn = self.cache._connection()
+        changes = conn.total_changes
+        self.encoder.encode(['first text'])
+        self.assertEqual(conn.total_changes, changes)
+
+        # Entries last used longer ago than touch_interval are refreshed
+        self.cache.touch_interval = -1
+        self.encoder.encode(['first text', 'second text'])
+        self.assertEqual(conn.total_changes, changes + 2)
+
+    def test_eviction_keeps_limit(self):
+        self.cache.max_entries = 10
+        self.encoder.encode([f"text {i}" for i in range(25)])
+        self.assertLessEqual(len(self.cache), 10)
+        self.encoder.encode([f"more text {i}" for i in range(5)])
+        self.assertLessEqual(len(self.cache), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()